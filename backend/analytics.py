@@ -0,0 +1,167 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from fastapi import HTTPException
+from sqlalchemy import Date, case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
+import statistics
+import models
+from config import settings
+
+Appointment = models.Appointment
+CleaningLog = models.CleaningLog
+Inventory = models.Inventory
+LabRecord = models.LabRecord
+Pharmacy = models.Pharmacy
+
+
+def day_bounds(start: date, end: date) -> Tuple[datetime, datetime]:
+    """Timestamps of [start, end) in days, at most ANALYTICS_MAX_DAYS apart"""
+    if end <= start:
+        raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+    if end - start > timedelta(days=settings.analytics_max_days):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range must not exceed {settings.analytics_max_days} days",
+        )
+    return datetime.combine(start, time()), datetime.combine(end, time())
+
+
+def count_where(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def hours_between(db: AsyncSession, start, end):
+    if db.get_bind().dialect.name == "postgresql":
+        return func.extract("epoch", end - start) / 3600
+    return (func.julianday(end) - func.julianday(start)) * 24
+
+
+async def appointments_per_doctor(
+    db: AsyncSession, start: date, end: date, doctor_id: Optional[int] = None
+) -> List[dict]:
+    """Appointments of each doctor per day they start on, by status"""
+    lower, upper = day_bounds(start, end)
+    day = func.date(Appointment.starts_at, type_=Date)
+    query = (
+        select(
+            Appointment.doctor_id,
+            day,
+            func.count(),
+            count_where(Appointment.status == "completed"),
+            count_where(Appointment.status == "cancelled"),
+        )
+        .where(Appointment.starts_at >= lower, Appointment.starts_at < upper)
+        .group_by(Appointment.doctor_id, day)
+        .order_by(Appointment.doctor_id, day)
+    )
+    if doctor_id is not None:
+        query = query.where(Appointment.doctor_id == doctor_id)
+
+    return [
+        {
+            "doctor_id": doctor,
+            "day": day,
+            "appointments": appointments,
+            "completed": completed,
+            "cancelled": cancelled,
+        }
+        for doctor, day, appointments, completed, cancelled in await db.execute(query)
+    ]
+
+
+async def lab_turnaround(db: AsyncSession, start: date, end: date) -> List[dict]:
+    """
+    Hours from request to completion of the lab records completed in the
+    range, per test type. Medians come from percentile_cont on PostgreSQL;
+    other databases have no ordered-set aggregates, so the hours of each
+    test type are fetched as one column and the medians computed here.
+    """
+    lower, upper = day_bounds(start, end)
+    hours = hours_between(db, LabRecord.created_at, LabRecord.completed_at)
+    completed = (LabRecord.completed_at >= lower, LabRecord.completed_at < upper)
+    columns = [LabRecord.test_type, func.count(), func.avg(hours), func.max(hours)]
+    postgresql = db.get_bind().dialect.name == "postgresql"
+    if postgresql:
+        columns.append(func.percentile_cont(0.5).within_group(hours))
+
+    rows = await db.execute(
+        select(*columns)
+        .where(*completed)
+        .group_by(LabRecord.test_type)
+        .order_by(LabRecord.test_type)
+    )
+    results = []
+    for test_type, tests, average, longest, *median in rows:
+        results.append(
+            {
+                "test_type": test_type,
+                "completed": tests,
+                "average_hours": round(average, 2),
+                "median_hours": round(median[0], 2) if median else None,
+                "max_hours": round(longest, 2),
+            }
+        )
+
+    if not postgresql and results:
+        by_type = defaultdict(list)
+        values = await db.execute(select(LabRecord.test_type, hours).where(*completed))
+        for test_type, value in values:
+            by_type[test_type].append(value)
+        for result in results:
+            result["median_hours"] = round(statistics.median(by_type[result["test_type"]]), 2)
+    return results
+
+
+async def cleaning_minutes(db: AsyncSession, start: date, end: date) -> List[dict]:
+    """Minutes of completed cleaning per area"""
+    lower, upper = day_bounds(start, end)
+    rows = await db.execute(
+        select(
+            CleaningLog.area_type,
+            CleaningLog.area_name,
+            func.count(),
+            func.coalesce(func.sum(CleaningLog.duration_minutes), 0),
+        )
+        .where(
+            CleaningLog.cleaning_date >= lower,
+            CleaningLog.cleaning_date < upper,
+            CleaningLog.status == "completed",
+        )
+        .group_by(CleaningLog.area_type, CleaningLog.area_name)
+        .order_by(CleaningLog.area_type, CleaningLog.area_name)
+    )
+    return [
+        {"area_type": area_type, "area_name": area_name, "cleanings": cleanings, "minutes": minutes}
+        for area_type, area_name, cleanings, minutes in rows
+    ]
+
+
+async def stock_value(db: AsyncSession) -> List[dict]:
+    """Value (quantity * unit_price) of pharmacy stock per status and inventory per category"""
+    results = []
+    for source, model, group in (
+        ("pharmacy", Pharmacy, Pharmacy.status),
+        ("inventory", Inventory, Inventory.category),
+    ):
+        rows = await db.execute(
+            select(
+                group,
+                func.count(),
+                func.coalesce(func.sum(model.quantity), 0),
+                func.coalesce(func.sum(model.quantity * func.coalesce(model.unit_price, 0)), 0),
+            )
+            .group_by(group)
+            .order_by(group)
+        )
+        results.extend(
+            {
+                "source": source,
+                "group": name,
+                "items": items,
+                "quantity": quantity,
+                "value": round(value, 2),
+            }
+            for name, items, quantity, value in rows
+        )
+    return results
@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+import models
+from bulk import bulk_insert
+from config import settings
+from database import AsyncSessionLocal
+from scheduler import scheduler
+
+Appointment = models.Appointment
+
+# Appointments that still get reminders
+REMINDABLE_STATUSES = ("pending", "confirmed")
+
+
+def reminder_times(start: datetime, now: datetime, lead_times: List[timedelta]) -> List[datetime]:
+    """
+    Send times for each lead time that has not already passed. An
+    appointment booked inside every lead time still gets one reminder now.
+    """
+    times = sorted({start - lead for lead in lead_times if start - lead > now})
+    return times or [now]
+
+
+def build_reminders(appointment: Appointment, start: datetime, times: List[datetime], now: datetime):
+    message = f"Reminder: you have an appointment on {start:%Y-%m-%d} at {start:%H:%M}"
+    # Every column is set so the rows can go through COPY
+    return [
+        {
+            "patient_id": appointment.patient_id,
+            "appointment_id": appointment.id,
+            "reminder_type": "appointment",
+            "message": message,
+            "scheduled_time": scheduled_time,
+            "sent": False,
+            "created_at": now,
+        }
+        for scheduled_time in times
+    ]
+
+
+async def generate_chunk(db: AsyncSession, after, now: datetime, horizon: datetime, lead_times):
+    """
+    Generate reminders for the next chunk of appointments after the keyset
+    position and flip their reminder_sent in the same transaction. Returns
+    the new keyset position, or None when the window is exhausted.
+    """
+    query = (
+        select(Appointment)
+        .filter(
+            Appointment.reminder_sent == False,
+            Appointment.starts_at > now,
+            Appointment.starts_at < horizon,
+            Appointment.status.in_(REMINDABLE_STATUSES),
+        )
+        .order_by(Appointment.starts_at, Appointment.id)
+        .limit(settings.appointment_reminder_chunk_size)
+        # Concurrent generators take disjoint chunks
+        .with_for_update(skip_locked=True)
+    )
+    if after is not None:
+        query = query.filter(tuple_(Appointment.starts_at, Appointment.id) > after)
+    appointments = (await db.scalars(query)).all()
+    if not appointments:
+        return None, 0, 0
+
+    reminders = []
+    covered = []
+    for appointment in appointments:
+        start = appointment.starts_at
+        reminders.extend(
+            build_reminders(appointment, start, reminder_times(start, now, lead_times), now)
+        )
+        covered.append(appointment.id)
+
+    await bulk_insert(db, models.Reminder, reminders)
+    if covered:
+        await db.execute(
+            update(Appointment)
+            .where(Appointment.id.in_(covered))
+            .values(reminder_sent=True)
+            .execution_options(synchronize_session=False)
+        )
+    await db.commit()
+
+    last = appointments[-1]
+    return (last.starts_at, last.id), len(covered), len(reminders)
+
+
+async def generate_appointment_reminders() -> dict:
+    """Create reminders for every upcoming appointment that has none yet"""
+    lead_times = [timedelta(hours=hours) for hours in settings.appointment_reminder_lead_hours]
+    now = datetime.utcnow()
+    # Look a day past the longest lead time so no reminder falls between runs
+    horizon = now + max(lead_times, default=timedelta(0)) + timedelta(days=1)
+    appointments = reminders = 0
+
+    async with AsyncSessionLocal() as db:
+        after = None
+        while True:
+            after, covered, created = await generate_chunk(db, after, now, horizon, lead_times)
+            if after is None:
+                break
+            appointments += covered
+            reminders += created
+
+    return {"appointments": appointments, "reminders": reminders}
+
+
+appointment_reminder_job = scheduler.add_job(
+    "appointment_reminders",
+    settings.appointment_reminder_interval_seconds,
+    generate_appointment_reminders,
+)
@@ -0,0 +1,129 @@
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Iterable, List, Tuple
+import json
+import models
+from cache import response_cache
+from config import settings
+from scheduling import parse_time_of_day
+
+Interval = Tuple[datetime, datetime]
+
+
+def availability_namespace(doctor_id: int) -> str:
+    return f"availability:{doctor_id}"
+
+
+async def invalidate_availability(*doctor_ids: int):
+    """Drop cached free time of doctors whose appointments changed"""
+    for doctor_id in set(doctor_ids):
+        await response_cache.invalidate(availability_namespace(doctor_id))
+
+
+def working_hours(day: date) -> Interval:
+    start = parse_time_of_day(settings.working_hours_start)
+    end = parse_time_of_day(settings.working_hours_end)
+    return datetime.combine(day, start), datetime.combine(day, end)
+
+
+def free_windows(bounds: Interval, busy: List[Interval]) -> List[Interval]:
+    """Sweep start-ordered busy intervals across bounds and return the gaps"""
+    cursor, end = bounds
+    windows = []
+    for busy_start, busy_end in busy:
+        if busy_start >= end:
+            break
+        if busy_start > cursor:
+            windows.append((cursor, busy_start))
+        cursor = max(cursor, busy_end)
+    if cursor < end:
+        windows.append((cursor, end))
+    return windows
+
+
+async def load_free_windows(db: AsyncSession, entries) -> Dict[Tuple[str, str], bytes]:
+    """Compute free windows for (namespace, day) cache entries from one appointment query"""
+    wanted = {}
+    for namespace, day in entries:
+        doctor_id = int(namespace.rsplit(":", 1)[1])
+        wanted[(doctor_id, date.fromisoformat(day))] = (namespace, day)
+    doctor_ids = {doctor_id for doctor_id, _ in wanted}
+    days = [day for _, day in wanted]
+    # Appointments starting up to the longest duration earlier may run into the first day
+    longest = timedelta(minutes=settings.appointment_max_duration_minutes)
+    first_day = datetime.combine(min(days), time()) - longest
+    after_last_day = datetime.combine(max(days) + timedelta(days=1), time())
+
+    rows = await db.execute(
+        select(
+            models.Appointment.doctor_id,
+            models.Appointment.starts_at,
+            models.Appointment.duration_minutes,
+        ).filter(
+            models.Appointment.doctor_id.in_(doctor_ids),
+            models.Appointment.starts_at > first_day,
+            models.Appointment.starts_at < after_last_day,
+            models.Appointment.status != "cancelled",
+        )
+    )
+
+    busy: Dict[Tuple[int, date], List[Interval]] = {key: [] for key in wanted}
+    for doctor_id, start, duration_minutes in rows:
+        end = start + timedelta(minutes=duration_minutes)
+        # Appointments running past midnight occupy every day they touch
+        day = start.date()
+        while day <= end.date():
+            intervals = busy.get((doctor_id, day))
+            if intervals is not None:
+                intervals.append((start, end))
+            day += timedelta(days=1)
+
+    values = {}
+    for key, entry in wanted.items():
+        windows = free_windows(working_hours(key[1]), sorted(busy[key]))
+        values[entry] = json.dumps(
+            [[start.isoformat(), end.isoformat()] for start, end in windows]
+        ).encode()
+    return values
+
+
+async def find_free_windows(
+    db: AsyncSession,
+    doctor_ids: Iterable[int],
+    start: datetime,
+    end: datetime,
+    duration: timedelta,
+) -> List[dict]:
+    """
+    Free windows of at least duration between start and end for each
+    doctor, from cached per doctor and day free time. Only the doctor-days
+    missing from the cache are computed, all from a single query.
+    """
+    days = [
+        start.date() + timedelta(days=offset)
+        for offset in range((end.date() - start.date()).days + 1)
+    ]
+    days = [day for day in days if day.weekday() in settings.working_days]
+    entries = [
+        (availability_namespace(doctor_id), day.isoformat())
+        for doctor_id in sorted(set(doctor_ids))
+        for day in days
+    ]
+    if not entries:
+        return []
+
+    async def load(missing):
+        return await load_free_windows(db, missing)
+
+    cached = await response_cache.get_many_or_load(entries, load)
+
+    results = []
+    for namespace, day in entries:
+        doctor_id = int(namespace.rsplit(":", 1)[1])
+        for window_start, window_end in json.loads(cached[(namespace, day)]):
+            window_start = max(datetime.fromisoformat(window_start), start)
+            window_end = min(datetime.fromisoformat(window_end), end)
+            if window_end - window_start >= duration:
+                results.append({"doctor_id": doctor_id, "start": window_start, "end": window_end})
+    return results
@@ -0,0 +1,205 @@
+"""
+Dashboard analytics over a synthetic year of activity: each
+/api/analytics endpoint uncached (the namespace is invalidated before
+every call) and served from the response cache, over 30, 90 and 365 day
+ranges.
+
+    python benchmarks/analytics_latency.py
+    python benchmarks/analytics_latency.py --rows 10000000 --database-url postgresql://...
+
+--rows splits a total across appointments, lab records and cleaning logs
+in the default 5:3:3 proportions.
+"""
+from datetime import date, datetime, timedelta
+import argparse
+import asyncio
+import random
+import common
+
+START = datetime(2025, 1, 1)
+DAYS = 365
+CHUNK = 100_000
+TEST_TYPES = ["blood", "urine", "imaging", "biopsy", "culture", "genetic"]
+AREAS = [(area_type, f"{area_type} {i}") for area_type in ("washroom", "ward", "common_area") for i in range(40)]
+
+
+def insert_generated(model, count: int, row) -> None:
+    """Insert count rows made by row(i), CHUNK at a time to bound memory"""
+    for start in range(0, count, CHUNK):
+        common.insert_rows(model, [row(i) for i in range(start, min(count, start + CHUNK))])
+
+
+def seed(appointments: int, lab_records: int, cleaning_logs: int, doctors: int, rng: random.Random) -> None:
+    import models
+
+    now = datetime.utcnow()
+    first_doctor = common.insert_rows(
+        models.User,
+        [
+            {
+                "email": f"doctor{i}@hospital.org",
+                "name": f"Doctor {i}",
+                "role": "doctor",
+                "first_login": False,
+                "password_expires_at": now + timedelta(days=90),
+            }
+            for i in range(doctors)
+        ],
+    )
+    patient_id = common.insert_rows(
+        models.Patient,
+        [
+            {
+                "name": "Patient",
+                "email": "patient@hospital.org",
+                "phone": "555",
+                "age": 40,
+                "gender": "f",
+                "created_at": now,
+                "updated_at": now,
+            }
+        ],
+    )
+
+    def moment():
+        return START + timedelta(seconds=rng.randrange(DAYS * 86400))
+
+    def appointment(i):
+        starts_at = moment()
+        return {
+            "patient_id": patient_id,
+            "doctor_id": first_doctor + rng.randrange(doctors),
+            "appointment_date": starts_at.replace(hour=0, minute=0, second=0),
+            "appointment_time": f"{starts_at:%H:%M}",
+            "starts_at": starts_at,
+            "duration_minutes": 30,
+            "status": rng.choice(("pending", "confirmed", "completed", "completed", "cancelled")),
+            "reason": "Checkup",
+            "reminder_sent": True,
+            "created_at": starts_at,
+        }
+
+    def lab_record(i):
+        created_at = moment()
+        completed = rng.random() < 0.8
+        return {
+            "patient_id": patient_id,
+            "test_name": "Panel",
+            "test_type": rng.choice(TEST_TYPES),
+            "result": "normal" if completed else None,
+            "status": "completed" if completed else "pending",
+            "created_at": created_at,
+            "completed_at": created_at + timedelta(hours=rng.uniform(0.5, 96)) if completed else None,
+        }
+
+    def cleaning_log(i):
+        area_type, area_name = rng.choice(AREAS)
+        return {
+            "area_type": area_type,
+            "area_name": area_name,
+            "cleaning_date": moment(),
+            "duration_minutes": rng.randrange(10, 90),
+            "status": "completed" if rng.random() < 0.9 else "pending",
+            "created_at": now,
+        }
+
+    insert_generated(models.Appointment, appointments, appointment)
+    insert_generated(models.LabRecord, lab_records, lab_record)
+    insert_generated(models.CleaningLog, cleaning_logs, cleaning_log)
+    common.insert_rows(
+        models.Pharmacy,
+        [
+            {
+                "medicine_name": f"Medicine {i}",
+                "quantity": rng.randrange(0, 500),
+                "reorder_level": 20,
+                "unit_price": round(rng.uniform(0.1, 50), 2),
+                "expiry_date": now + timedelta(days=rng.randrange(-30, 700)),
+                "status": rng.choice(("available", "available", "out_of_stock", "expired")),
+                "created_at": now,
+            }
+            for i in range(2000)
+        ],
+    )
+    common.insert_rows(
+        models.Inventory,
+        [
+            {
+                "item_name": f"Item {i}",
+                "category": rng.choice(("medical_supplies", "equipment", "cleaning_supplies")),
+                "quantity": rng.randrange(0, 1000),
+                "unit_price": round(rng.uniform(0.05, 500), 2),
+                "reorder_level": 20,
+                "created_at": now,
+            }
+            for i in range(2000)
+        ],
+    )
+
+
+async def measure(repeat: int) -> list:
+    from cache import response_cache
+
+    rows = []
+    async with common.asgi_client(common.admin_token()) as client:
+
+        async def uncached(path):
+            await response_cache.invalidate("analytics")
+            await common.get_ok(client, path)
+
+        for days in (30, 90, 365):
+            start = date(2025, 3, 1)
+            period = f"from={start}&to={start + timedelta(days=days)}"
+            paths = {
+                "appointments-per-doctor": f"/api/analytics/appointments-per-doctor?{period}",
+                "lab-turnaround": f"/api/analytics/lab-turnaround?{period}",
+                "cleaning-minutes": f"/api/analytics/cleaning-minutes?{period}",
+                "stock-value": "/api/analytics/stock-value",
+            }
+            for name, path in paths.items():
+                if name == "stock-value" and days != 30:
+                    continue
+                cold = await common.time_async_calls(lambda: uncached(path), repeat)
+                warm = await common.time_async_calls(lambda: common.get_ok(client, path), repeat * 10)
+                rows.append(
+                    {
+                        "endpoint": name,
+                        "days": days if name != "stock-value" else "",
+                        "uncached_p50_ms": cold["p50_ms"],
+                        "uncached_max_ms": cold["max_ms"],
+                        "cached_p50_ms": warm["p50_ms"],
+                        "cached_p99_ms": warm["p99_ms"],
+                    }
+                )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--appointments", type=int, default=500_000)
+    parser.add_argument("--lab-records", type=int, default=300_000)
+    parser.add_argument("--cleaning-logs", type=int, default=300_000)
+    parser.add_argument("--rows", type=int, default=None, help="total rows, split 5:3:3")
+    parser.add_argument("--doctors", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=25)
+    arguments = parser.parse_args()
+
+    if arguments.rows is not None:
+        arguments.appointments = arguments.rows * 5 // 11
+        arguments.lab_records = arguments.cleaning_logs = arguments.rows * 3 // 11
+
+    common.configure(arguments.database_url)
+    seed(
+        arguments.appointments,
+        arguments.lab_records,
+        arguments.cleaning_logs,
+        arguments.doctors,
+        random.Random(arguments.seed),
+    )
+    common.print_table(asyncio.run(measure(arguments.repeat)))
+
+
+if __name__ == "__main__":
+    main()
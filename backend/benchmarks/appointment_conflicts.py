@@ -0,0 +1,168 @@
+"""
+Double-booking checks against a busy schedule: books appointments across
+doctors, then times random conflict checks through find_conflict (the
+(doctor_id, starts_at) index seek) against reading the doctor's whole
+history, and POST /api/appointments/ for random slots end to end.
+
+    python benchmarks/appointment_conflicts.py --appointments 100000 --doctors 500 --checks 5000
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import random
+import common
+
+DAYS = 365
+# Half-hour slots from 08:00 to 18:00
+SLOTS = 20
+
+
+def slot_start(day: int, slot: int) -> datetime:
+    return datetime(2026, 1, 1, 8) + timedelta(days=day, minutes=30 * slot)
+
+
+def seed(appointments: int, doctors: int, rng: random.Random):
+    import models
+
+    now = datetime.utcnow()
+    first_doctor = common.insert_rows(
+        models.User,
+        [
+            {
+                "email": f"doctor{i}@hospital.org",
+                "name": f"Doctor {i}",
+                "role": "doctor",
+                "first_login": False,
+                "password_expires_at": now + timedelta(days=90),
+            }
+            for i in range(doctors)
+        ],
+    )
+    patient_id = common.insert_rows(
+        models.Patient,
+        [
+            {
+                "name": "Patient",
+                "email": "patient@hospital.org",
+                "phone": "555",
+                "age": 40,
+                "gender": "f",
+                "created_at": now,
+                "updated_at": now,
+            }
+        ],
+    )
+    rows = []
+    per_doctor = appointments // doctors
+    for doctor in range(doctors):
+        for slot in rng.sample(range(DAYS * SLOTS), per_doctor):
+            starts_at = slot_start(*divmod(slot, SLOTS))
+            rows.append(
+                {
+                    "patient_id": patient_id,
+                    "doctor_id": first_doctor + doctor,
+                    "appointment_date": starts_at.replace(hour=0, minute=0),
+                    "appointment_time": f"{starts_at:%H:%M}",
+                    "starts_at": starts_at,
+                    "duration_minutes": 30,
+                    "status": "cancelled" if rng.random() < 0.1 else "confirmed",
+                    "reason": "Checkup",
+                    "reminder_sent": True,
+                    "created_at": now,
+                }
+            )
+    common.insert_rows(models.Appointment, rows)
+    return first_doctor, patient_id
+
+
+def random_slot(rng: random.Random, first_doctor: int, doctors: int):
+    start = slot_start(rng.randrange(DAYS), rng.randrange(SLOTS))
+    return first_doctor + rng.randrange(doctors), start, start + timedelta(minutes=30)
+
+
+async def checks(first_doctor: int, doctors: int, count: int, rng: random.Random) -> list:
+    from sqlalchemy import select
+    import models
+    from database import AsyncSessionLocal
+    from scheduling import appointment_end, find_conflict
+
+    Appointment = models.Appointment
+    slots = [random_slot(rng, first_doctor, doctors) for _ in range(count)]
+    conflicts = 0
+
+    async def whole_history(doctor_id, start, end):
+        # Every active booking of the doctor, checked in Python
+        query = select(Appointment).filter(Appointment.doctor_id == doctor_id, Appointment.status != "cancelled")
+        return [other for other in await db.scalars(query) if other.starts_at < end and appointment_end(other) > start]
+
+    async with AsyncSessionLocal() as db:
+
+        def run(check):
+            remaining = iter(slots)
+
+            async def call():
+                nonlocal conflicts
+                if await check(*next(remaining)):
+                    conflicts += 1
+                # Drop loaded rows so each check reads from the database
+                db.expunge_all()
+
+            return call
+
+        indexed = await common.time_async_calls(run(lambda *slot: find_conflict(db, *slot)), count)
+        indexed_conflicts, conflicts = conflicts, 0
+        history = await common.time_async_calls(run(whole_history), count)
+    if conflicts != indexed_conflicts:
+        raise RuntimeError(f"checks disagree: {indexed_conflicts} conflicts by index, {conflicts} by history")
+    return [
+        {"check": "find_conflict (index seek)", "conflicts": indexed_conflicts, **indexed},
+        {"check": "whole doctor history", "conflicts": conflicts, **history},
+    ]
+
+
+async def bookings(first_doctor: int, doctors: int, patient_id: int, count: int, rng: random.Random) -> dict:
+    statuses = Counter()
+
+    async with common.asgi_client(common.admin_token()) as client:
+
+        async def book():
+            doctor_id, start, _ = random_slot(rng, first_doctor, doctors)
+            response = await client.post(
+                "/api/appointments/",
+                json={
+                    "patient_id": patient_id,
+                    "doctor_id": doctor_id,
+                    "appointment_date": start.replace(hour=0, minute=0).isoformat(),
+                    "appointment_time": f"{start:%H:%M}",
+                    "reason": "Checkup",
+                },
+            )
+            statuses[response.status_code] += 1
+
+        summary = await common.time_async_calls(book, count)
+    if set(statuses) - {200, 400}:
+        raise RuntimeError(f"unexpected booking responses: {dict(statuses)}")
+    return {"check": "POST /api/appointments/", "conflicts": statuses[400], **summary}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--appointments", type=int, default=100_000)
+    parser.add_argument("--doctors", type=int, default=500)
+    parser.add_argument("--checks", type=int, default=5000)
+    parser.add_argument("--bookings", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=17)
+    arguments = parser.parse_args()
+
+    rng = random.Random(arguments.seed)
+    common.configure(arguments.database_url)
+    first_doctor, patient_id = seed(arguments.appointments, arguments.doctors, rng)
+    rows = asyncio.run(checks(first_doctor, arguments.doctors, arguments.checks, rng))
+    rows.append(asyncio.run(bookings(first_doctor, arguments.doctors, patient_id, arguments.bookings, rng)))
+    common.print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Requests/s and latency of the read endpoints with DB_ASYNC=true (asyncpg or
+aiosqlite sessions) against DB_ASYNC=false (the blocking driver run in the
+threadpool), under the same closed-loop load.
+
+    python benchmarks/async_vs_sync.py --concurrency 64 --duration 20
+    python benchmarks/async_vs_sync.py --database-url postgresql://... --patients 50000
+
+Without --database-url a fresh SQLite database is seeded.
+"""
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import common
+
+
+def seed(patients: int):
+    import models
+
+    now = datetime.utcnow()
+    first_id = common.insert_rows(
+        models.Patient,
+        [
+            {
+                "name": f"Patient {i}",
+                "email": f"patient{i}@example.com",
+                "phone": f"555{i:07d}",
+                "age": 20 + i % 60,
+                "gender": "f" if i % 2 else "m",
+                "created_at": now - timedelta(minutes=i),
+                "updated_at": now,
+            }
+            for i in range(patients)
+        ],
+    )
+    common.insert_rows(
+        models.LabRecord,
+        [
+            {
+                "patient_id": first_id + i % patients,
+                "test_name": "CBC",
+                "test_type": "blood",
+                "result": "normal",
+                "status": "completed",
+                "created_at": now - timedelta(hours=i),
+            }
+            for i in range(patients * 3)
+        ],
+    )
+    return first_id
+
+
+def request_mix(first_id: int, patients: int):
+    def request(rng):
+        patient_id = first_id + rng.randrange(patients)
+        roll = rng.random()
+        if roll < 0.4:
+            return "GET", f"/api/patients/{patient_id}", None
+        if roll < 0.7:
+            return "GET", "/api/patients/?limit=50&sort=-created_at", None
+        if roll < 0.9:
+            return "GET", f"/api/lab/patient/{patient_id}", None
+        return "GET", f"/api/patients/{patient_id}/chart", None
+
+    return request
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--patients", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--workers", type=int, default=1)
+    arguments = parser.parse_args()
+
+    common.configure(arguments.database_url)
+    first_id = seed(arguments.patients)
+    token = common.admin_token()
+    request = request_mix(first_id, arguments.patients)
+
+    rows = []
+    for mode in ("true", "false"):
+        with common.server(workers=arguments.workers, env={"DB_ASYNC": mode}) as base_url:
+            result = asyncio.run(
+                common.http_load(base_url, token, request, arguments.concurrency, arguments.duration)
+            )
+        rows.append({"DB_ASYNC": mode, **result})
+    common.print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Cost of authenticating a request from its bearer token: JWT verification
+against a claims cache hit, alone and through get_optional_claims, and
+GET /api/patients/{id} end to end without auth, with a cached token and
+with a new token on every request.
+
+    python benchmarks/auth_overhead.py --repeat 5000
+"""
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import time
+import common
+
+
+def per_call_us(call, tokens) -> float:
+    start = time.perf_counter()
+    for token in tokens:
+        call(token)
+    return round((time.perf_counter() - start) / len(tokens) * 1e6, 1)
+
+
+async def per_await_us(call, tokens) -> float:
+    start = time.perf_counter()
+    for token in tokens:
+        await call(token)
+    return round((time.perf_counter() - start) / len(tokens) * 1e6, 1)
+
+
+def new_tokens(count: int) -> list:
+    from utils import create_access_token
+
+    return [
+        create_access_token({"sub": f"user{i}@hospital.org", "user_id": i, "role": "nurse"}, timedelta(hours=1))
+        for i in range(count)
+    ]
+
+
+async def components(repeat: int) -> list:
+    from fastapi.security import HTTPAuthorizationCredentials
+    from dependencies import claims_cache, get_optional_claims
+    from utils import verify_token
+
+    cached = new_tokens(1) * repeat
+
+    def claims_of(token):
+        return get_optional_claims(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
+
+    verify = per_call_us(verify_token, new_tokens(repeat))
+    claims_cache.put(cached[0], verify_token(cached[0]))
+    cache_hit = per_call_us(claims_cache.get, cached)
+    dependency_miss = await per_await_us(claims_of, new_tokens(repeat))
+    dependency_hit = await per_await_us(claims_of, cached)
+    return [
+        {"step": "verify_token (jwt.decode)", "us_per_call": verify},
+        {"step": "claims_cache.get hit", "us_per_call": cache_hit},
+        {"step": "get_optional_claims, new token", "us_per_call": dependency_miss},
+        {"step": "get_optional_claims, cached token", "us_per_call": dependency_hit},
+    ]
+
+
+async def endpoint(repeat: int) -> list:
+    import models
+    from dependencies import get_current_claims
+    from main import app
+
+    patient_id = common.insert_rows(
+        models.Patient,
+        [
+            {
+                "name": "Patient",
+                "email": "patient@hospital.org",
+                "phone": "555",
+                "age": 40,
+                "gender": "f",
+                "created_at": datetime.utcnow(),
+                "updated_at": datetime.utcnow(),
+            }
+        ],
+    )
+    path = f"/api/patients/{patient_id}"
+    cached = common.admin_token()
+    fresh = iter(new_tokens(repeat))
+
+    async def no_auth():
+        # A coroutine, as a plain function dependency would run in the threadpool
+        return {"role": "admin"}
+
+    modes = {"none (dependency overridden)": None, "cached token": cached, "new token per request": fresh}
+    latencies = {mode: [] for mode in modes}
+    async with common.asgi_client() as client:
+
+        async def get(token):
+            headers = {"Authorization": f"Bearer {token}"} if token else {}
+            response = await client.get(path, headers=headers)
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {path}: {response.status_code}")
+
+        # Warm up the route, the session pool and the cache entry of the cached token
+        for _ in range(100):
+            await get(cached)
+
+        # Modes take turns so drift over the run affects them alike
+        for _ in range(repeat):
+            for mode, token in modes.items():
+                if token is None:
+                    app.dependency_overrides[get_current_claims] = no_auth
+                began = time.perf_counter()
+                await get(next(token) if token is fresh else token)
+                latencies[mode].append(time.perf_counter() - began)
+                app.dependency_overrides.clear()
+
+    rows = []
+    for mode, values in latencies.items():
+        summary = common.summarize(values, 0)
+        mean_ms = round(sum(values) / len(values) * 1000, 3)
+        rows.append({"auth": mode, "mean_ms": mean_ms, "p50_ms": summary["p50_ms"], "p99_ms": summary["p99_ms"]})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--repeat", type=int, default=5000)
+    arguments = parser.parse_args()
+
+    common.configure(arguments.database_url)
+    common.print_table(asyncio.run(components(arguments.repeat)))
+    print()
+    common.print_table(asyncio.run(endpoint(arguments.repeat)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Helpers shared by the benchmark scripts: choosing and migrating the
+database, an admin token, the API in a uvicorn subprocess, closed-loop
+HTTP load and latency summaries.
+
+Call configure() before importing any application module; settings are
+read on import.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Background jobs would add their own queries to the measurements
+QUIET_JOBS = {
+    "PHARMACY_SWEEP_INTERVAL_SECONDS": "0",
+    "REMINDER_DISPATCH_INTERVAL_SECONDS": "0",
+    "APPOINTMENT_REMINDER_INTERVAL_SECONDS": "0",
+    "TIMESHEET_BACKFILL_INTERVAL_SECONDS": "0",
+}
+
+
+def configure(database_url: Optional[str] = None) -> str:
+    """Point the application at database_url, or a fresh SQLite file, and migrate it"""
+    if database_url is None:
+        directory = tempfile.mkdtemp(prefix="hospital-bench-")
+        database_url = f"sqlite:///{os.path.join(directory, 'hospital.db')}"
+    os.environ["DATABASE_URL"] = database_url
+    sys.path.insert(0, BACKEND_DIR)
+
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    command.upgrade(config, "head")
+    return database_url
+
+
+def insert_rows(model, rows: List[dict], chunk_size: int = 5000) -> int:
+    """
+    Insert rows through the sync engine in multi-row batches and return the
+    first new id; ids are assumed to be handed out in insertion order
+    """
+    from sqlalchemy import func, insert, select
+    from database import engine
+
+    with engine.begin() as connection:
+        last_id = connection.scalar(select(func.max(model.id))) or 0
+        for start in range(0, len(rows), chunk_size):
+            connection.execute(insert(model), rows[start:start + chunk_size])
+    return last_id + 1
+
+
+def admin_token(role: str = "admin") -> str:
+    """Bearer token of a user with role, created if missing"""
+    import models
+    from database import SessionLocal
+    from utils import create_access_token
+
+    email = f"bench-{role}@hospital.test"
+    with SessionLocal() as db:
+        user = db.query(models.User).filter(models.User.email == email).first()
+        if user is None:
+            user = models.User(
+                email=email,
+                name=f"Benchmark {role}",
+                role=role,
+                first_login=False,
+                password_expires_at=datetime.utcnow() + timedelta(days=90),
+            )
+            db.add(user)
+            db.commit()
+        return create_access_token(
+            {"sub": user.email, "user_id": user.id, "role": user.role},
+            expires_delta=timedelta(hours=12),
+        )
+
+
+@contextmanager
+def server(port: int = 8765, workers: int = 1, env: Optional[Dict[str, str]] = None):
+    """Run the API with uvicorn in a subprocess and yield its base URL"""
+    import httpx
+
+    command = [
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--port", str(port), "--workers", str(workers), "--log-level", "warning",
+    ]
+    process = subprocess.Popen(
+        command, cwd=BACKEND_DIR, env={**os.environ, **QUIET_JOBS, **(env or {})}
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                if httpx.get(f"{base_url}/health").status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("API server did not start")
+            time.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0) -> dict:
+    """Throughput and latency percentiles (ms) of a run"""
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(max(latencies, default=0) * 1000, 2),
+    }
+
+
+def time_calls(call: Callable[[], object], repeat: int) -> dict:
+    """Latencies of repeat sequential calls to call"""
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        began = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - began)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+async def time_async_calls(call: Callable[[], Awaitable[object]], repeat: int) -> dict:
+    """Latencies of repeat sequential awaits of call()"""
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        began = time.perf_counter()
+        await call()
+        latencies.append(time.perf_counter() - began)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def asgi_client(token: Optional[str] = None):
+    """httpx client calling the app in this process, without a server or lifespan"""
+    import httpx
+    from main import app
+
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench", headers=headers, timeout=600
+    )
+
+
+async def get_ok(client, path: str):
+    response = await client.get(path)
+    if response.status_code != 200:
+        raise RuntimeError(f"GET {path}: {response.status_code} {response.text[:200]}")
+    return response
+
+
+async def send_all(client, requests: List[tuple], concurrency: int):
+    """
+    Send (method, path, json) requests with at most concurrency in flight;
+    returns (summary, Counter of status codes)
+    """
+    limit = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+
+    async def send(method, path, body):
+        async with limit:
+            began = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            latencies.append(time.perf_counter() - began)
+            statuses[response.status_code] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(send(*request) for request in requests))
+    return summarize(latencies, time.perf_counter() - start), statuses
+
+
+async def http_load(
+    base_url: str,
+    token: Optional[str],
+    request: Callable[[random.Random], tuple],
+    concurrency: int,
+    duration: float,
+    warmup: float = 2.0,
+) -> dict:
+    """
+    Closed-loop load: concurrency clients each send request(rng) -> (method,
+    path, json) back to back for duration seconds after a warmup. Responses
+    other than 2xx and transport errors count as errors.
+    """
+    import httpx
+
+    latencies: List[float] = []
+    errors = 0
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(
+        base_url=base_url, headers=headers, limits=limits, timeout=60
+    ) as client:
+        started = time.perf_counter()
+        measure_from = started + warmup
+        stop_at = measure_from + duration
+
+        async def client_loop(seed: int):
+            nonlocal errors
+            rng = random.Random(seed)
+            while True:
+                method, path, body = request(rng)
+                began = time.perf_counter()
+                if began >= stop_at:
+                    return
+                try:
+                    response = await client.request(method, path, json=body)
+                    failed = not response.is_success
+                except httpx.HTTPError:
+                    failed = True
+                if began >= measure_from:
+                    if failed:
+                        errors += 1
+                    else:
+                        latencies.append(time.perf_counter() - began)
+
+        await asyncio.gather(*(client_loop(seed) for seed in range(concurrency)))
+    return summarize(latencies, duration, errors)
+
+
+def print_table(rows: List[dict]) -> None:
+    if not rows:
+        return
+    columns = list(rows[0])
+    widths = {column: max(len(column), *(len(str(row[column])) for row in rows)) for column in columns}
+    print("  ".join(column.ljust(widths[column]) for column in columns))
+    for row in rows:
+        print("  ".join(str(row[column]).ljust(widths[column]) for column in columns))
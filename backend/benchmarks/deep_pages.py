@@ -0,0 +1,109 @@
+"""
+Page latency at increasing depths of the patient list: the OFFSET/LIMIT
+query the list endpoints used to run against the keyset query that
+replaced it, and GET /api/patients/ end to end with a cursor on id and on
+(created_at, id).
+
+    python benchmarks/deep_pages.py --patients 500000
+"""
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import common
+
+DEPTHS = (0, 1_000, 10_000, 100_000, 250_000, 500_000, 1_000_000, 5_000_000)
+
+
+def seed(patients: int) -> int:
+    import models
+
+    start = datetime(2020, 1, 1)
+    rows = [
+        {
+            "name": f"Patient {i}",
+            "email": f"patient{i}@example.com",
+            "phone": f"555{i:07d}",
+            "age": 20 + i % 60,
+            "gender": "f" if i % 2 else "m",
+            "created_at": start + timedelta(seconds=i * 37 % patients),
+            "updated_at": start,
+        }
+        for i in range(patients)
+    ]
+    return common.insert_rows(models.Patient, rows)
+
+
+async def measure(patients: int, limit: int, repeat: int, first_id: int) -> list:
+    from sqlalchemy import select
+    import models
+    from database import AsyncSessionLocal
+    from pagination import encode_cursor
+
+    Patient = models.Patient
+    rows = []
+    depths = [depth for depth in DEPTHS if depth < patients - limit] + [patients - limit]
+    async with AsyncSessionLocal() as db, common.asgi_client(common.admin_token()) as client:
+
+        async def fetch(query):
+            return (await db.scalars(query.execution_options(populate_existing=True))).all()
+
+        for depth in depths:
+            # The query the list endpoints ran before cursors
+            offset_page = select(Patient).order_by(Patient.id).offset(depth).limit(limit)
+            keyset_page = (
+                select(Patient)
+                .where(Patient.id > first_id + depth - 1)
+                .order_by(Patient.id)
+                .limit(limit + 1)
+            )
+            offset = await common.time_async_calls(lambda: fetch(offset_page), repeat)
+            keyset = await common.time_async_calls(lambda: fetch(keyset_page), repeat)
+
+            by_id = f"/api/patients/?limit={limit}"
+            by_created_at = f"/api/patients/?limit={limit}&sort=-created_at"
+            if depth:
+                by_id += "&cursor=" + encode_cursor({"sort": "id", "after": first_id + depth - 1})
+                last = (
+                    await db.execute(
+                        select(Patient.created_at, Patient.id)
+                        .order_by(Patient.created_at.desc(), Patient.id.desc())
+                        .offset(depth - 1)
+                        .limit(1)
+                    )
+                ).one()
+                by_created_at += "&cursor=" + encode_cursor(
+                    {"sort": "-created_at", "after": [last.created_at, last.id]}
+                )
+            cursor_id = await common.time_async_calls(lambda: common.get_ok(client, by_id), repeat)
+            cursor_created_at = await common.time_async_calls(
+                lambda: common.get_ok(client, by_created_at), repeat
+            )
+            rows.append(
+                {
+                    "depth": depth,
+                    "offset_sql_p50_ms": offset["p50_ms"],
+                    "keyset_sql_p50_ms": keyset["p50_ms"],
+                    "api_cursor_id_p50_ms": cursor_id["p50_ms"],
+                    "api_cursor_created_at_p50_ms": cursor_created_at["p50_ms"],
+                }
+            )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--patients", type=int, default=500_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    arguments = parser.parse_args()
+
+    common.configure(arguments.database_url)
+    first_id = seed(arguments.patients)
+    common.print_table(
+        asyncio.run(measure(arguments.patients, arguments.limit, arguments.repeat, first_id))
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Cost of serializing list pages per 1,000 rows: the validated path (ORM
+instances checked against the Page[...] response model, then JSONResponse)
+against the FAST_LIST_RESPONSES path (schema columns only, straight to an
+ORJSONResponse), through paginate() and GET /api/patients/ end to end.
+
+    python benchmarks/list_serialization.py --patients 20000 --page 500
+"""
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import random
+import time
+import common
+
+
+def seed(patients: int, rng: random.Random) -> None:
+    import models
+
+    now = datetime.utcnow()
+    common.insert_rows(
+        models.Patient,
+        [
+            {
+                "name": f"Patient {i}",
+                "email": f"patient{i}@mail.org",
+                "phone": f"555{i:07d}",
+                "age": rng.randrange(1, 95),
+                "gender": rng.choice("fm"),
+                "medical_history": "Hypertension, managed with medication" if rng.random() < 0.5 else None,
+                "created_at": now - timedelta(days=rng.randrange(365)),
+                "updated_at": now,
+            }
+            for i in range(patients)
+        ],
+    )
+
+
+def patients_route():
+    from fastapi.routing import APIRoute
+    from main import app
+
+    for route in app.routes:
+        if isinstance(route, APIRoute) and route.path == "/api/patients/" and "GET" in route.methods:
+            return route
+    raise RuntimeError("GET /api/patients/ not found")
+
+
+async def paths(page_size: int, repeat: int) -> list:
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from sqlalchemy import select
+    import models
+    import schemas
+    from config import settings
+    from database import AsyncSessionLocal
+    from pagination import PageParams, paginate
+
+    field = patients_route().response_field
+    page = PageParams(cursor=None, limit=page_size, include_total=False)
+    per_thousand = 1000 / page_size
+    timings = {"validated": {"paginate": [], "serialize": []}, "fast": {"paginate": [], "serialize": []}}
+    bodies = {}
+
+    async with AsyncSessionLocal() as db:
+
+        async def validated():
+            settings.fast_list_responses = False
+            began = time.perf_counter()
+            content = await paginate(db, select(models.Patient), models.Patient.id, page, schema=schemas.PatientResponse)
+            fetched = time.perf_counter()
+            body = JSONResponse(await serialize_response(field=field, response_content=content, is_coroutine=True)).body
+            return fetched - began, time.perf_counter() - fetched, body
+
+        async def fast():
+            settings.fast_list_responses = True
+            # The ORJSONResponse renders its body when paginate builds it
+            began = time.perf_counter()
+            response = await paginate(db, select(models.Patient), models.Patient.id, page, schema=schemas.PatientResponse)
+            return time.perf_counter() - began, 0.0, response.body
+
+        try:
+            # Paths take turns so drift over the run affects them alike
+            for i in range(repeat + 10):
+                for name, run in (("validated", validated), ("fast", fast)):
+                    fetched, serialized, bodies[name] = await run()
+                    # Drop loaded rows so each page is read from the database
+                    db.expunge_all()
+                    if i >= 10:
+                        timings[name]["paginate"].append(fetched)
+                        timings[name]["serialize"].append(serialized)
+        finally:
+            settings.fast_list_responses = False
+
+    if bodies["validated"] != bodies["fast"]:
+        raise RuntimeError("validated and fast responses differ")
+
+    rows = []
+    for name, timing in timings.items():
+        paginated, serialized = (sum(values) / len(values) * 1000 * per_thousand for values in timing.values())
+        rows.append(
+            {
+                "path": name,
+                "paginate_ms_per_1000": round(paginated, 2),
+                "serialize_ms_per_1000": round(serialized, 2),
+                "total_ms_per_1000": round(paginated + serialized, 2),
+            }
+        )
+    return rows
+
+
+async def endpoint(page_size: int, repeat: int) -> list:
+    from config import settings
+
+    path = f"/api/patients/?limit={page_size}"
+    latencies = {False: [], True: []}
+    try:
+        async with common.asgi_client(common.admin_token()) as client:
+            for i in range(repeat + 10):
+                for fast in latencies:
+                    settings.fast_list_responses = fast
+                    began = time.perf_counter()
+                    await common.get_ok(client, path)
+                    if i >= 10:
+                        latencies[fast].append(time.perf_counter() - began)
+    finally:
+        settings.fast_list_responses = False
+
+    rows = []
+    for fast, values in latencies.items():
+        summary = common.summarize(values, 0)
+        rows.append(
+            {
+                "GET /api/patients/": "fast" if fast else "validated",
+                "rows": page_size,
+                "mean_ms": round(sum(values) / len(values) * 1000, 2),
+                "ms_per_1000_rows": round(sum(values) / len(values) * 1000 * 1000 / page_size, 2),
+                "p50_ms": summary["p50_ms"],
+                "p99_ms": summary["p99_ms"],
+            }
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--patients", type=int, default=20_000)
+    parser.add_argument("--page", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=10)
+    arguments = parser.parse_args()
+
+    common.configure(arguments.database_url)
+    seed(arguments.patients, random.Random(arguments.seed))
+    common.print_table(asyncio.run(paths(arguments.page, arguments.repeat)))
+    print()
+    common.print_table(asyncio.run(endpoint(arguments.page, arguments.repeat)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Successful logins per second (and per core) through POST /api/auth/login,
+with bcrypt verification in the password hashing process pool, while
+/health is polled to show the event loop stays responsive.
+
+    python benchmarks/logins.py --users 1000 --concurrency 8 --duration 30
+"""
+import argparse
+import asyncio
+import os
+import time
+import common
+
+PASSWORD = "Benchmark-Password-1"
+
+
+def seed(users: int) -> None:
+    from datetime import datetime, timedelta
+    import models
+    from utils import hash_password
+
+    # bcrypt cost is in the hash, so one hash serves every user
+    password_hash = hash_password(PASSWORD)
+    common.insert_rows(
+        models.User,
+        [
+            {
+                "email": f"user{i}@hospital.org",
+                "name": f"User {i}",
+                "role": "nurse",
+                "password_hash": password_hash,
+                "first_login": False,
+                "password_expires_at": datetime.utcnow() + timedelta(days=90),
+            }
+            for i in range(users)
+        ],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--workers", type=int, default=1)
+    arguments = parser.parse_args()
+
+    common.configure(arguments.database_url)
+    seed(arguments.users)
+
+    def login(rng):
+        email = f"user{rng.randrange(arguments.users)}@hospital.org"
+        return "POST", "/api/auth/login", {"email": email, "password": PASSWORD}
+
+    async def probe(base_url):
+        # Ten polls a second, so the probe itself takes no CPU from bcrypt
+        import httpx
+
+        latencies = []
+        async with httpx.AsyncClient(base_url=base_url) as client:
+            await asyncio.sleep(2.0)
+            for _ in range(int(arguments.duration * 10)):
+                began = time.perf_counter()
+                await common.get_ok(client, "/health")
+                latencies.append(time.perf_counter() - began)
+                await asyncio.sleep(0.1)
+        return common.summarize(latencies, arguments.duration)
+
+    async def run(base_url):
+        return await asyncio.gather(
+            common.http_load(base_url, None, login, arguments.concurrency, arguments.duration),
+            probe(base_url),
+        )
+
+    with common.server(workers=arguments.workers) as base_url:
+        logins, probes = asyncio.run(run(base_url))
+    cores = os.cpu_count() or 1
+    common.print_table(
+        [
+            {"load": "login", "cores": cores, "rps_per_core": round(logins["rps"] / cores, 1), **logins},
+            {"load": "/health", "cores": cores, "rps_per_core": "", **probes},
+        ]
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Patient search on a synthetic population whose names follow a skewed
+distribution, so a few surnames are very common: the first search, which
+loads the in-process trigram index on SQLite, and how long it stalls the
+event loop; selective and common-name queries through
+GET /api/patients/search; and a bulk import indexed incrementally.
+
+    python benchmarks/search_latency.py --patients 200000
+"""
+from datetime import datetime
+import argparse
+import asyncio
+import json
+import random
+import time
+import common
+
+FIRST_NAMES = [
+    "maria", "john", "james", "mary", "robert", "linda", "michael", "sarah", "david", "elena",
+    "william", "fatima", "richard", "aisha", "joseph", "nora", "thomas", "amina", "charles", "sofia",
+    "daniel", "lucia", "matthew", "ingrid", "anthony", "chen", "mark", "yuki", "paul", "priya",
+]
+LAST_NAMES = [
+    "smith", "johnson", "garcia", "williams", "brown", "jones", "miller", "davis", "rodriguez", "martinez",
+    "hernandez", "lopez", "wilson", "anderson", "thomas", "taylor", "moore", "jackson", "martin", "lee",
+    "okafor", "nakamura", "kowalski", "haddad", "lindqvist", "moreau", "castellanos", "fitzgerald",
+    "abernathy", "vasquez", "oyelaran", "pemberton", "szymanski", "thorvaldsen", "quiroga", "delacroix",
+]
+
+
+def zipf_weights(count: int):
+    return [1 / rank for rank in range(1, count + 1)]
+
+
+def generate(count: int, rng: random.Random, offset: int = 0):
+    """Synthetic patients; the first names on each list are the most common"""
+    first = rng.choices(FIRST_NAMES, zipf_weights(len(FIRST_NAMES)), k=count)
+    last = rng.choices(LAST_NAMES, zipf_weights(len(LAST_NAMES)), k=count)
+    for i in range(count):
+        number = offset + i
+        yield {
+            "name": f"{first[i].title()} {last[i].title()}",
+            "email": f"{first[i]}.{last[i]}{number}@mail.org",
+            "phone": f"555{number:07d}",
+            "age": rng.randrange(1, 95),
+            "gender": rng.choice("fm"),
+        }
+
+
+def seed(patients: int, rng: random.Random) -> list:
+    """Insert the patients and return their emails"""
+    import models
+
+    now = datetime.utcnow()
+    rows = [{**patient, "created_at": now, "updated_at": now} for patient in generate(patients, rng)]
+    common.insert_rows(models.Patient, rows)
+    return [row["email"] for row in rows]
+
+
+async def first_search(client) -> dict:
+    """Time the search that loads the index while measuring event loop stalls"""
+    stalls = []
+    searching = True
+
+    async def watch():
+        while searching:
+            began = time.perf_counter()
+            await asyncio.sleep(0.005)
+            stalls.append(time.perf_counter() - began - 0.005)
+
+    watcher = asyncio.create_task(watch())
+    began = time.perf_counter()
+    await common.get_ok(client, "/api/patients/search?q=smith")
+    elapsed = time.perf_counter() - began
+    searching = False
+    await watcher
+    return {"first_search_s": round(elapsed, 2), "longest_loop_stall_ms": round(max(stalls) * 1000, 1)}
+
+
+async def measure(emails: list, repeat: int, imported: int, rng: random.Random):
+    async with common.asgi_client(common.admin_token()) as client:
+        load = await first_search(client)
+
+        queries = {
+            "email prefix": lambda: rng.choice(emails).split("@")[0],
+            "phone digits": lambda: f"{rng.randrange(len(emails)):07d}"[:5],
+            "rare full name": lambda: f"{rng.choice(FIRST_NAMES[-5:])} {rng.choice(LAST_NAMES[-8:])}",
+            "rare surname": lambda: rng.choice(LAST_NAMES[-8:]),
+            "common full name": lambda: f"{rng.choice(FIRST_NAMES[:3])} {rng.choice(LAST_NAMES[:3])}",
+            "common surname": lambda: rng.choice(LAST_NAMES[:3]),
+            "common prefix": lambda: rng.choice(FIRST_NAMES[:2])[:3],
+        }
+        rows = []
+        for kind, query in queries.items():
+            search = lambda: common.get_ok(client, f"/api/patients/search?q={query()}&limit=20")
+            rows.append({"query": kind, **await common.time_async_calls(search, repeat)})
+
+        body = "".join(json.dumps(patient) + "\n" for patient in generate(imported, rng, offset=len(emails)))
+        began = time.perf_counter()
+        response = await client.post("/api/patients/import?format=ndjson", content=body)
+        import_s = time.perf_counter() - began
+        if response.status_code != 200 or response.json()["inserted"] != imported:
+            raise RuntimeError(f"import failed: {response.status_code} {response.text[:200]}")
+        last = json.loads(body.splitlines()[-1])
+        found = (await common.get_ok(client, f"/api/patients/search?q={last['email'].split('@')[0]}")).json()
+        if not found or found[0]["email"] != last["email"]:
+            raise RuntimeError("imported patient not found by search")
+    return load, rows, {"imported": imported, "import_and_index_s": round(import_s, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--patients", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--imported", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=21)
+    arguments = parser.parse_args()
+
+    rng = random.Random(arguments.seed)
+    common.configure(arguments.database_url)
+    emails = seed(arguments.patients, rng)
+    load, rows, imported = asyncio.run(measure(emails, arguments.repeat, arguments.imported, rng))
+    common.print_table([load])
+    print()
+    common.print_table(rows)
+    print()
+    common.print_table([imported])
+
+
+if __name__ == "__main__":
+    main()
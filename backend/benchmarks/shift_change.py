@@ -0,0 +1,134 @@
+"""
+A shift change: the outgoing shift clocks out while the incoming shift
+clocks in, all at once and with every punch sent several times, against
+employees with a year of closed shifts each. Reports punches/s and latency,
+checks that exactly one punch per employee succeeded and no employee is
+left with two open shifts, and times the open shift lookup the punches
+used to run (LIKE on today's clock_in_time) against the indexed one.
+
+    python benchmarks/shift_change.py --employees 2000 --history-days 365
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import common
+
+
+def seed(employees: int, history_days: int) -> int:
+    import models
+
+    now = datetime.utcnow()
+    first_id = common.insert_rows(
+        models.Employee,
+        [
+            {"phone": f"555{i:07d}", "salary": 50000, "status": "active", "hire_date": now, "created_at": now}
+            for i in range(employees)
+        ],
+    )
+    history = []
+    for i in range(employees):
+        for day in range(1, history_days + 1):
+            clock_in = now - timedelta(days=day, hours=i % 24)
+            history.append(
+                {
+                    "employee_id": first_id + i,
+                    "clock_in_time": clock_in,
+                    "clock_out_time": clock_in + timedelta(hours=8),
+                    "worked_hours": 8,
+                    "overtime_hours": 0,
+                    "created_at": clock_in,
+                }
+            )
+    # The outgoing shift (even employees) is still clocked in
+    history.extend(
+        {
+            "employee_id": first_id + i,
+            "clock_in_time": now - timedelta(hours=8),
+            "clock_out_time": None,
+            "worked_hours": 0,
+            "overtime_hours": 0,
+            "created_at": now,
+        }
+        for i in range(0, employees, 2)
+    )
+    common.insert_rows(models.ClockRecord, history)
+    return first_id
+
+
+async def burst(employees: int, first_id: int, duplicates: int, concurrency: int) -> dict:
+    punches = [
+        ("POST", "/api/employees/clock-out" if i % 2 == 0 else "/api/employees/clock-in", {"employee_id": first_id + i})
+        for i in range(employees)
+        for _ in range(duplicates)
+    ]
+    async with common.asgi_client(common.admin_token()) as client:
+        summary, statuses = await common.send_all(client, punches, concurrency)
+    if statuses != {200: employees, 400: employees * (duplicates - 1)}:
+        raise RuntimeError(f"expected one accepted punch per employee, got {dict(statuses)}")
+    return {"punches": len(punches), **summary, "accepted": statuses[200], "rejected": statuses[400]}
+
+
+def check_open_shifts(employees: int, first_id: int) -> None:
+    from sqlalchemy import select
+    import models
+    from database import SessionLocal
+
+    with SessionLocal() as db:
+        open_shifts = Counter(
+            db.scalars(select(models.ClockRecord.employee_id).where(models.ClockRecord.clock_out_time.is_(None)))
+        )
+    expected = {first_id + i: 1 for i in range(1, employees, 2)}
+    if open_shifts != expected:
+        raise RuntimeError("open shifts after the burst are not exactly the incoming shift")
+
+
+def lookups(employees: int, first_id: int, repeat: int) -> list:
+    from sqlalchemy import select
+    import models
+    from database import SessionLocal
+    from routers.employees import open_shift_query
+
+    ClockRecord = models.ClockRecord
+    with SessionLocal() as db:
+
+        def run(query_of):
+            counter = iter(range(repeat))
+            return lambda: db.scalar(query_of(first_id + next(counter) % employees))
+
+        def today_like(employee_id):
+            # The lookup clock_in and clock_out ran before the open shift index
+            return select(ClockRecord).filter(
+                ClockRecord.employee_id == employee_id,
+                ClockRecord.clock_in_time.like(datetime.utcnow().strftime("%Y-%m-%d%")),
+                ClockRecord.clock_out_time.is_(None),
+            )
+
+        return [
+            {"lookup": "clock_in_time LIKE today", **common.time_calls(run(today_like), repeat)},
+            {"lookup": "open shift index", **common.time_calls(run(open_shift_query), repeat)},
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--history-days", type=int, default=365)
+    parser.add_argument("--duplicates", type=int, default=3, help="times each punch is sent")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=2000)
+    arguments = parser.parse_args()
+
+    common.configure(arguments.database_url)
+    first_id = seed(arguments.employees, arguments.history_days)
+    common.print_table(lookups(arguments.employees, first_id, arguments.repeat))
+    print()
+    common.print_table(
+        [asyncio.run(burst(arguments.employees, first_id, arguments.duplicates, arguments.concurrency))]
+    )
+    check_open_shifts(arguments.employees, first_id)
+
+
+if __name__ == "__main__":
+    main()
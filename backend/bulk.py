@@ -0,0 +1,80 @@
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, List, Literal
+import csv
+import json
+
+BulkFormat = Literal["csv", "ndjson"]
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into decoded lines without buffering the whole body"""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig") + "\n"
+    if buffer:
+        yield buffer.decode("utf-8-sig")
+
+
+async def iter_csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[dict]:
+    """Yield CSV rows as dicts keyed by the header row"""
+    header = None
+    record = ""
+    async for line in iter_lines(chunks):
+        record += line
+        # A quoted field may contain newlines; wait until quotes are balanced
+        if record.count('"') % 2:
+            continue
+        values = next(csv.reader([record]), [])
+        record = ""
+        if not values:
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        # CSV has no null; treat empty cells as missing values
+        yield {name: value if value != "" else None for name, value in zip(header, values)}
+
+
+async def iter_ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator:
+    """
+    Yield one decoded JSON value per non-blank line. Malformed lines are
+    yielded as their ValueError so callers can report them per row.
+    """
+    async for line in iter_lines(chunks):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                yield exc
+
+
+def iter_records(chunks: AsyncIterator[bytes], fmt: BulkFormat) -> AsyncIterator:
+    if fmt == "csv":
+        return iter_csv_records(chunks)
+    return iter_ndjson_records(chunks)
+
+
+async def bulk_insert(db: AsyncSession, model, rows: List[dict]):
+    """
+    Insert rows in one round trip: COPY on PostgreSQL (asyncpg), a batched
+    INSERT everywhere else. Rows must carry every column to be written,
+    since COPY skips Python-side column defaults.
+    """
+    if not rows:
+        return
+
+    connection = await db.connection()
+    if connection.dialect.driver == "asyncpg":
+        columns = list(rows[0])
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            model.__tablename__,
+            records=[tuple(row[column] for column in columns) for row in rows],
+            columns=columns,
+        )
+    else:
+        await db.execute(insert(model), rows)
@@ -0,0 +1,201 @@
+from collections import Counter, OrderedDict
+from fastapi import Response
+from pydantic import TypeAdapter
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import functools
+import time
+from config import settings
+
+KEY_PREFIX = "hms"
+
+
+class MemoryBackend:
+    """In-process LRU with per-entry TTL"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        # Kept apart from the LRU so an eviction can never roll a version back
+        self._counters = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [await self.get(key) for key in keys]
+
+    async def set_many(self, values: Dict[str, bytes], ttl: int):
+        for key, value in values.items():
+            await self.set(key, value, ttl)
+
+    async def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    async def get_counters(self, keys: List[str]) -> List[int]:
+        return [self._counters.get(key, 0) for key in keys]
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+
+class RedisBackend:
+    """Redis (or any server speaking its protocol), shared by all workers"""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        await self._client.set(key, value, ex=ttl)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return await self._client.mget(keys) if keys else []
+
+    async def set_many(self, values: Dict[str, bytes], ttl: int):
+        async with self._client.pipeline(transaction=False) as pipe:
+            for key, value in values.items():
+                pipe.set(key, value, ex=ttl)
+            await pipe.execute()
+
+    async def get_counter(self, key: str) -> int:
+        return int(await self._client.get(key) or 0)
+
+    async def get_counters(self, keys: List[str]) -> List[int]:
+        return [int(value or 0) for value in await self.get_many(keys)]
+
+    async def incr(self, key: str) -> int:
+        return await self._client.incr(key)
+
+
+class ResponseCache:
+    """
+    Read-through cache of encoded JSON response bodies, grouped into
+    namespaces. Every cache key embeds its namespace's version, and writers
+    bump the version after committing. A reader that loaded data before the
+    write stores it under the old version, so no read that starts after a
+    write completes can see pre-write data.
+    """
+
+    def __init__(self, backend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = Counter()
+        self.misses = Counter()
+
+    def _version_key(self, namespace: str) -> str:
+        return f"{KEY_PREFIX}:{namespace}:version"
+
+    def _cache_key(self, namespace: str, version: int, key: str) -> str:
+        return f"{KEY_PREFIX}:{namespace}:{version}:{key}"
+
+    def _count(self, counter: Counter, namespace: str, amount: int = 1):
+        # Namespaces like "availability:12" are counted under "availability"
+        counter[namespace.split(":", 1)[0]] += amount
+
+    async def get_or_load(
+        self,
+        namespace: str,
+        key: str,
+        load: Callable[[], Awaitable[bytes]],
+        ttl: Optional[int] = None,
+    ) -> Response:
+        version = await self.version(namespace)
+        cache_key = self._cache_key(namespace, version, key)
+
+        body = await self.backend.get(cache_key)
+        if body is not None:
+            self._count(self.hits, namespace)
+        else:
+            self._count(self.misses, namespace)
+            body = await load()
+            await self.backend.set(cache_key, body, ttl or self.ttl)
+
+        return Response(content=body, media_type="application/json")
+
+    async def get_many_or_load(
+        self,
+        entries: List[Tuple[str, str]],
+        load: Callable[[List[Tuple[str, str]]], Awaitable[Dict[Tuple[str, str], bytes]]],
+    ) -> Dict[Tuple[str, str], bytes]:
+        """
+        Values for many (namespace, key) entries with one round of backend
+        calls; load receives the missing entries and returns their values.
+        """
+        namespaces = sorted({namespace for namespace, _ in entries})
+        counters = await self.backend.get_counters([self._version_key(ns) for ns in namespaces])
+        versions = dict(zip(namespaces, counters))
+        cache_keys = [self._cache_key(ns, versions[ns], key) for ns, key in entries]
+
+        values = dict(zip(entries, await self.backend.get_many(cache_keys)))
+        missing = [entry for entry in entries if values[entry] is None]
+        for entry in entries:
+            self._count(self.misses if values[entry] is None else self.hits, entry[0])
+
+        if missing:
+            loaded = await load(missing)
+            values.update(loaded)
+            await self.backend.set_many(
+                {self._cache_key(ns, versions[ns], key): loaded[(ns, key)] for ns, key in missing},
+                self.ttl,
+            )
+        return values
+
+    async def version(self, namespace: str) -> int:
+        return await self.backend.get_counter(self._version_key(namespace))
+
+    async def invalidate(self, namespace: str) -> int:
+        """Drop every cached entry of namespace and return its new version"""
+        return await self.backend.incr(self._version_key(namespace))
+
+    def stats(self) -> dict:
+        namespaces = sorted(set(self.hits) | set(self.misses))
+        return {
+            "backend": type(self.backend).__name__,
+            "namespaces": {
+                namespace: {"hits": self.hits[namespace], "misses": self.misses[namespace]}
+                for namespace in namespaces
+            },
+        }
+
+
+@functools.lru_cache(maxsize=None)
+def get_type_adapter(response_model) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+
+def encode_response(content, response_model) -> bytes:
+    """JSON body FastAPI would send for content under response_model"""
+    if isinstance(content, Response):
+        return content.body
+    adapter = get_type_adapter(response_model)
+    return adapter.dump_json(adapter.validate_python(content))
+
+
+def create_backend():
+    if settings.cache_backend == "redis":
+        return RedisBackend(settings.cache_url)
+    return MemoryBackend(settings.cache_max_entries)
+
+
+response_cache = ResponseCache(create_backend(), ttl=settings.cache_ttl_seconds)
@@ -0,0 +1,376 @@
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import case, cast, delete, func, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Iterable, List, Literal, Optional, Tuple
+import argparse
+import asyncio
+import html
+import logging
+import math
+import re
+import models
+from config import settings
+from database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+Document = models.SearchDocument
+Term = models.SearchTerm
+
+# Indexed text of each source: model, text columns, column holding the patient id
+SOURCES = {
+    "patient": (models.Patient, ("medical_history",), "id"),
+    "lab_record": (models.LabRecord, ("test_name", "test_type", "result"), "patient_id"),
+    "medical_record": (models.MedicalRecord, ("diagnosis", "treatment", "notes"), "patient_id"),
+}
+
+SearchSource = Literal["patient", "lab_record", "medical_record"]
+
+WORD = re.compile(r"[0-9a-z]+")
+
+# Dropped by the local index, roughly like the english text search configuration
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or the to was were with".split()
+)
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+# Match delimiters asked of ts_headline; they cannot survive html.escape, so
+# once the snippet is escaped they are the only source of markup
+MATCH_START = "\x02"
+MATCH_STOP = "\x03"
+SNIPPET_WORDS = 30
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return [word for word in WORD.findall((text or "").lower()) if word not in STOP_WORDS]
+
+
+def document_body(source: str, record) -> str:
+    _, fields, _ = SOURCES[source]
+    return "\n".join(value for value in (getattr(record, field) for field in fields) if value)
+
+
+def uses_tsvector(db: AsyncSession) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def text_config():
+    return cast(literal(settings.search_text_config), postgresql.REGCONFIG)
+
+
+async def index_records(db: AsyncSession, source: str, records: Iterable):
+    """
+    Upsert the search documents of records in the caller's transaction.
+    Records without any text lose their document.
+    """
+    _, _, patient_field = SOURCES[source]
+    rows = []
+    empty = []
+    now = datetime.utcnow()
+    for record in records:
+        body = document_body(source, record)
+        if body:
+            rows.append(
+                {
+                    "source": source,
+                    "source_id": record.id,
+                    "patient_id": getattr(record, patient_field),
+                    "body": body,
+                    "updated_at": now,
+                }
+            )
+        else:
+            empty.append(record.id)
+
+    if empty:
+        await remove_records(db, source, empty)
+    if not rows:
+        return
+
+    dialect = postgresql if uses_tsvector(db) else sqlite
+    statement = upsert_documents(dialect, rows)
+    if dialect is postgresql:
+        await db.execute(statement)
+        return
+
+    # Local inverted index: replace the postings of every upserted document
+    documents = await db.execute(statement.returning(Document.id, Document.body))
+    postings = []
+    document_ids = []
+    for document_id, body in documents:
+        document_ids.append(document_id)
+        postings.extend(
+            {"term": term, "document_id": document_id, "frequency": frequency}
+            for term, frequency in Counter(tokenize(body)).items()
+        )
+    await db.execute(delete(Term).where(Term.document_id.in_(document_ids)))
+    if postings:
+        await db.execute(sqlite.insert(Term), postings)
+
+
+def upsert_documents(dialect, rows: List[dict]):
+    """
+    INSERT ... ON CONFLICT DO UPDATE of document rows. On PostgreSQL the
+    search vector is computed in the inserted values, so a new document is
+    searchable as well as a replaced one.
+    """
+    if dialect is postgresql:
+        rows = [{**row, "search_vector": func.to_tsvector(text_config(), row["body"])} for row in rows]
+    statement = dialect.insert(Document).values(rows)
+    updates = {
+        "patient_id": statement.excluded.patient_id,
+        "body": statement.excluded.body,
+        "updated_at": statement.excluded.updated_at,
+    }
+    if dialect is postgresql:
+        updates["search_vector"] = statement.excluded.search_vector
+    return statement.on_conflict_do_update(
+        index_elements=[Document.source, Document.source_id], set_=updates
+    )
+
+
+async def remove_records(db: AsyncSession, source: str, source_ids: List[int]):
+    """Drop the search documents of deleted records"""
+    documents = select(Document.id).where(
+        Document.source == source, Document.source_id.in_(source_ids)
+    )
+    await db.execute(delete(Term).where(Term.document_id.in_(documents)))
+    await db.execute(
+        delete(Document).where(Document.source == source, Document.source_id.in_(source_ids))
+    )
+
+
+def mark_matches(snippet: str) -> str:
+    """HTML of a ts_headline snippet: the text escaped, matches wrapped in <mark>"""
+    return (
+        html.escape(snippet)
+        .replace(MATCH_START, HIGHLIGHT_START)
+        .replace(MATCH_STOP, HIGHLIGHT_STOP)
+    )
+
+
+def highlight(body: str, terms: set) -> str:
+    """
+    HTML window of the body around the first matched word: the text
+    escaped, matches wrapped in <mark>
+    """
+    words = list(WORD.finditer(body.lower()))
+    first = next((i for i, word in enumerate(words) if word.group() in terms), 0)
+    start = max(first - SNIPPET_WORDS // 3, 0)
+    window = words[start : start + SNIPPET_WORDS]
+    if not window:
+        return ""
+
+    parts = []
+    position = window[0].start()
+    for word in window:
+        parts.append(html.escape(body[position : word.start()]))
+        text = html.escape(body[word.start() : word.end()])
+        parts.append(f"{HIGHLIGHT_START}{text}{HIGHLIGHT_STOP}" if word.group() in terms else text)
+        position = word.end()
+    snippet = "".join(parts)
+    if start > 0:
+        snippet = "... " + snippet
+    if window[-1].end() < len(body.rstrip()):
+        snippet += " ..."
+    return snippet
+
+
+async def search_tsvector(db: AsyncSession, q: str, conditions: list, offset: int, limit: int):
+    query = func.websearch_to_tsquery(text_config(), q)
+    rank = func.ts_rank_cd(Document.search_vector, query)
+    matches = select(Document.id).where(Document.search_vector.bool_op("@@")(query), *conditions)
+
+    page = (
+        matches.add_columns(rank.label("rank"))
+        .order_by(rank.desc(), Document.id)
+        .offset(offset)
+        .limit(limit)
+        .subquery()
+    )
+    # ts_headline re-parses the body, so it only runs on the page's rows
+    snippet = func.ts_headline(
+        text_config(),
+        Document.body,
+        query,
+        f"StartSel={MATCH_START}, StopSel={MATCH_STOP}, "
+        f"MaxWords={SNIPPET_WORDS}, MinWords=10",
+    )
+    rows = await db.execute(
+        select(Document, page.c.rank, snippet)
+        .join(page, page.c.id == Document.id)
+        .order_by(page.c.rank.desc(), Document.id)
+    )
+    return matches, [(document, rank, mark_matches(snippet)) for document, rank, snippet in rows]
+
+
+async def search_terms(db: AsyncSession, q: str, conditions: list, offset: int, limit: int):
+    """
+    Rank documents holding every query term by the sum of term frequency
+    times inverse document frequency, from the local inverted index.
+    """
+    terms = sorted(set(tokenize(q)))
+    if not terms:
+        return None, []
+
+    documents = await db.scalar(select(func.count()).select_from(Document))
+    frequencies = await db.execute(
+        select(Term.term, func.count()).where(Term.term.in_(terms)).group_by(Term.term)
+    )
+    frequencies = dict(frequencies.all())
+    if len(frequencies) < len(terms):
+        return None, []
+    weight = case(
+        {term: math.log(1 + documents / frequency) for term, frequency in frequencies.items()},
+        value=Term.term,
+    )
+    rank = func.sum(Term.frequency * weight)
+    matches = (
+        select(Term.document_id)
+        .join(Document, Document.id == Term.document_id)
+        .where(Term.term.in_(terms), *conditions)
+        .group_by(Term.document_id)
+        .having(func.count() == len(terms))
+    )
+
+    ranked = (
+        await db.execute(
+            matches.add_columns(rank.label("rank"))
+            .order_by(rank.desc(), Term.document_id)
+            .offset(offset)
+            .limit(limit)
+        )
+    ).all()
+    by_id = {
+        document.id: document
+        for document in await db.scalars(
+            select(Document).where(Document.id.in_([document_id for document_id, _ in ranked]))
+        )
+    }
+    term_set = set(terms)
+    return matches, [
+        (by_id[document_id], rank, highlight(by_id[document_id].body, term_set))
+        for document_id, rank in ranked
+    ]
+
+
+async def search(
+    db: AsyncSession,
+    q: str,
+    offset: int,
+    limit: int,
+    source: Optional[str] = None,
+    patient_id: Optional[int] = None,
+    include_total: bool = False,
+) -> Tuple[List[dict], Optional[int]]:
+    """One page of documents matching q, best first, with highlighted snippets"""
+    conditions = []
+    if source is not None:
+        conditions.append(Document.source == source)
+    if patient_id is not None:
+        conditions.append(Document.patient_id == patient_id)
+
+    run = search_tsvector if uses_tsvector(db) else search_terms
+    matches, rows = await run(db, q, conditions, offset, limit)
+    total = None
+    if include_total:
+        total = 0
+        if matches is not None:
+            total = await db.scalar(select(func.count()).select_from(matches.subquery()))
+
+    hits = [
+        {
+            "source": document.source,
+            "source_id": document.source_id,
+            "patient_id": document.patient_id,
+            "rank": float(rank),
+            "snippet": snippet,
+        }
+        for document, rank, snippet in rows
+    ]
+    return hits, total
+
+
+async def index_chunk(source: str, start: int, stop: int) -> int:
+    """Index the records of source with ids in [start, stop) in their own transaction"""
+    model = SOURCES[source][0]
+    async with AsyncSessionLocal() as db:
+        records = (
+            await db.scalars(select(model).where(model.id >= start, model.id < stop))
+        ).all()
+        await index_records(db, source, records)
+        await db.commit()
+    return len(records)
+
+
+async def index_new_records(source: str, after_id: int) -> int:
+    """Index records of source created after after_id, such as a bulk import"""
+    model = SOURCES[source][0]
+    async with AsyncSessionLocal() as db:
+        last_id = await db.scalar(select(func.max(model.id)))
+    indexed = 0
+    chunk_size = settings.search_rebuild_chunk_size
+    for start in range(after_id + 1, (last_id or 0) + 1, chunk_size):
+        indexed += await index_chunk(source, start, start + chunk_size)
+    return indexed
+
+
+async def rebuild(
+    workers: Optional[int] = None, chunk_size: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    Reindex every source from scratch. Id ranges of chunk_size records are
+    indexed by concurrent workers, each chunk in its own transaction, so
+    search keeps answering from the previous documents meanwhile. Documents
+    not touched by the rebuild belong to deleted records and are removed
+    at the end.
+    """
+    workers = workers or settings.search_rebuild_workers
+    chunk_size = chunk_size or settings.search_rebuild_chunk_size
+    started_at = datetime.utcnow()
+
+    chunks: asyncio.Queue = asyncio.Queue()
+    async with AsyncSessionLocal() as db:
+        if not uses_tsvector(db):
+            # SQLite has a single writer; more workers only wait on its lock
+            workers = 1
+        for source, (model, _, _) in SOURCES.items():
+            bounds = await db.execute(select(func.min(model.id), func.max(model.id)))
+            first_id, last_id = bounds.one()
+            if first_id is not None:
+                for start in range(first_id, last_id + 1, chunk_size):
+                    chunks.put_nowait((source, start, start + chunk_size))
+
+    indexed = Counter({source: 0 for source in SOURCES})
+
+    async def worker():
+        while not chunks.empty():
+            source, start, stop = chunks.get_nowait()
+            indexed[source] += await index_chunk(source, start, stop)
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+
+    async with AsyncSessionLocal() as db:
+        stale = select(Document.id).where(Document.updated_at < started_at)
+        await db.execute(delete(Term).where(Term.document_id.in_(stale)))
+        removed = await db.execute(delete(Document).where(Document.updated_at < started_at))
+        await db.commit()
+
+    logger.info(
+        "Search index rebuilt: %s, %s stale documents removed", dict(indexed), removed.rowcount
+    )
+    return {**indexed, "removed": removed.rowcount}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clinical search index maintenance")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    arguments = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    print(asyncio.run(rebuild(arguments.workers, arguments.chunk_size)))
@@ -0,0 +1,92 @@
+from collections import OrderedDict
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from typing import Optional
+import hashlib
+import time
+from config import settings
+from utils import verify_token
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+class ClaimsCache:
+    """
+    LRU of verified JWT claims keyed by the token's SHA-256 digest. Entries
+    are served until the token's own `exp`, so a cached token never outlives
+    its signature check.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self._key(token)
+        claims = self._entries.get(key)
+        if claims is None:
+            return None
+
+        if claims["exp"] <= time.time():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return claims
+
+    def put(self, token: str, claims: dict):
+        key = self._key(token)
+        self._entries[key] = claims
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+claims_cache = ClaimsCache(settings.auth_claims_cache_size)
+
+
+async def get_optional_claims(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+) -> Optional[dict]:
+    """Verified claims of the bearer token, or None when no token was sent"""
+    if credentials is None:
+        return None
+
+    token = credentials.credentials
+    claims = claims_cache.get(token)
+    if claims is None:
+        claims = verify_token(token)
+        if claims is None or "exp" not in claims:
+            raise HTTPException(
+                status_code=401,
+                detail="Invalid or expired token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        claims_cache.put(token, claims)
+    return claims
+
+
+async def get_current_claims(claims: Optional[dict] = Depends(get_optional_claims)) -> dict:
+    """Verified claims of the bearer token; no database access"""
+    if claims is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return claims
+
+
+def require_roles(*roles: str):
+    """Dependency that only admits tokens whose `role` claim is one of roles"""
+
+    async def check_role(claims: dict = Depends(get_current_claims)) -> dict:
+        if claims.get("role") not in roles:
+            raise HTTPException(status_code=403, detail="Insufficient permissions")
+        return claims
+
+    return check_role
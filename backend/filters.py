@@ -0,0 +1,144 @@
+from datetime import datetime, timezone
+from fastapi import Query
+from sqlalchemy import Column
+from typing import Callable, List, Literal, Optional, Tuple
+import inspect
+import json
+import keyword
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Timestamps are stored as naive UTC"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def is_indexed(column: Column) -> bool:
+    """Whether a full (not partial) index leads with the column"""
+    if column.primary_key or column.index or column.unique:
+        return True
+    for index in column.table.indexes:
+        partial = index.dialect_kwargs.get("postgresql_where") is not None
+        if not partial and list(index.columns)[0] is column:
+            return True
+    return False
+
+
+def parameter(name: str, annotation) -> inspect.Parameter:
+    # Query parameters named like Python keywords (from) need another argument name
+    argument = f"{name}_" if keyword.iskeyword(name) else name
+    return inspect.Parameter(
+        argument,
+        inspect.Parameter.KEYWORD_ONLY,
+        default=Query(None, alias=name),
+        annotation=Optional[annotation],
+    )
+
+
+def normalize(value):
+    return to_naive_utc(value) if isinstance(value, datetime) else value
+
+
+class Eq:
+    """
+    `?name=value` matching the column exactly. `parse` turns the given
+    value into its stored spelling, raising an HTTPException if invalid.
+    """
+
+    def __init__(self, column: Column, name: Optional[str] = None, parse: Optional[Callable] = None):
+        self.column = column
+        self.name = name or column.key
+        self.parse = parse
+
+    def parameters(self) -> List[inspect.Parameter]:
+        return [parameter(self.name, self.column.type.python_type)]
+
+    def conditions(self, values: dict) -> list:
+        value = values[self.name]
+        if value is None:
+            return []
+        if self.parse is not None:
+            # Stored back so the cache key uses the same spelling
+            value = values[self.name] = self.parse(value)
+        return [self.column == value]
+
+
+class Range:
+    """`?<column>_from=&<column>_to=` selecting the half-open range [from, to)"""
+
+    def __init__(self, column: Column, lower: Optional[str] = None, upper: Optional[str] = None):
+        self.column = column
+        self.lower = lower or f"{column.key}_from"
+        self.upper = upper or f"{column.key}_to"
+
+    def parameters(self) -> List[inspect.Parameter]:
+        python_type = self.column.type.python_type
+        return [parameter(self.lower, python_type), parameter(self.upper, python_type)]
+
+    def conditions(self, values: dict) -> list:
+        conditions = []
+        if values[self.lower] is not None:
+            conditions.append(self.column >= values[self.lower])
+        if values[self.upper] is not None:
+            conditions.append(self.column < values[self.upper])
+        return conditions
+
+
+class ListQuery:
+    """Validated filters and sort order of one list request"""
+
+    def __init__(self, conditions: list, sort: Tuple[Column, bool], values: dict):
+        self.conditions = conditions
+        self.sort_column, self.descending = sort
+        self.values = values
+
+    def apply(self, query):
+        return query.filter(*self.conditions) if self.conditions else query
+
+    @property
+    def cache_key(self) -> str:
+        return json.dumps(self.values, sort_keys=True, default=str)
+
+
+class ListFilters:
+    """
+    Declarative filters and sort keys of a list endpoint, used as a
+    dependency: `filters: ListQuery = Depends(ListFilters(Eq(...), ...))`.
+    Each filter adds optional query parameters, typed from its column, and
+    `sort` accepts one of sort_keys, `-` prefixed for descending order.
+    Sort keys must be columns with a full index, so every page is an
+    index range scan whichever order is requested.
+    """
+
+    def __init__(self, *filters, sort_keys: Tuple[Column, ...] = ()):
+        self.filters = filters
+        self.sort_keys = {}
+        for column in sort_keys:
+            if not is_indexed(column):
+                raise ValueError(f"Cannot sort by {column}: it has no index")
+            self.sort_keys[column.key] = (column, False)
+            self.sort_keys[f"-{column.key}"] = (column, True)
+
+        parameters = [p for f in filters for p in f.parameters()]
+        self.names = {p.name: p.default.alias for p in parameters}
+        if self.sort_keys:
+            choices = list(self.sort_keys)
+            parameters.append(
+                inspect.Parameter(
+                    "sort",
+                    inspect.Parameter.KEYWORD_ONLY,
+                    default=Query(None),
+                    annotation=Optional[Literal[tuple(choices)]],
+                )
+            )
+        # FastAPI reads the query parameters from this signature
+        self.__signature__ = inspect.Signature(parameters, return_annotation=ListQuery)
+
+    async def __call__(self, sort: Optional[str] = None, **arguments) -> ListQuery:
+        values = {self.names[argument]: normalize(value) for argument, value in arguments.items()}
+        conditions = [c for f in self.filters for c in f.conditions(values)]
+        used = {name: value for name, value in values.items() if value is not None}
+        if sort:
+            used["sort"] = sort
+        return ListQuery(conditions, self.sort_keys.get(sort, (None, False)), used)
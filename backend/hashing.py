@@ -0,0 +1,62 @@
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException
+from typing import Optional
+import asyncio
+from config import settings
+from utils import hash_password, verify_password, generate_universal_password
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a dedicated process pool so hashing never blocks the event
+    loop. At most `max_pending` calls may be queued or running; beyond that
+    callers get a 503 instead of piling up behind the pool.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._universal_hash: Optional[str] = None
+
+    async def _run(self, fn, *args):
+        if self._pending >= self.max_pending:
+            raise HTTPException(
+                status_code=503,
+                detail="Authentication service is busy. Please retry shortly.",
+                headers={"Retry-After": "1"},
+            )
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run(verify_password, password, password_hash)
+
+    async def get_universal_password_hash(self) -> str:
+        """Hash of the universal password, computed once per process"""
+        if self._universal_hash is None:
+            self._universal_hash = await self.hash(generate_universal_password())
+        return self._universal_hash
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+)
@@ -1,12 +1,26 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from database import Base, engine
-from routers import auth, patients, employees, appointments, lab, pharmacy, inventory, cleaning, reminders
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from cache import response_cache
+from database import async_engine, get_db, get_pool_status
+from hashing import password_hasher
+from scheduler import scheduler
+from routers import auth, patients, employees, appointments, lab, pharmacy, inventory, cleaning, reminders, alerts, search, payroll, analytics
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Hash the universal password before the first request needs it
+    await password_hasher.get_universal_password_hash()
+    scheduler.start()
+    yield
+    await scheduler.stop()
+    password_hasher.shutdown()
+    await async_engine.dispose()
 
-app = FastAPI(title="Hospital Management System", version="1.0.0")
+
+app = FastAPI(title="Hospital Management System", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -27,6 +41,10 @@ app.include_router(pharmacy.router, prefix="/api/pharmacy", tags=["Pharmacy"])
 app.include_router(inventory.router, prefix="/api/inventory", tags=["Inventory"])
 app.include_router(cleaning.router, prefix="/api/cleaning", tags=["Cleaning"])
 app.include_router(reminders.router, prefix="/api/reminders", tags=["Reminders"])
+app.include_router(alerts.router, prefix="/api/alerts", tags=["Alerts"])
+app.include_router(search.router, prefix="/api/search", tags=["Search"])
+app.include_router(payroll.router, prefix="/api/payroll", tags=["Payroll"])
+app.include_router(analytics.router, prefix="/api/analytics", tags=["Analytics"])
 
 
 @app.get("/")
@@ -39,6 +57,25 @@ def health_check():
     return {"status": "ok"}
 
 
+@app.get("/health/db")
+async def database_health_check(db: AsyncSession = Depends(get_db)):
+    """Database connectivity and connection pool usage"""
+    await db.execute(text("SELECT 1"))
+    return {"status": "ok", "pool": get_pool_status()}
+
+
+@app.get("/health/cache")
+def cache_stats():
+    """Hit and miss counters of the reference data cache"""
+    return response_cache.stats()
+
+
+@app.get("/health/jobs")
+def job_stats():
+    """Run counts and timings of the background jobs"""
+    return scheduler.stats()
+
+
 if __name__ == "__main__":
     import uvicorn
 
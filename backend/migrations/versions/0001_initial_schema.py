@@ -0,0 +1,203 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 04:00:49.429453
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('inventory',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('item_name', sa.String(), nullable=True),
+    sa.Column('category', sa.String(), nullable=True),
+    sa.Column('quantity', sa.Integer(), nullable=True),
+    sa.Column('unit_price', sa.Float(), nullable=True),
+    sa.Column('reorder_level', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_inventory_id'), 'inventory', ['id'], unique=False)
+    op.create_table('patients',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('phone', sa.String(), nullable=True),
+    sa.Column('age', sa.Integer(), nullable=True),
+    sa.Column('gender', sa.String(), nullable=True),
+    sa.Column('medical_history', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(), nullable=True),
+    sa.Column('updated_at', sa.TIMESTAMP(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_patients_id'), 'patients', ['id'], unique=False)
+    op.create_table('pharmacy',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('medicine_name', sa.String(), nullable=True),
+    sa.Column('quantity', sa.Integer(), nullable=True),
+    sa.Column('unit_price', sa.Float(), nullable=True),
+    sa.Column('expiry_date', sa.TIMESTAMP(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_pharmacy_id'), 'pharmacy', ['id'], unique=False)
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('password_hash', sa.String(), nullable=True),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('role', sa.String(), nullable=True),
+    sa.Column('first_login', sa.Boolean(), nullable=True),
+    sa.Column('password_changed_at', sa.TIMESTAMP(), nullable=True),
+    sa.Column('password_expires_at', sa.TIMESTAMP(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(), nullable=True),
+    sa.Column('updated_at', sa.TIMESTAMP(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_table('appointments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('patient_id', sa.Integer(), nullable=True),
+    sa.Column('doctor_id', sa.Integer(), nullable=True),
+    sa.Column('appointment_date', sa.TIMESTAMP(), nullable=True),
+    sa.Column('appointment_time', sa.String(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('reason', sa.String(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('reminder_sent', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(), nullable=True),
+    sa.ForeignKeyConstraint(['doctor_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_appointments_id'), 'appointments', ['id'], unique=False)
+    op.create_table('employees',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('phone', sa.String(), nullable=True),
+    sa.Column('salary', sa.Float(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('hire_date', sa.TIMESTAMP(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_employees_id'), 'employees', ['id'], unique=False)
+    op.create_table('lab_records',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('patient_id', sa.Integer(), nullable=True),
+    sa.Column('test_name', sa.String(), nullable=True),
+    sa.Column('test_type', sa.String(), nullable=True),
+    sa.Column('result', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(), nullable=True),
+    sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_lab_records_id'), 'lab_records', ['id'], unique=False)
+    op.create_table('medical_records',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('patient_id', sa.Integer(), nullable=True),
+    sa.Column('doctor_id', sa.Integer(), nullable=True),
+    sa.Column('diagnosis', sa.String(), nullable=True),
+    sa.Column('treatment', sa.Text(), nullable=True),
+    sa.Column('prescription', sa.Text(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(), nullable=True),
+    sa.ForeignKeyConstraint(['doctor_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_medical_records_id'), 'medical_records', ['id'], unique=False)
+    op.create_table('cleaning_logs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cleaner_id', sa.Integer(), nullable=True),
+    sa.Column('area_type', sa.String(), nullable=True),
+    sa.Column('area_name', sa.String(), nullable=True),
+    sa.Column('cleaning_date', sa.TIMESTAMP(), nullable=True),
+    sa.Column('duration_minutes', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(), nullable=True),
+    sa.ForeignKeyConstraint(['cleaner_id'], ['employees.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_cleaning_logs_id'), 'cleaning_logs', ['id'], unique=False)
+    op.create_table('clock_records',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('employee_id', sa.Integer(), nullable=True),
+    sa.Column('clock_in_time', sa.TIMESTAMP(), nullable=True),
+    sa.Column('clock_out_time', sa.TIMESTAMP(), nullable=True),
+    sa.Column('worked_hours', sa.Float(), nullable=True),
+    sa.Column('overtime_hours', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(), nullable=True),
+    sa.ForeignKeyConstraint(['employee_id'], ['employees.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_clock_records_id'), 'clock_records', ['id'], unique=False)
+    op.create_table('payment_requests',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('employee_id', sa.Integer(), nullable=True),
+    sa.Column('base_salary', sa.Float(), nullable=True),
+    sa.Column('overtime_pay', sa.Float(), nullable=True),
+    sa.Column('total_amount', sa.Float(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('month', sa.String(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(), nullable=True),
+    sa.ForeignKeyConstraint(['employee_id'], ['employees.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_payment_requests_id'), 'payment_requests', ['id'], unique=False)
+    op.create_table('reminders',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('patient_id', sa.Integer(), nullable=True),
+    sa.Column('appointment_id', sa.Integer(), nullable=True),
+    sa.Column('reminder_type', sa.String(), nullable=True),
+    sa.Column('message', sa.Text(), nullable=True),
+    sa.Column('scheduled_time', sa.TIMESTAMP(), nullable=True),
+    sa.Column('sent', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(), nullable=True),
+    sa.ForeignKeyConstraint(['appointment_id'], ['appointments.id'], ),
+    sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_reminders_id'), 'reminders', ['id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_reminders_id'), table_name='reminders')
+    op.drop_table('reminders')
+    op.drop_index(op.f('ix_payment_requests_id'), table_name='payment_requests')
+    op.drop_table('payment_requests')
+    op.drop_index(op.f('ix_clock_records_id'), table_name='clock_records')
+    op.drop_table('clock_records')
+    op.drop_index(op.f('ix_cleaning_logs_id'), table_name='cleaning_logs')
+    op.drop_table('cleaning_logs')
+    op.drop_index(op.f('ix_medical_records_id'), table_name='medical_records')
+    op.drop_table('medical_records')
+    op.drop_index(op.f('ix_lab_records_id'), table_name='lab_records')
+    op.drop_table('lab_records')
+    op.drop_index(op.f('ix_employees_id'), table_name='employees')
+    op.drop_table('employees')
+    op.drop_index(op.f('ix_appointments_id'), table_name='appointments')
+    op.drop_table('appointments')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    op.drop_index(op.f('ix_pharmacy_id'), table_name='pharmacy')
+    op.drop_table('pharmacy')
+    op.drop_index(op.f('ix_patients_id'), table_name='patients')
+    op.drop_table('patients')
+    op.drop_index(op.f('ix_inventory_id'), table_name='inventory')
+    op.drop_table('inventory')
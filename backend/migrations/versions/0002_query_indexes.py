@@ -0,0 +1,52 @@
+"""query indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 04:01:12.702724
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Foreign key lookups
+    op.create_index(op.f('ix_employees_user_id'), 'employees', ['user_id'], unique=False)
+    op.create_index(op.f('ix_appointments_patient_id'), 'appointments', ['patient_id'], unique=False)
+    op.create_index(op.f('ix_lab_records_patient_id'), 'lab_records', ['patient_id'], unique=False)
+    op.create_index(op.f('ix_medical_records_patient_id'), 'medical_records', ['patient_id'], unique=False)
+    op.create_index(op.f('ix_payment_requests_employee_id'), 'payment_requests', ['employee_id'], unique=False)
+    op.create_index(op.f('ix_cleaning_logs_cleaner_id'), 'cleaning_logs', ['cleaner_id'], unique=False)
+
+    # Doctor schedule and clock record history
+    op.create_index('ix_appointments_doctor_id_appointment_date', 'appointments', ['doctor_id', 'appointment_date'], unique=False)
+    op.create_index('ix_clock_records_employee_id_clock_in_time', 'clock_records', ['employee_id', 'clock_in_time'], unique=False)
+
+    # Partial indexes for the open shift, pending reminder and low stock filters
+    op.create_index('ix_clock_records_open_shift', 'clock_records', ['employee_id'], unique=False,
+                    postgresql_where=sa.text('clock_out_time IS NULL'), sqlite_where=sa.text('clock_out_time IS NULL'))
+    op.create_index('ix_reminders_pending_patient', 'reminders', ['patient_id'], unique=False,
+                    postgresql_where=sa.text('sent = false'), sqlite_where=sa.text('sent = false'))
+    op.create_index('ix_inventory_low_stock', 'inventory', ['id'], unique=False,
+                    postgresql_where=sa.text('quantity < reorder_level'), sqlite_where=sa.text('quantity < reorder_level'))
+    op.create_index(op.f('ix_pharmacy_quantity'), 'pharmacy', ['quantity'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_pharmacy_quantity'), table_name='pharmacy')
+    op.drop_index('ix_inventory_low_stock', table_name='inventory')
+    op.drop_index('ix_reminders_pending_patient', table_name='reminders')
+    op.drop_index('ix_clock_records_open_shift', table_name='clock_records')
+    op.drop_index('ix_clock_records_employee_id_clock_in_time', table_name='clock_records')
+    op.drop_index('ix_appointments_doctor_id_appointment_date', table_name='appointments')
+    op.drop_index(op.f('ix_cleaning_logs_cleaner_id'), table_name='cleaning_logs')
+    op.drop_index(op.f('ix_payment_requests_employee_id'), table_name='payment_requests')
+    op.drop_index(op.f('ix_medical_records_patient_id'), table_name='medical_records')
+    op.drop_index(op.f('ix_lab_records_patient_id'), table_name='lab_records')
+    op.drop_index(op.f('ix_appointments_patient_id'), table_name='appointments')
+    op.drop_index(op.f('ix_employees_user_id'), table_name='employees')
@@ -0,0 +1,40 @@
+"""unique open shift per employee
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 04:12:37.118204
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The old date-matching lookup could leave shifts from earlier days open.
+    # Close all but the newest open shift per employee with zero hours worked.
+    op.execute(
+        """
+        UPDATE clock_records
+        SET clock_out_time = clock_in_time, worked_hours = 0, overtime_hours = 0
+        WHERE clock_out_time IS NULL
+          AND id NOT IN (
+              SELECT max(id) FROM clock_records
+              WHERE clock_out_time IS NULL
+              GROUP BY employee_id
+          )
+        """
+    )
+    op.drop_index('ix_clock_records_open_shift', table_name='clock_records')
+    op.create_index('ix_clock_records_open_shift', 'clock_records', ['employee_id'], unique=True,
+                    postgresql_where=sa.text('clock_out_time IS NULL'), sqlite_where=sa.text('clock_out_time IS NULL'))
+
+
+def downgrade():
+    op.drop_index('ix_clock_records_open_shift', table_name='clock_records')
+    op.create_index('ix_clock_records_open_shift', 'clock_records', ['employee_id'], unique=False,
+                    postgresql_where=sa.text('clock_out_time IS NULL'), sqlite_where=sa.text('clock_out_time IS NULL'))
@@ -0,0 +1,28 @@
+"""per-medicine reorder level
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 06:41:09.532817
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing medicines keep the old fixed threshold of 10
+    op.add_column('pharmacy', sa.Column('reorder_level', sa.Integer(), server_default='10', nullable=False))
+    op.drop_index('ix_pharmacy_quantity', table_name='pharmacy')
+    op.create_index('ix_pharmacy_low_stock', 'pharmacy', ['id'], unique=False,
+                    postgresql_where=sa.text('quantity < reorder_level'), sqlite_where=sa.text('quantity < reorder_level'))
+
+
+def downgrade():
+    op.drop_index('ix_pharmacy_low_stock', table_name='pharmacy')
+    op.create_index('ix_pharmacy_quantity', 'pharmacy', ['quantity'], unique=False)
+    op.drop_column('pharmacy', 'reorder_level')
@@ -0,0 +1,31 @@
+"""pharmacy status sweep indexes
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 07:16:49.197660
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_pharmacy_unexpired_expiry_date', 'pharmacy', ['expiry_date'], unique=False,
+                    postgresql_where=sa.text("status != 'expired'"), sqlite_where=sa.text("status != 'expired'"))
+    op.create_index('ix_pharmacy_out_of_stock_pending', 'pharmacy', ['id'], unique=False,
+                    postgresql_where=sa.text("status = 'available' AND quantity <= 0"),
+                    sqlite_where=sa.text("status = 'available' AND quantity <= 0"))
+    op.create_index('ix_pharmacy_restocked_pending', 'pharmacy', ['id'], unique=False,
+                    postgresql_where=sa.text("status = 'out_of_stock' AND quantity > 0"),
+                    sqlite_where=sa.text("status = 'out_of_stock' AND quantity > 0"))
+
+
+def downgrade():
+    op.drop_index('ix_pharmacy_restocked_pending', table_name='pharmacy')
+    op.drop_index('ix_pharmacy_out_of_stock_pending', table_name='pharmacy')
+    op.drop_index('ix_pharmacy_unexpired_expiry_date', table_name='pharmacy')
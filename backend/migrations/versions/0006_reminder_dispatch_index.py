@@ -0,0 +1,23 @@
+"""pending reminders by scheduled time
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 08:02:55.604113
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_reminders_pending_scheduled_time', 'reminders', ['scheduled_time'], unique=False,
+                    postgresql_where=sa.text('sent = false'), sqlite_where=sa.text('sent = false'))
+
+
+def downgrade():
+    op.drop_index('ix_reminders_pending_scheduled_time', table_name='reminders')
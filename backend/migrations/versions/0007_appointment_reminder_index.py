@@ -0,0 +1,23 @@
+"""appointments pending reminders
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 08:47:21.339160
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_appointments_reminder_pending', 'appointments', ['appointment_date', 'id'], unique=False,
+                    postgresql_where=sa.text('reminder_sent = false'), sqlite_where=sa.text('reminder_sent = false'))
+
+
+def downgrade():
+    op.drop_index('ix_appointments_reminder_pending', table_name='appointments')
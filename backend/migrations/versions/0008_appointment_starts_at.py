@@ -0,0 +1,91 @@
+"""typed appointment start and duration
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 10:05:43.871420
+"""
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime
+
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+# Same formats the API accepts for appointment_time
+TIME_FORMATS = ("%H:%M", "%H:%M:%S", "%I:%M %p", "%I:%M%p")
+
+
+def combine(appointment_date, appointment_time):
+    if appointment_date is None:
+        return None
+    if isinstance(appointment_date, str):
+        appointment_date = datetime.fromisoformat(appointment_date)
+    for time_format in TIME_FORMATS:
+        try:
+            time_of_day = datetime.strptime((appointment_time or "").strip(), time_format).time()
+        except ValueError:
+            continue
+        return datetime.combine(appointment_date.date(), time_of_day)
+    return appointment_date
+
+
+def backfill_starts_at():
+    """Fill starts_at in id-ordered batches so no single statement holds the whole table"""
+    connection = op.get_bind()
+    appointments = sa.table(
+        'appointments',
+        sa.column('id', sa.Integer),
+        sa.column('appointment_date', sa.TIMESTAMP),
+        sa.column('appointment_time', sa.String),
+        sa.column('starts_at', sa.TIMESTAMP),
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(appointments.c.id, appointments.c.appointment_date, appointments.c.appointment_time)
+            .where(appointments.c.id > last_id)
+            .order_by(appointments.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        updates = [
+            {'row_id': row.id, 'starts_at': combine(row.appointment_date, row.appointment_time)}
+            for row in rows
+        ]
+        connection.execute(
+            appointments.update()
+            .where(appointments.c.id == sa.bindparam('row_id'))
+            .values(starts_at=sa.bindparam('starts_at')),
+            updates,
+        )
+        last_id = rows[-1].id
+
+
+def upgrade():
+    op.add_column('appointments', sa.Column('starts_at', sa.TIMESTAMP(), nullable=True))
+    op.add_column('appointments', sa.Column('duration_minutes', sa.Integer(), server_default='30', nullable=False))
+    backfill_starts_at()
+    op.drop_index('ix_appointments_doctor_id_appointment_date', table_name='appointments')
+    op.drop_index('ix_appointments_reminder_pending', table_name='appointments')
+    op.create_index(op.f('ix_appointments_starts_at'), 'appointments', ['starts_at'], unique=False)
+    op.create_index('ix_appointments_doctor_id_starts_at', 'appointments', ['doctor_id', 'starts_at'], unique=False)
+    op.create_index('ix_appointments_reminder_pending', 'appointments', ['starts_at', 'id'], unique=False,
+                    postgresql_where=sa.text('reminder_sent = false'), sqlite_where=sa.text('reminder_sent = false'))
+
+
+def downgrade():
+    op.drop_index('ix_appointments_reminder_pending', table_name='appointments')
+    op.drop_index('ix_appointments_doctor_id_starts_at', table_name='appointments')
+    op.drop_index(op.f('ix_appointments_starts_at'), table_name='appointments')
+    op.create_index('ix_appointments_reminder_pending', 'appointments', ['appointment_date', 'id'], unique=False,
+                    postgresql_where=sa.text('reminder_sent = false'), sqlite_where=sa.text('reminder_sent = false'))
+    op.create_index('ix_appointments_doctor_id_appointment_date', 'appointments', ['doctor_id', 'appointment_date'],
+                    unique=False)
+    op.drop_column('appointments', 'duration_minutes')
+    op.drop_column('appointments', 'starts_at')
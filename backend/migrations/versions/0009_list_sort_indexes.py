@@ -0,0 +1,28 @@
+"""indexes for list sort keys
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 11:42:07.318254
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(op.f('ix_patients_created_at'), 'patients', ['created_at'], unique=False)
+    op.create_index(op.f('ix_lab_records_created_at'), 'lab_records', ['created_at'], unique=False)
+    op.create_index(op.f('ix_cleaning_logs_cleaning_date'), 'cleaning_logs', ['cleaning_date'], unique=False)
+    op.create_index(op.f('ix_reminders_scheduled_time'), 'reminders', ['scheduled_time'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_reminders_scheduled_time'), table_name='reminders')
+    op.drop_index(op.f('ix_cleaning_logs_cleaning_date'), table_name='cleaning_logs')
+    op.drop_index(op.f('ix_lab_records_created_at'), table_name='lab_records')
+    op.drop_index(op.f('ix_patients_created_at'), table_name='patients')
@@ -0,0 +1,29 @@
+"""trigram indexes for patient search
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 12:31:16.402957
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+COLUMNS = ('name', 'email', 'phone')
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in COLUMNS:
+        op.create_index(f'ix_patients_{column}_trgm', 'patients', [column], unique=False,
+                        postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'})
+
+
+def downgrade():
+    for column in reversed(COLUMNS):
+        op.drop_index(f'ix_patients_{column}_trgm', table_name='patients')
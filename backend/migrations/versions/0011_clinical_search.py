@@ -0,0 +1,54 @@
+"""clinical full-text search documents
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 13:20:44.915302
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'search_documents',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('source', sa.String(), nullable=False),
+        sa.Column('source_id', sa.Integer(), nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=True),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column('search_vector', sa.Text().with_variant(postgresql.TSVECTOR(), 'postgresql'), nullable=True),
+        sa.Column('updated_at', sa.TIMESTAMP(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_search_documents_id'), 'search_documents', ['id'], unique=False)
+    op.create_index(op.f('ix_search_documents_patient_id'), 'search_documents', ['patient_id'], unique=False)
+    op.create_index('ix_search_documents_source_source_id', 'search_documents', ['source', 'source_id'],
+                    unique=True)
+    op.create_index('ix_search_documents_search_vector', 'search_documents', ['search_vector'], unique=False,
+                    postgresql_using='gin')
+    op.create_table(
+        'search_terms',
+        sa.Column('term', sa.String(), nullable=False),
+        sa.Column('document_id', sa.Integer(), nullable=False),
+        sa.Column('frequency', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['document_id'], ['search_documents.id']),
+        sa.PrimaryKeyConstraint('term', 'document_id'),
+    )
+    op.create_index(op.f('ix_search_terms_document_id'), 'search_terms', ['document_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_search_terms_document_id'), table_name='search_terms')
+    op.drop_table('search_terms')
+    op.drop_index('ix_search_documents_search_vector', table_name='search_documents')
+    op.drop_index('ix_search_documents_source_source_id', table_name='search_documents')
+    op.drop_index(op.f('ix_search_documents_patient_id'), table_name='search_documents')
+    op.drop_index(op.f('ix_search_documents_id'), table_name='search_documents')
+    op.drop_table('search_documents')
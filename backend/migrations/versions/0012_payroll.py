@@ -0,0 +1,27 @@
+"""payroll run indexes
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18 14:02:38.120846
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_clock_records_clock_in_time', 'clock_records', ['clock_in_time'], unique=False)
+    op.create_index('ix_payment_requests_employee_id_month', 'payment_requests', ['employee_id', 'month'],
+                    unique=True)
+    op.create_index('ix_payment_requests_month_status', 'payment_requests', ['month', 'status'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_payment_requests_month_status', table_name='payment_requests')
+    op.drop_index('ix_payment_requests_employee_id_month', table_name='payment_requests')
+    op.drop_index('ix_clock_records_clock_in_time', table_name='clock_records')
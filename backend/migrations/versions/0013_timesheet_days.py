@@ -0,0 +1,33 @@
+"""timesheet daily rollups
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-18 15:21:07.493518
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0013'
+down_revision = '0012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'timesheet_days',
+        sa.Column('employee_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('worked_hours', sa.Float(), nullable=False),
+        sa.Column('overtime_hours', sa.Float(), nullable=False),
+        sa.Column('shifts', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['employee_id'], ['employees.id']),
+        sa.PrimaryKeyConstraint('employee_id', 'day'),
+    )
+    op.create_index('ix_timesheet_days_day', 'timesheet_days', ['day'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_timesheet_days_day', table_name='timesheet_days')
+    op.drop_table('timesheet_days')
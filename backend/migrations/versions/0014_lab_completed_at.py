@@ -0,0 +1,24 @@
+"""lab record completion time
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-18 16:05:52.631940
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0014'
+down_revision = '0013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('lab_records', sa.Column('completed_at', sa.TIMESTAMP(), nullable=True))
+    op.create_index(op.f('ix_lab_records_completed_at'), 'lab_records', ['completed_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_lab_records_completed_at'), table_name='lab_records')
+    op.drop_column('lab_records', 'completed_at')
@@ -0,0 +1,38 @@
+"""match SQLite partial index predicates to the queries
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-18 17:12:40.318205
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0015'
+down_revision = '0014'
+branch_labels = None
+depends_on = None
+
+# SQLite only uses a partial index when the query repeats its predicate, and
+# SQLAlchemy renders `column == False` there as `column = 0`, not `= false`
+INDEXES = (
+    ('ix_reminders_pending_patient', 'reminders', ['patient_id'], 'sent'),
+    ('ix_reminders_pending_scheduled_time', 'reminders', ['scheduled_time'], 'sent'),
+    ('ix_appointments_reminder_pending', 'appointments', ['starts_at', 'id'], 'reminder_sent'),
+)
+
+
+def recreate(false):
+    for name, table, columns, flag in INDEXES:
+        op.drop_index(name, table_name=table)
+        op.create_index(name, table, columns, unique=False, sqlite_where=sa.text(f'{flag} = {false}'))
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        recreate('0')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        recreate('false')
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text, TIMESTAMP
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, ForeignKey, Text, TIMESTAMP, Index, and_
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -26,7 +27,7 @@ class Employee(Base):
     __tablename__ = "employees"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     phone = Column(String)
     salary = Column(Float)
     status = Column(String, default="active")  # active, inactive
@@ -48,22 +49,32 @@ class Patient(Base):
     age = Column(Integer)
     gender = Column(String)
     medical_history = Column(Text)
-    created_at = Column(TIMESTAMP, default=datetime.utcnow)
+    created_at = Column(TIMESTAMP, default=datetime.utcnow, index=True)
     updated_at = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     appointments = relationship("Appointment", back_populates="patient")
     lab_records = relationship("LabRecord", back_populates="patient")
     medical_records = relationship("MedicalRecord", back_populates="patient")
 
+    __table_args__ = (
+        # Trigram indexes for patient search (plain indexes outside PostgreSQL)
+        Index("ix_patients_name_trgm", name, postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_patients_email_trgm", email, postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}),
+        Index("ix_patients_phone_trgm", phone, postgresql_using="gin", postgresql_ops={"phone": "gin_trgm_ops"}),
+    )
+
 
 class Appointment(Base):
     __tablename__ = "appointments"
 
     id = Column(Integer, primary_key=True, index=True)
-    patient_id = Column(Integer, ForeignKey("patients.id"))
+    patient_id = Column(Integer, ForeignKey("patients.id"), index=True)
     doctor_id = Column(Integer, ForeignKey("users.id"))
     appointment_date = Column(TIMESTAMP)
     appointment_time = Column(String)
+    # Typed start derived from appointment_date and appointment_time
+    starts_at = Column(TIMESTAMP, index=True)
+    duration_minutes = Column(Integer, default=30, server_default="30", nullable=False)
     status = Column(String, default="pending")  # pending, confirmed, completed, cancelled
     reason = Column(String)
     notes = Column(Text)
@@ -73,6 +84,19 @@ class Appointment(Base):
     patient = relationship("Patient", back_populates="appointments")
     doctor = relationship("User", back_populates="appointments")
 
+    __table_args__ = (
+        # Doctor schedule lookups
+        Index("ix_appointments_doctor_id_starts_at", doctor_id, starts_at),
+        # Keyset scan of appointments still waiting for reminders
+        Index(
+            "ix_appointments_reminder_pending",
+            starts_at,
+            id,
+            postgresql_where=reminder_sent == False,
+            sqlite_where=reminder_sent == False,
+        ),
+    )
+
 
 class ClockRecord(Base):
     __tablename__ = "clock_records"
@@ -87,12 +111,44 @@ class ClockRecord(Base):
 
     employee = relationship("Employee", back_populates="clock_records")
 
+    __table_args__ = (
+        # Clock record history per employee
+        Index("ix_clock_records_employee_id_clock_in_time", employee_id, clock_in_time),
+        # Shifts of a whole month for payroll runs
+        Index("ix_clock_records_clock_in_time", clock_in_time),
+        # Open shift lookup on clock in/out; at most one open shift per employee
+        Index(
+            "ix_clock_records_open_shift",
+            employee_id,
+            unique=True,
+            postgresql_where=clock_out_time.is_(None),
+            sqlite_where=clock_out_time.is_(None),
+        ),
+    )
+
+
+class TimesheetDay(Base):
+    """Hours of an employee's closed shifts, summed by the day they clocked in"""
+
+    __tablename__ = "timesheet_days"
+
+    employee_id = Column(Integer, ForeignKey("employees.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    worked_hours = Column(Float, nullable=False, default=0)
+    overtime_hours = Column(Float, nullable=False, default=0)
+    shifts = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # Department timesheets read every employee's rollups of a date range
+        Index("ix_timesheet_days_day", day),
+    )
+
 
 class PaymentRequest(Base):
     __tablename__ = "payment_requests"
 
     id = Column(Integer, primary_key=True, index=True)
-    employee_id = Column(Integer, ForeignKey("employees.id"))
+    employee_id = Column(Integer, ForeignKey("employees.id"), index=True)
     base_salary = Column(Float)
     overtime_pay = Column(Float, default=0)
     total_amount = Column(Float)
@@ -101,6 +157,12 @@ class PaymentRequest(Base):
     notes = Column(Text)
     created_at = Column(TIMESTAMP, default=datetime.utcnow)
 
+    __table_args__ = (
+        # One payment request per employee and month; payroll runs rely on it
+        Index("ix_payment_requests_employee_id_month", employee_id, month, unique=True),
+        Index("ix_payment_requests_month_status", month, status),
+    )
+
     employee = relationship("Employee", back_populates="payment_requests")
 
 
@@ -108,12 +170,14 @@ class LabRecord(Base):
     __tablename__ = "lab_records"
 
     id = Column(Integer, primary_key=True, index=True)
-    patient_id = Column(Integer, ForeignKey("patients.id"))
+    patient_id = Column(Integer, ForeignKey("patients.id"), index=True)
     test_name = Column(String)
     test_type = Column(String)
     result = Column(Text)
     status = Column(String, default="pending")  # pending, completed
-    created_at = Column(TIMESTAMP, default=datetime.utcnow)
+    created_at = Column(TIMESTAMP, default=datetime.utcnow, index=True)
+    # Set when the status becomes completed; lab turnaround is measured up to it
+    completed_at = Column(TIMESTAMP, nullable=True, index=True)
 
     patient = relationship("Patient", back_populates="lab_records")
 
@@ -122,7 +186,7 @@ class MedicalRecord(Base):
     __tablename__ = "medical_records"
 
     id = Column(Integer, primary_key=True, index=True)
-    patient_id = Column(Integer, ForeignKey("patients.id"))
+    patient_id = Column(Integer, ForeignKey("patients.id"), index=True)
     doctor_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     diagnosis = Column(String)
     treatment = Column(Text)
@@ -139,11 +203,42 @@ class Pharmacy(Base):
     id = Column(Integer, primary_key=True, index=True)
     medicine_name = Column(String)
     quantity = Column(Integer)
+    reorder_level = Column(Integer, default=10, server_default="10", nullable=False)
     unit_price = Column(Float)
     expiry_date = Column(TIMESTAMP)
     status = Column(String, default="available")  # available, out_of_stock, expired
     created_at = Column(TIMESTAMP, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Medicines below their reorder level
+        Index(
+            "ix_pharmacy_low_stock",
+            id,
+            postgresql_where=quantity < reorder_level,
+            sqlite_where=quantity < reorder_level,
+        ),
+        # Expiry lookups and the expiry sweep; swept rows leave the index
+        Index(
+            "ix_pharmacy_unexpired_expiry_date",
+            expiry_date,
+            postgresql_where=status != "expired",
+            sqlite_where=status != "expired",
+        ),
+        # Rows whose stock status the sweeper still has to flip
+        Index(
+            "ix_pharmacy_out_of_stock_pending",
+            id,
+            postgresql_where=and_(status == "available", quantity <= 0),
+            sqlite_where=and_(status == "available", quantity <= 0),
+        ),
+        Index(
+            "ix_pharmacy_restocked_pending",
+            id,
+            postgresql_where=and_(status == "out_of_stock", quantity > 0),
+            sqlite_where=and_(status == "out_of_stock", quantity > 0),
+        ),
+    )
+
 
 class Inventory(Base):
     __tablename__ = "inventory"
@@ -156,15 +251,25 @@ class Inventory(Base):
     reorder_level = Column(Integer)
     created_at = Column(TIMESTAMP, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Items below their reorder level
+        Index(
+            "ix_inventory_low_stock",
+            id,
+            postgresql_where=quantity < reorder_level,
+            sqlite_where=quantity < reorder_level,
+        ),
+    )
+
 
 class CleaningLog(Base):
     __tablename__ = "cleaning_logs"
 
     id = Column(Integer, primary_key=True, index=True)
-    cleaner_id = Column(Integer, ForeignKey("employees.id"), nullable=True)
+    cleaner_id = Column(Integer, ForeignKey("employees.id"), nullable=True, index=True)
     area_type = Column(String)  # washroom, ward, common_area
     area_name = Column(String)
-    cleaning_date = Column(TIMESTAMP)
+    cleaning_date = Column(TIMESTAMP, index=True)
     duration_minutes = Column(Integer)
     status = Column(String, default="completed")  # pending, in_progress, completed
     notes = Column(Text)
@@ -179,6 +284,53 @@ class Reminder(Base):
     appointment_id = Column(Integer, ForeignKey("appointments.id"), nullable=True)
     reminder_type = Column(String)  # appointment, medication, followup
     message = Column(Text)
-    scheduled_time = Column(TIMESTAMP)
+    scheduled_time = Column(TIMESTAMP, index=True)
     sent = Column(Boolean, default=False)
     created_at = Column(TIMESTAMP, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Pending reminders per patient
+        Index(
+            "ix_reminders_pending_patient",
+            patient_id,
+            postgresql_where=sent == False,
+            sqlite_where=sent == False,
+        ),
+        # Due reminder claims by the dispatcher
+        Index(
+            "ix_reminders_pending_scheduled_time",
+            scheduled_time,
+            postgresql_where=sent == False,
+            sqlite_where=sent == False,
+        ),
+    )
+
+
+class SearchDocument(Base):
+    """Searchable clinical text of one patient, lab record or medical record"""
+
+    __tablename__ = "search_documents"
+
+    id = Column(Integer, primary_key=True, index=True)
+    source = Column(String, nullable=False)  # patient, lab_record, medical_record
+    source_id = Column(Integer, nullable=False)
+    patient_id = Column(Integer, index=True)
+    body = Column(Text, nullable=False)
+    # Filled on PostgreSQL only; other databases use search_terms
+    search_vector = Column(Text().with_variant(TSVECTOR(), "postgresql"))
+    updated_at = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_search_documents_source_source_id", source, source_id, unique=True),
+        Index("ix_search_documents_search_vector", search_vector, postgresql_using="gin"),
+    )
+
+
+class SearchTerm(Base):
+    """Inverted index of search_documents for databases without tsvector"""
+
+    __tablename__ = "search_terms"
+
+    term = Column(String, primary_key=True)
+    document_id = Column(Integer, ForeignKey("search_documents.id"), primary_key=True, index=True)
+    frequency = Column(Integer, nullable=False)
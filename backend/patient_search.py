@@ -0,0 +1,237 @@
+from collections import defaultdict
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional, Set, Tuple
+import asyncio
+import heapq
+import math
+import re
+import models
+from config import settings
+
+Patient = models.Patient
+
+# Columns searched, in the order documents of the memory index hold them
+SEARCH_FIELDS = ("name", "email", "phone")
+
+# pg_trgm's default word_similarity_threshold, used by both backends
+WORD_SIMILARITY_THRESHOLD = 0.6
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+WORD = re.compile(r"[0-9a-z]+")
+
+
+def trigrams(text: Optional[str]) -> Set[str]:
+    """Trigrams of each alphanumeric word, padded like pg_trgm's"""
+    return {
+        padded[i : i + 3]
+        for padded in (f"  {word} " for word in WORD.findall((text or "").lower()))
+        for i in range(len(padded) - 2)
+    }
+
+
+def substring_trigrams(text: str) -> Set[str]:
+    """Unpadded trigrams, present in any string that contains text"""
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def word_match(column, q: str):
+    """`column %> q`: q is similar to some run of words in column (gin_trgm_ops indexable)"""
+    return column.op("%>", is_comparison=True)(q)
+
+
+async def search_postgres(db: AsyncSession, q: str, limit: int) -> List[Tuple[int, float]]:
+    """
+    Rank by pg_trgm word similarity plus a bonus for prefix matches. Every
+    branch of the WHERE clause is served by a gin_trgm_ops index, so the
+    candidates come from a bitmap OR of index scans.
+    """
+    prefix = f"{escape_like(q)}%"
+    contains = f"%{escape_like(q)}%"
+    prefix_match = or_(
+        Patient.name.ilike(prefix, escape="\\"), Patient.email.ilike(prefix, escape="\\")
+    )
+    conditions = [prefix_match, word_match(Patient.name, q), word_match(Patient.email, q)]
+    if len(q) >= 3:
+        conditions.append(Patient.phone.like(contains, escape="\\"))
+    rank = func.greatest(
+        func.word_similarity(q, Patient.name),
+        func.word_similarity(q, Patient.email),
+        case((Patient.phone.like(contains, escape="\\"), 1.0), else_=0.0),
+    ) + case((prefix_match, 1.0), else_=0.0)
+
+    rows = await db.execute(
+        select(Patient.id, rank.label("rank"))
+        .filter(or_(*conditions))
+        .order_by(rank.desc(), Patient.id)
+        .limit(limit)
+    )
+    return [(patient_id, rank) for patient_id, rank in rows]
+
+
+def document_of(patient) -> Tuple[str, ...]:
+    return tuple((getattr(patient, field) or "").lower() for field in SEARCH_FIELDS)
+
+
+def document_grams(document: Tuple[str, ...]) -> Set[str]:
+    name, email, phone = document
+    grams = trigrams(name) | trigrams(email)
+    return grams | {f"#{gram}" for gram in substring_trigrams(phone)}
+
+
+def prepare_documents(rows) -> List[Tuple[int, Tuple[str, ...], Set[str]]]:
+    """Documents and trigrams of patient rows; CPU bound, run in a worker thread"""
+    documents = []
+    for row in rows:
+        document = document_of(row)
+        documents.append((row.id, document, document_grams(document)))
+    return documents
+
+
+class MemoryPatientIndex:
+    """
+    In-process trigram index over patient name, email and phone for
+    databases without pg_trgm (SQLite). It approximates the PostgreSQL
+    ranking, is loaded on first search and kept current by the patients
+    router, so it only sees writes made by this process.
+
+    Trigram extraction, the bulk of loading, runs in a worker thread so
+    the event loop keeps serving other requests meanwhile. A full load
+    builds a separate index swapped in at the end; writes made while it
+    runs are queued and replayed on top of it.
+    """
+
+    def __init__(self):
+        self.documents: Dict[int, Tuple[str, ...]] = {}
+        self.postings: Dict[str, Set[int]] = defaultdict(set)
+        self.loaded = False
+        # Writes seen during a load: (patient id, document or None if removed)
+        self.pending: Optional[List[Tuple[int, Optional[Tuple[str, ...]]]]] = None
+        self.lock = asyncio.Lock()
+
+    def add(self, patient):
+        if self.loaded:
+            self.index_document(patient.id, document_of(patient))
+        elif self.pending is not None:
+            self.pending.append((patient.id, document_of(patient)))
+
+    def index_document(
+        self, patient_id: int, document: Tuple[str, ...], grams: Optional[Set[str]] = None
+    ):
+        self.remove(patient_id)
+        self.documents[patient_id] = document
+        postings = self.postings
+        for gram in document_grams(document) if grams is None else grams:
+            postings[gram].add(patient_id)
+
+    def index_rows(self, rows):
+        for patient_id, document, grams in prepare_documents(rows):
+            self.index_document(patient_id, document, grams)
+
+    def remove(self, patient_id: int):
+        if self.pending is not None:
+            self.pending.append((patient_id, None))
+        document = self.documents.pop(patient_id, None)
+        if document is None:
+            return
+        for gram in document_grams(document):
+            self.postings[gram].discard(patient_id)
+
+    def select_rows(self):
+        return select(Patient.id, *(getattr(Patient, field) for field in SEARCH_FIELDS))
+
+    async def ensure_loaded(self, db: AsyncSession):
+        async with self.lock:
+            if self.loaded:
+                return
+            self.pending = []
+            try:
+                # Only the worker thread touches the new index until it is swapped in
+                index = MemoryPatientIndex()
+                rows = await db.stream(
+                    self.select_rows().execution_options(yield_per=settings.bulk_chunk_size)
+                )
+                async for partition in rows.partitions():
+                    await asyncio.to_thread(index.index_rows, partition)
+
+                pending, self.pending = self.pending, None
+                self.documents, self.postings = index.documents, index.postings
+                for patient_id, document in pending:
+                    if document is None:
+                        self.remove(patient_id)
+                    else:
+                        self.index_document(patient_id, document)
+                self.loaded = True
+            finally:
+                self.pending = None
+
+    async def index_new_patients(self, db: AsyncSession, after_id: int):
+        """Index patients created after after_id, such as a bulk import, if loaded"""
+        async with self.lock:
+            if not self.loaded:
+                return
+            rows = await db.stream(
+                self.select_rows()
+                .filter(Patient.id > after_id)
+                .execution_options(yield_per=settings.bulk_chunk_size)
+            )
+            async for partition in rows.partitions():
+                # Trigrams are computed in the thread; the postings are only
+                # changed on the event loop, where searches read them
+                prepared = await asyncio.to_thread(prepare_documents, partition)
+                for patient_id, document, grams in prepared:
+                    self.index_document(patient_id, document, grams)
+
+    def search(self, q: str, limit: int) -> List[Tuple[int, float]]:
+        q = q.lower()
+        query_postings = sorted(
+            (self.postings.get(gram, set()) for gram in trigrams(q)), key=len
+        )
+        # A document sharing the threshold's share of the query trigrams
+        # appears in at least one of the rarest len - required + 1 postings
+        required = math.ceil(len(query_postings) * WORD_SIMILARITY_THRESHOLD)
+        candidates = set().union(*query_postings[: len(query_postings) - required + 1])
+        phone_grams = substring_trigrams(q)
+        if phone_grams:
+            candidates |= set.intersection(
+                *(self.postings.get(f"#{gram}", set()) for gram in phone_grams)
+            )
+
+        results = []
+        for patient_id in candidates:
+            name, email, phone = self.documents[patient_id]
+            # Share of the query's trigrams found in the document, an upper
+            # bound of pg_trgm's word_similarity
+            shared = sum(1 for postings in query_postings if patient_id in postings)
+            similarity = shared / len(query_postings) if query_postings else 0.0
+            phone_match = len(q) >= 3 and q in phone
+            prefix_match = name.startswith(q) or email.startswith(q)
+            if similarity < WORD_SIMILARITY_THRESHOLD and not (phone_match or prefix_match):
+                continue
+            rank = max(similarity, 1.0 if phone_match else 0.0) + (1.0 if prefix_match else 0.0)
+            results.append((patient_id, rank))
+        return heapq.nsmallest(limit, results, key=lambda result: (-result[1], result[0]))
+
+
+memory_index = MemoryPatientIndex()
+
+
+async def find_patients(db: AsyncSession, q: str, limit: int) -> List[Patient]:
+    """Patients matching q by name, email or phone, best match first"""
+    q = q.strip()
+    if db.get_bind().dialect.name == "postgresql":
+        ranked = await search_postgres(db, q, limit)
+    else:
+        await memory_index.ensure_loaded(db)
+        ranked = memory_index.search(q, limit)
+
+    if not ranked:
+        return []
+    patient_ids = [patient_id for patient_id, _ in ranked]
+    patients = await db.scalars(select(Patient).filter(Patient.id.in_(patient_ids)))
+    by_id = {patient.id: patient for patient in patients}
+    return [by_id[patient_id] for patient_id in patient_ids if patient_id in by_id]
@@ -0,0 +1,151 @@
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import Numeric, String, and_, cast, func, literal, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
+import models
+from config import settings
+
+ClockRecord = models.ClockRecord
+Employee = models.Employee
+PaymentRequest = models.PaymentRequest
+
+# Allowed status changes: new status -> status it must currently have
+PAYMENT_TRANSITIONS = {"approved": "pending", "rejected": "pending", "paid": "approved"}
+
+
+def parse_month(month: str) -> datetime:
+    try:
+        return datetime.strptime(month, "%Y-%m")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Month must be formatted as YYYY-MM")
+
+
+def canonical_month(month: str) -> str:
+    """
+    The YYYY-MM spelling of month. strptime also accepts 2026-9, which
+    must not become a second month next to 2026-09.
+    """
+    return parse_month(month).strftime("%Y-%m")
+
+
+def month_bounds(month: str) -> Tuple[datetime, datetime]:
+    """[start, end) of a YYYY-MM month"""
+    start = parse_month(month)
+    if start.month == 12:
+        return start, start.replace(year=start.year + 1, month=1)
+    return start, start.replace(month=start.month + 1)
+
+
+def money(value):
+    # Rounded as NUMERIC, since PostgreSQL has no round(double precision, int)
+    return func.round(cast(value, Numeric), 2)
+
+
+async def run_payroll(db: AsyncSession, month: str) -> dict:
+    """
+    Create the month's pending payment request of every active employee in
+    a single INSERT ... SELECT. Hours come from one grouped aggregate over
+    the shifts clocked in during the month; base_salary is the monthly
+    salary and overtime is paid at the hourly rate times
+    PAYROLL_OVERTIME_MULTIPLIER. Employees already paid for the month are
+    skipped by ON CONFLICT DO NOTHING on (employee_id, month), so reruns
+    and concurrent runs only fill in the missing requests.
+    """
+    month = canonical_month(month)
+    start, end = month_bounds(month)
+    worked_hours = func.coalesce(func.sum(ClockRecord.worked_hours), 0)
+    overtime_hours = func.coalesce(func.sum(ClockRecord.overtime_hours), 0)
+    hourly_rate = Employee.salary / settings.payroll_standard_monthly_hours
+    overtime_pay = money(overtime_hours * hourly_rate * settings.payroll_overtime_multiplier)
+    base_salary = money(Employee.salary)
+    notes = (
+        literal("Worked ")
+        + cast(money(worked_hours), String)
+        + literal(" h, overtime ")
+        + cast(money(overtime_hours), String)
+        + literal(" h")
+    )
+
+    rows = (
+        select(
+            Employee.id,
+            base_salary,
+            overtime_pay,
+            base_salary + overtime_pay,
+            literal("pending"),
+            literal(month),
+            notes,
+            literal(datetime.utcnow()),
+        )
+        .select_from(Employee)
+        .outerjoin(
+            ClockRecord,
+            and_(
+                ClockRecord.employee_id == Employee.id,
+                ClockRecord.clock_in_time >= start,
+                ClockRecord.clock_in_time < end,
+                ClockRecord.clock_out_time.is_not(None),
+            ),
+        )
+        .where(Employee.status == "active")
+        .group_by(Employee.id, Employee.salary)
+    )
+
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    statement = (
+        dialect.insert(PaymentRequest)
+        .from_select(
+            [
+                "employee_id",
+                "base_salary",
+                "overtime_pay",
+                "total_amount",
+                "status",
+                "month",
+                "notes",
+                "created_at",
+            ],
+            rows,
+        )
+        .on_conflict_do_nothing(index_elements=[PaymentRequest.employee_id, PaymentRequest.month])
+    )
+    created = (await db.execute(statement)).rowcount
+
+    requests, total_amount = (
+        await db.execute(
+            select(func.count(), func.coalesce(func.sum(PaymentRequest.total_amount), 0)).where(
+                PaymentRequest.month == month
+            )
+        )
+    ).one()
+    await db.commit()
+    return {
+        "month": month,
+        "created": created,
+        "requests": requests,
+        "total_amount": round(total_amount, 2),
+    }
+
+
+async def set_payment_status(
+    db: AsyncSession, status: str, ids: Optional[List[int]] = None, month: Optional[str] = None
+) -> int:
+    """
+    Move the selected requests to status in one UPDATE. Only requests in
+    the status the transition starts from change; others are left as they are.
+    """
+    statement = (
+        update(PaymentRequest)
+        .where(PaymentRequest.status == PAYMENT_TRANSITIONS[status])
+        .values(status=status)
+        .execution_options(synchronize_session=False)
+    )
+    if ids is not None:
+        statement = statement.where(PaymentRequest.id.in_(ids))
+    if month is not None:
+        statement = statement.where(PaymentRequest.month == canonical_month(month))
+    updated = (await db.execute(statement)).rowcount
+    await db.commit()
+    return updated
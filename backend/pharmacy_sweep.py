@@ -0,0 +1,57 @@
+from datetime import datetime
+from sqlalchemy import and_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+import models
+from cache import response_cache
+from config import settings
+from database import AsyncSessionLocal
+from scheduler import scheduler
+
+Pharmacy = models.Pharmacy
+
+
+def status_transitions(now: datetime) -> list:
+    """
+    (new status, rows to move) pairs, applied in order so expiry wins over
+    stock status. Each condition matches a partial index holding only rows
+    still to be moved, so a sweep reads no more than it changes.
+    """
+    return [
+        ("expired", and_(Pharmacy.status != "expired", Pharmacy.expiry_date <= now)),
+        ("out_of_stock", and_(Pharmacy.status == "available", Pharmacy.quantity <= 0)),
+        ("available", and_(Pharmacy.status == "out_of_stock", Pharmacy.quantity > 0)),
+    ]
+
+
+async def sweep_pharmacy_statuses(db: AsyncSession, chunk_size: int) -> dict:
+    """Move medicines to their current status in chunks, committing each one"""
+    counts = {}
+    for status, condition in status_transitions(datetime.utcnow()):
+        counts[status] = 0
+        while True:
+            chunk = select(Pharmacy.id).filter(condition).limit(chunk_size)
+            result = await db.execute(
+                update(Pharmacy)
+                .where(Pharmacy.id.in_(chunk.scalar_subquery()))
+                .values(status=status)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            counts[status] += result.rowcount
+            if result.rowcount < chunk_size:
+                break
+    return counts
+
+
+async def run_pharmacy_sweep() -> dict:
+    async with AsyncSessionLocal() as db:
+        counts = await sweep_pharmacy_statuses(db, settings.pharmacy_sweep_chunk_size)
+    if any(counts.values()):
+        # Cached pharmacy pages still show the old statuses
+        await response_cache.invalidate("pharmacy")
+    return counts
+
+
+pharmacy_sweep_job = scheduler.add_job(
+    "pharmacy_status_sweep", settings.pharmacy_sweep_interval_seconds, run_pharmacy_sweep
+)
@@ -0,0 +1,68 @@
+from fastapi import HTTPException
+import math
+import time
+
+
+class RateLimiter:
+    """Fixed-window attempt counter keyed by an arbitrary string (client IP, email)"""
+
+    # Expired windows are pruned once this many keys are tracked
+    MAX_KEYS = 10000
+
+    def __init__(self, max_attempts: int, window_seconds: int):
+        self.max_attempts = max_attempts
+        self.window_seconds = window_seconds
+        self._windows = {}
+
+    def check(self, key: str):
+        """Raise 429 if key has used up its attempts in the current window"""
+        now = time.monotonic()
+        start, count = self._windows.get(key, (now, 0))
+        if now - start < self.window_seconds and count >= self.max_attempts:
+            retry_after = math.ceil(self.window_seconds - (now - start))
+            raise HTTPException(
+                status_code=429,
+                detail="Too many attempts. Please try again later.",
+                headers={"Retry-After": str(retry_after)},
+            )
+
+    def record(self, key: str) -> float:
+        """Count an attempt for key and return the start of its window"""
+        now = time.monotonic()
+        start, count = self._windows.get(key, (now, 0))
+
+        if now - start >= self.window_seconds:
+            start, count = now, 0
+
+        self._windows[key] = (start, count + 1)
+
+        if len(self._windows) > self.MAX_KEYS:
+            self._prune(now)
+        return start
+
+    def hit(self, key: str) -> float:
+        """
+        Count an attempt for key, raising 429 once the window is used up.
+        Checking and counting happen without yielding to the event loop, so
+        concurrent callers cannot all pass the check before any is counted.
+        Returns the window start to pass to refund().
+        """
+        self.check(key)
+        return self.record(key)
+
+    def refund(self, key: str, window_start: float):
+        """Give back an attempt counted by hit(), unless its window has since ended"""
+        start, count = self._windows.get(key, (None, 0))
+        if start == window_start and count > 0:
+            self._windows[key] = (start, count - 1)
+
+    def reset(self):
+        """Forget every key's attempts"""
+        self._windows = {}
+
+    def _prune(self, now: float):
+        self._windows = {
+            key: window
+            for key, window in self._windows.items()
+            if now - window[0] < self.window_seconds
+        }
@@ -0,0 +1,155 @@
+from datetime import datetime
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Set
+import asyncio
+import logging
+import time
+import models
+from config import settings
+from database import AsyncSessionLocal
+from scheduler import scheduler
+
+logger = logging.getLogger(__name__)
+
+Reminder = models.Reminder
+
+
+class LogTransport:
+    """Stub transport that logs reminders instead of delivering them"""
+
+    def __init__(self):
+        self.sent = 0
+
+    async def send(self, reminder: Reminder):
+        self.sent += 1
+        logger.info(
+            "Reminder %s (%s) for patient %s: %s",
+            reminder.id,
+            reminder.reminder_type,
+            reminder.patient_id,
+            reminder.message,
+        )
+
+
+# Transports selectable with REMINDER_TRANSPORT; a transport has an async
+# send(reminder) that raises when delivery fails
+TRANSPORTS = {
+    "log": LogTransport,
+}
+
+
+def create_transport():
+    try:
+        return TRANSPORTS[settings.reminder_transport]()
+    except KeyError:
+        raise ValueError(f"Unknown reminder transport: {settings.reminder_transport}") from None
+
+
+async def claim_due_reminders(
+    db: AsyncSession, now: datetime, batch_size: int, skip_ids: Set[int]
+) -> List[Reminder]:
+    """
+    Lock a batch of due reminders for this transaction. SKIP LOCKED makes
+    concurrent dispatchers take disjoint batches instead of waiting on, or
+    double-sending, rows another dispatcher holds.
+    """
+    query = select(Reminder).filter(Reminder.sent == False, Reminder.scheduled_time <= now)
+    if skip_ids:
+        query = query.filter(Reminder.id.not_in(skip_ids))
+    reminders = await db.scalars(
+        query
+        .order_by(Reminder.scheduled_time)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    return reminders.all()
+
+
+async def dispatch_batch(
+    db: AsyncSession, transport, now: datetime, batch_size: int, failed_ids: Set[int]
+) -> dict:
+    """
+    Claim, send and mark one batch. Failed sends stay pending for the next
+    run and are added to failed_ids so this run does not claim them again.
+    """
+    reminders = await claim_due_reminders(db, now, batch_size, failed_ids)
+    results = await asyncio.gather(
+        *(transport.send(reminder) for reminder in reminders), return_exceptions=True
+    )
+
+    sent = []
+    for reminder, result in zip(reminders, results):
+        if isinstance(result, Exception):
+            logger.warning("Reminder %s not sent: %r", reminder.id, result)
+            failed_ids.add(reminder.id)
+        else:
+            sent.append(reminder)
+
+    if sent:
+        await db.execute(
+            update(Reminder)
+            .where(Reminder.id.in_([reminder.id for reminder in sent]))
+            .values(sent=True)
+            .execution_options(synchronize_session=False)
+        )
+    await db.commit()
+
+    sent_at = datetime.utcnow()
+    return {
+        "claimed": len(reminders),
+        "sent": len(sent),
+        "lags": [(sent_at - reminder.scheduled_time).total_seconds() for reminder in sent],
+    }
+
+
+async def dispatch_due_reminders(transport=None) -> dict:
+    """Send every reminder due now, one batch at a time, and report throughput and lag"""
+    transport = transport or reminder_transport
+    batch_size = settings.reminder_dispatch_batch_size
+    now = datetime.utcnow()
+    start = time.perf_counter()
+    sent = 0
+    failed_ids = set()
+    lags = []
+
+    async with AsyncSessionLocal() as db:
+        while True:
+            batch = await dispatch_batch(db, transport, now, batch_size, failed_ids)
+            sent += batch["sent"]
+            lags.extend(batch["lags"])
+            if batch["claimed"] < batch_size:
+                break
+
+    elapsed = time.perf_counter() - start
+    return {
+        "sent": sent,
+        "failed": len(failed_ids),
+        "reminders_per_second": round(sent / elapsed, 1) if elapsed else 0.0,
+        "avg_lag_seconds": round(sum(lags) / len(lags), 3) if lags else None,
+        "max_lag_seconds": round(max(lags), 3) if lags else None,
+    }
+
+
+reminder_transport = create_transport()
+
+reminder_dispatch_job = scheduler.add_job(
+    "reminder_dispatch",
+    settings.reminder_dispatch_interval_seconds if settings.reminder_dispatch_in_process else 0,
+    dispatch_due_reminders,
+)
+
+
+async def run_worker():
+    """Dispatch on a schedule outside the API process"""
+    while True:
+        try:
+            logger.info("Dispatched reminders: %s", await reminder_dispatch_job.run_once())
+        except Exception:
+            logger.exception("Reminder dispatch failed")
+        await asyncio.sleep(settings.reminder_dispatch_interval_seconds)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_worker())
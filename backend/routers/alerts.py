@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+import asyncio
+import schemas
+from config import settings
+from dependencies import get_current_claims
+from stock_alerts import subscribe, trackers
+
+router = APIRouter(dependencies=[Depends(get_current_claims)])
+
+
+def format_event(event) -> str:
+    return f"event: low_stock\ndata: {event.model_dump_json()}\n\n"
+
+
+async def stream_low_stock_events():
+    # Subscribe before the snapshot so no change falls between the two
+    with subscribe() as queue:
+        for tracker in trackers:
+            await tracker.refresh()
+        snapshot = [
+            schemas.LowStockEvent(source=tracker.source, action="raised", item_id=item_id, item=item)
+            for tracker in trackers
+            for item_id, item in sorted(tracker.items.items())
+        ]
+        # Changes queued during the refresh are already part of the snapshot
+        while not queue.empty():
+            queue.get_nowait()
+        for event in snapshot:
+            yield format_event(event)
+
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), timeout=settings.alert_stream_keepalive_seconds
+                )
+            except asyncio.TimeoutError:
+                for tracker in trackers:
+                    await tracker.refresh()
+                if queue.empty():
+                    yield ": keepalive\n\n"
+                continue
+            yield format_event(event)
+
+
+@router.get("/low-stock/stream")
+async def low_stock_stream():
+    """Server-sent events for pharmacy and inventory items entering or leaving low stock"""
+    return StreamingResponse(
+        stream_low_stock_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
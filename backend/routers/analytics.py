@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, Query
+from datetime import date
+from typing import List, Optional
+import schemas
+from analytics import appointments_per_doctor, cleaning_minutes, lab_turnaround, stock_value
+from cache import encode_response, response_cache
+from config import settings
+from database import open_request_session
+from dependencies import require_roles
+
+router = APIRouter(dependencies=[Depends(require_roles("admin"))])
+
+# Aggregates are cached for ANALYTICS_CACHE_TTL_SECONDS; writes do not invalidate them
+CACHE_NAMESPACE = "analytics"
+
+
+async def cached(key: str, aggregate, response_model, *arguments):
+    async def load():
+        async with open_request_session() as db:
+            content = await aggregate(db, *arguments)
+        return encode_response(content, response_model)
+
+    return await response_cache.get_or_load(
+        CACHE_NAMESPACE, key, load, ttl=settings.analytics_cache_ttl_seconds
+    )
+
+
+@router.get("/appointments-per-doctor", response_model=List[schemas.DoctorAppointmentsDay])
+async def get_appointments_per_doctor(
+    from_: date = Query(alias="from"), to: date = Query(), doctor_id: Optional[int] = None
+):
+    """Appointments of each doctor per day, with completed and cancelled counts"""
+    return await cached(
+        f"appointments:{from_}:{to}:{doctor_id}",
+        appointments_per_doctor,
+        List[schemas.DoctorAppointmentsDay],
+        from_,
+        to,
+        doctor_id,
+    )
+
+
+@router.get("/lab-turnaround", response_model=List[schemas.LabTurnaround])
+async def get_lab_turnaround(from_: date = Query(alias="from"), to: date = Query()):
+    """Hours from request to completion of lab tests completed in the range, per test type"""
+    return await cached(
+        f"lab:{from_}:{to}", lab_turnaround, List[schemas.LabTurnaround], from_, to
+    )
+
+
+@router.get("/cleaning-minutes", response_model=List[schemas.CleaningMinutes])
+async def get_cleaning_minutes(from_: date = Query(alias="from"), to: date = Query()):
+    """Minutes of completed cleaning per area"""
+    return await cached(
+        f"cleaning:{from_}:{to}", cleaning_minutes, List[schemas.CleaningMinutes], from_, to
+    )
+
+
+@router.get("/stock-value", response_model=List[schemas.StockValue])
+async def get_stock_value():
+    """Value of pharmacy stock per status and of inventory per category"""
+    return await cached("stock", stock_value, List[schemas.StockValue])
@@ -1,82 +1,162 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
+from typing import List, Optional
 import models
 import schemas
+from availability import find_free_windows, invalidate_availability
+from config import settings
 from database import get_db
+from dependencies import get_current_claims
+from filters import Eq, ListFilters, ListQuery, Range, to_naive_utc
+from pagination import PageParams, paginate
+from scheduling import ensure_slot_free, reset_reminders, set_start
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(get_current_claims)])
+
+# Updating any of these moves the appointment to a new slot
+RESCHEDULE_FIELDS = {"doctor_id", "appointment_date", "appointment_time", "duration_minutes"}
+# Fields a booking cannot do without; an update may change but not clear them
+SCHEDULE_FIELDS = ("doctor_id", "appointment_date", "appointment_time")
+
+# doctor_id with a start range is served by the (doctor_id, starts_at) index
+appointment_filters = ListFilters(
+    Eq(models.Appointment.patient_id),
+    Eq(models.Appointment.doctor_id),
+    Eq(models.Appointment.status),
+    Range(models.Appointment.starts_at, lower="from", upper="to"),
+    sort_keys=(models.Appointment.id, models.Appointment.starts_at),
+)
 
 
 @router.post("/", response_model=schemas.AppointmentResponse)
-def create_appointment(appointment: schemas.AppointmentCreate, db: Session = Depends(get_db)):
+async def create_appointment(appointment: schemas.AppointmentCreate, db: AsyncSession = Depends(get_db)):
     """Create new appointment"""
     # Verify patient and doctor exist
-    patient = db.query(models.Patient).filter(models.Patient.id == appointment.patient_id).first()
-    doctor = db.query(models.User).filter(models.User.id == appointment.doctor_id).first()
+    patient = await db.get(models.Patient, appointment.patient_id)
+    doctor = await db.get(models.User, appointment.doctor_id)
 
     if not patient or not doctor:
         raise HTTPException(status_code=404, detail="Patient or Doctor not found")
 
     db_appointment = models.Appointment(**appointment.dict())
+    if db_appointment.duration_minutes is None:
+        db_appointment.duration_minutes = settings.appointment_duration_minutes
+    await ensure_slot_free(db, db_appointment)
     db.add(db_appointment)
-    db.commit()
-    db.refresh(db_appointment)
+    await db.commit()
+    await invalidate_availability(db_appointment.doctor_id)
+    await db.refresh(db_appointment)
     return db_appointment
 
 
-@router.get("/", response_model=List[schemas.AppointmentResponse])
-def get_all_appointments(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all appointments"""
-    appointments = db.query(models.Appointment).offset(skip).limit(limit).all()
-    return appointments
+@router.get("/", response_model=schemas.Page[schemas.AppointmentResponse])
+async def get_all_appointments(
+    page: PageParams = Depends(),
+    filters: ListQuery = Depends(appointment_filters),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get all appointments, optionally of one patient or doctor, in one status or starting in [from, to)"""
+    return await paginate(
+        db,
+        select(models.Appointment),
+        models.Appointment.id,
+        page,
+        schema=schemas.AppointmentResponse,
+        filters=filters,
+    )
+
+
+@router.get("/availability", response_model=List[schemas.AvailabilityWindow])
+async def get_availability(
+    from_: datetime = Query(alias="from"),
+    to: datetime = Query(),
+    doctor_id: Optional[List[int]] = Query(None),
+    duration: Optional[int] = Query(None, ge=5, le=24 * 60, description="Minutes; defaults to one slot"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Free time of the given doctors (all doctors by default) between from and to"""
+    start, end = to_naive_utc(from_), to_naive_utc(to)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+    if end - start > timedelta(days=settings.availability_max_days):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range must not exceed {settings.availability_max_days} days",
+        )
+
+    if doctor_id is None:
+        doctor_id = (
+            await db.scalars(select(models.User.id).filter(models.User.role == "doctor"))
+        ).all()
+
+    minutes = duration or settings.appointment_duration_minutes
+    return await find_free_windows(db, doctor_id, start, end, timedelta(minutes=minutes))
 
 
 @router.get("/{appointment_id}", response_model=schemas.AppointmentResponse)
-def get_appointment(appointment_id: int, db: Session = Depends(get_db)):
+async def get_appointment(appointment_id: int, db: AsyncSession = Depends(get_db)):
     """Get appointment by ID"""
-    appointment = (
-        db.query(models.Appointment)
-        .filter(models.Appointment.id == appointment_id)
-        .first()
-    )
+    appointment = await db.get(models.Appointment, appointment_id)
     if not appointment:
         raise HTTPException(status_code=404, detail="Appointment not found")
     return appointment
 
 
 @router.put("/{appointment_id}", response_model=schemas.AppointmentResponse)
-def update_appointment(
-    appointment_id: int, appointment: schemas.AppointmentUpdate, db: Session = Depends(get_db)
+async def update_appointment(
+    appointment_id: int, appointment: schemas.AppointmentUpdate, db: AsyncSession = Depends(get_db)
 ):
     """Update appointment"""
-    db_appointment = (
-        db.query(models.Appointment)
-        .filter(models.Appointment.id == appointment_id)
-        .first()
-    )
+    db_appointment = await db.get(models.Appointment, appointment_id)
     if not db_appointment:
         raise HTTPException(status_code=404, detail="Appointment not found")
 
-    for field, value in appointment.dict(exclude_unset=True).items():
+    changes = appointment.dict(exclude_unset=True)
+    if changes.get("duration_minutes", 0) is None:
+        del changes["duration_minutes"]
+    cleared = [field for field in SCHEDULE_FIELDS if field in changes and changes[field] is None]
+    if cleared:
+        raise HTTPException(status_code=400, detail=f"{', '.join(cleared)} cannot be null")
+    if "doctor_id" in changes and not await db.get(models.User, changes["doctor_id"]):
+        raise HTTPException(status_code=404, detail="Doctor not found")
+
+    was_cancelled = db_appointment.status == "cancelled"
+    previous_doctor_id = db_appointment.doctor_id
+    for field, value in changes.items():
         setattr(db_appointment, field, value)
 
-    db.commit()
-    db.refresh(db_appointment)
+    rescheduled = bool(changes.keys() & RESCHEDULE_FIELDS)
+    if rescheduled:
+        # Validated and kept in step with starts_at even when cancelled;
+        # only the overlap check is skipped for a cancelled appointment
+        set_start(db_appointment)
+    if db_appointment.status == "cancelled":
+        if not was_cancelled:
+            await reset_reminders(db, db_appointment)
+    elif rescheduled or was_cancelled:
+        await ensure_slot_free(db, db_appointment)
+        if rescheduled:
+            await reset_reminders(db, db_appointment)
+
+    await db.commit()
+    await invalidate_availability(previous_doctor_id, db_appointment.doctor_id)
+    await db.refresh(db_appointment)
     return db_appointment
 
 
 @router.delete("/{appointment_id}")
-def delete_appointment(appointment_id: int, db: Session = Depends(get_db)):
+async def delete_appointment(appointment_id: int, db: AsyncSession = Depends(get_db)):
     """Delete appointment"""
-    appointment = (
-        db.query(models.Appointment)
-        .filter(models.Appointment.id == appointment_id)
-        .first()
-    )
+    appointment = await db.get(models.Appointment, appointment_id)
     if not appointment:
         raise HTTPException(status_code=404, detail="Appointment not found")
 
-    db.delete(appointment)
-    db.commit()
+    await db.execute(
+        delete(models.Reminder).where(models.Reminder.appointment_id == appointment_id)
+    )
+    await db.delete(appointment)
+    await db.commit()
+    await invalidate_availability(appointment.doctor_id)
     return {"message": "Appointment deleted successfully"}
@@ -1,32 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
+from typing import Optional
 import models
 import schemas
 from utils import (
-    hash_password,
-    verify_password,
     create_access_token,
     validate_password,
     get_password_expiry_date,
+    generate_universal_password,
 )
+from config import settings
 from database import get_db
+from dependencies import get_optional_claims, require_roles
+from hashing import password_hasher
+from rate_limit import RateLimiter
 
 router = APIRouter()
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Only failed logins are counted. Staff often share one NAT address, so the
+# per-IP budget is much larger than the per-email one
+login_email_limiter = RateLimiter(
+    max_attempts=settings.login_rate_limit_attempts,
+    window_seconds=settings.login_rate_limit_window_seconds,
+)
+login_ip_limiter = RateLimiter(
+    max_attempts=settings.login_rate_limit_ip_attempts,
+    window_seconds=settings.login_rate_limit_window_seconds,
+)
+
 
 @router.post("/register")
-def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
+async def register(
+    user: schemas.UserCreate,
+    claims: Optional[dict] = Depends(get_optional_claims),
+    db: AsyncSession = Depends(get_db),
+):
     """Admin creates new employee account"""
+    if not claims or claims.get("role") != "admin":
+        # Without an admin token only the very first account may be created
+        has_users = await db.scalar(select(models.User.id).limit(1))
+        if claims or has_users:
+            raise HTTPException(status_code=403, detail="Only admins can register employees")
+
     # Check if user already exists
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
+    db_user = await db.scalar(select(models.User).filter(models.User.email == user.email))
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    # Hash the universal password
-    hashed_password = hash_password("Pass@123")
+    # Universal password hash is computed once per process
+    hashed_password = await password_hasher.get_universal_password_hash()
 
     db_user = models.User(
         email=user.email,
@@ -38,23 +64,55 @@ def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
     )
 
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
 
     return {
         "message": "Employee account created successfully",
         "user": schemas.UserResponse.from_orm(db_user),
-        "universal_password": "Pass@123",
+        "universal_password": generate_universal_password(),
     }
 
 
+async def authenticate(db: AsyncSession, request: Request, email: str, password: str) -> models.User:
+    """
+    The user with email and password, under the failed login rate limits.
+    The attempt is counted before the password is verified, so parallel
+    guesses cannot all pass the check, and given back if it succeeds.
+    """
+    ip = request.client.host
+    key = email.lower()
+    ip_window = login_ip_limiter.hit(ip)
+    try:
+        email_window = login_email_limiter.hit(key)
+    except HTTPException:
+        login_ip_limiter.refund(ip, ip_window)
+        raise
+
+    def refund():
+        login_ip_limiter.refund(ip, ip_window)
+        login_email_limiter.refund(key, email_window)
+
+    try:
+        user = await db.scalar(select(models.User).filter(models.User.email == email))
+        valid = user is not None and await password_hasher.verify(password, user.password_hash)
+    except Exception:
+        # Nothing was verified, such as when the hashing pool is busy
+        refund()
+        raise
+
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    refund()
+    return user
+
+
 @router.post("/login", response_model=schemas.TokenResponse)
-def login(credentials: schemas.UserLogin, db: Session = Depends(get_db)):
+async def login(
+    credentials: schemas.UserLogin, request: Request, db: AsyncSession = Depends(get_db)
+):
     """User login"""
-    user = db.query(models.User).filter(models.User.email == credentials.email).first()
-
-    if not user or not verify_password(credentials.password, user.password_hash):
-        raise HTTPException(status_code=401, detail="Invalid credentials")
+    user = await authenticate(db, request, credentials.email, credentials.password)
 
     # Check password expiry
     from utils import is_password_expired
@@ -78,20 +136,33 @@ def login(credentials: schemas.UserLogin, db: Session = Depends(get_db)):
 
 
 @router.post("/change-password")
-def change_password(
+async def change_password(
     password_change: schemas.PasswordChange,
-    current_user_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    claims: Optional[dict] = Depends(get_optional_claims),
+    db: AsyncSession = Depends(get_db),
 ):
-    """Change user password"""
-    user = db.query(models.User).filter(models.User.id == current_user_id).first()
-
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    # Verify old password
-    if not verify_password(password_change.old_password, user.password_hash):
-        raise HTTPException(status_code=401, detail="Old password is incorrect")
+    """
+    Change user password. Without a token, as when login refused an expired
+    password, the user is identified by email and old password instead.
+    """
+    if claims is None:
+        if password_change.email is None:
+            raise HTTPException(
+                status_code=401,
+                detail="Not authenticated",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        user = await authenticate(db, request, password_change.email, password_change.old_password)
+    else:
+        user = await db.get(models.User, claims["user_id"])
+
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        # Verify old password
+        if not await password_hasher.verify(password_change.old_password, user.password_hash):
+            raise HTTPException(status_code=401, detail="Old password is incorrect")
 
     # Verify passwords match
     if password_change.new_password != password_change.confirm_password:
@@ -103,37 +174,36 @@ def change_password(
         raise HTTPException(status_code=400, detail=message)
 
     # Update password
-    user.password_hash = hash_password(password_change.new_password)
+    user.password_hash = await password_hasher.hash(password_change.new_password)
     user.first_login = False
     user.password_expires_at = get_password_expiry_date()
     user.password_changed_at = models.datetime.utcnow()
 
-    db.commit()
+    await db.commit()
 
     return {"message": "Password changed successfully"}
 
 
 @router.post("/reset-password")
-def reset_password(email: str, admin_id: int, db: Session = Depends(get_db)):
+async def reset_password(
+    email: str,
+    claims: dict = Depends(require_roles("admin")),
+    db: AsyncSession = Depends(get_db),
+):
     """Admin resets employee password to universal password"""
-    admin = db.query(models.User).filter(models.User.id == admin_id).first()
-
-    if not admin or admin.role != "admin":
-        raise HTTPException(status_code=403, detail="Only admins can reset passwords")
-
-    user = db.query(models.User).filter(models.User.email == email).first()
+    user = await db.scalar(select(models.User).filter(models.User.email == email))
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     # Reset to universal password
-    user.password_hash = hash_password("Pass@123")
+    user.password_hash = await password_hasher.get_universal_password_hash()
     user.first_login = True
     user.password_expires_at = get_password_expiry_date()
 
-    db.commit()
+    await db.commit()
 
     return {
         "message": "Password reset successfully",
-        "universal_password": "Pass@123",
+        "universal_password": generate_universal_password(),
     }
@@ -1,15 +1,28 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 import models
 import schemas
 from database import get_db
+from dependencies import get_current_claims
+from filters import Eq, ListFilters, ListQuery, Range
+from pagination import PageParams, paginate
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(get_current_claims)])
+
+cleaning_log_filters = ListFilters(
+    Eq(models.CleaningLog.cleaner_id),
+    Eq(models.CleaningLog.status),
+    Eq(models.CleaningLog.area_type),
+    Range(models.CleaningLog.cleaning_date),
+    Range(models.CleaningLog.created_at),
+    sort_keys=(models.CleaningLog.id, models.CleaningLog.cleaning_date),
+)
 
 
 @router.post("/logs", response_model=schemas.CleaningLogResponse)
-def create_cleaning_log(log: schemas.CleaningLogCreate, db: Session = Depends(get_db)):
+async def create_cleaning_log(log: schemas.CleaningLogCreate, db: AsyncSession = Depends(get_db)):
     """Create new cleaning log"""
     db_log = models.CleaningLog(
         cleaner_id=log.cleaner_id,
@@ -20,46 +33,58 @@ def create_cleaning_log(log: schemas.CleaningLogCreate, db: Session = Depends(ge
         notes=log.notes,
     )
     db.add(db_log)
-    db.commit()
-    db.refresh(db_log)
+    await db.commit()
+    await db.refresh(db_log)
     return db_log
 
 
-@router.get("/logs", response_model=List[schemas.CleaningLogResponse])
-def get_all_cleaning_logs(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/logs", response_model=schemas.Page[schemas.CleaningLogResponse])
+async def get_all_cleaning_logs(
+    page: PageParams = Depends(),
+    filters: ListQuery = Depends(cleaning_log_filters),
+    db: AsyncSession = Depends(get_db),
+):
     """Get all cleaning logs"""
-    logs = db.query(models.CleaningLog).offset(skip).limit(limit).all()
-    return logs
+    return await paginate(
+        db,
+        select(models.CleaningLog),
+        models.CleaningLog.id,
+        page,
+        schema=schemas.CleaningLogResponse,
+        filters=filters,
+    )
 
 
 @router.get("/logs/{log_id}", response_model=schemas.CleaningLogResponse)
-def get_cleaning_log(log_id: int, db: Session = Depends(get_db)):
+async def get_cleaning_log(log_id: int, db: AsyncSession = Depends(get_db)):
     """Get cleaning log by ID"""
-    log = db.query(models.CleaningLog).filter(models.CleaningLog.id == log_id).first()
+    log = await db.get(models.CleaningLog, log_id)
     if not log:
         raise HTTPException(status_code=404, detail="Cleaning log not found")
     return log
 
 
 @router.put("/logs/{log_id}", response_model=schemas.CleaningLogResponse)
-def update_cleaning_log(
-    log_id: int, log: schemas.CleaningLogUpdate, db: Session = Depends(get_db)
+async def update_cleaning_log(
+    log_id: int, log: schemas.CleaningLogUpdate, db: AsyncSession = Depends(get_db)
 ):
     """Update cleaning log"""
-    db_log = db.query(models.CleaningLog).filter(models.CleaningLog.id == log_id).first()
+    db_log = await db.get(models.CleaningLog, log_id)
     if not db_log:
         raise HTTPException(status_code=404, detail="Cleaning log not found")
 
     for field, value in log.dict(exclude_unset=True).items():
         setattr(db_log, field, value)
 
-    db.commit()
-    db.refresh(db_log)
+    await db.commit()
+    await db.refresh(db_log)
     return db_log
 
 
 @router.get("/history/{cleaner_id}", response_model=List[schemas.CleaningLogResponse])
-def get_cleaner_history(cleaner_id: int, db: Session = Depends(get_db)):
+async def get_cleaner_history(cleaner_id: int, db: AsyncSession = Depends(get_db)):
     """Get cleaning history for a cleaner"""
-    logs = db.query(models.CleaningLog).filter(models.CleaningLog.cleaner_id == cleaner_id).all()
-    return logs
+    logs = await db.scalars(
+        select(models.CleaningLog).filter(models.CleaningLog.cleaner_id == cleaner_id)
+    )
+    return logs.all()
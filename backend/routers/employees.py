@@ -1,35 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from datetime import datetime
+from datetime import date, datetime
 import models
 import schemas
 from database import get_db
+from dependencies import get_current_claims, require_roles
+from pagination import PageParams, paginate
+from timesheets import (
+    TimesheetPeriod,
+    add_shift,
+    lock_employees,
+    read_timesheet,
+    timesheet_backfill_job,
+)
 from utils import calculate_worked_hours
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(get_current_claims)])
+
+
+def open_shift_query(employee_id: int):
+    """Select the employee's open shift, served by ix_clock_records_open_shift"""
+    return select(models.ClockRecord).filter(
+        models.ClockRecord.employee_id == employee_id,
+        models.ClockRecord.clock_out_time.is_(None),
+    )
 
 
 @router.post("/clock-in")
-def clock_in(request: schemas.ClockInRequest, db: Session = Depends(get_db)):
+async def clock_in(request: schemas.ClockInRequest, db: AsyncSession = Depends(get_db)):
     """Employee clock in"""
-    employee = db.query(models.Employee).filter(models.Employee.id == request.employee_id).first()
+    employee = await db.get(models.Employee, request.employee_id)
 
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
 
     # Check if already clocked in
-    today_record = (
-        db.query(models.ClockRecord)
-        .filter(
-            models.ClockRecord.employee_id == request.employee_id,
-            models.ClockRecord.clock_in_time.like(datetime.utcnow().strftime("%Y-%m-%d%")),
-            models.ClockRecord.clock_out_time.is_(None),
-        )
-        .first()
-    )
+    open_record = await db.scalar(open_shift_query(request.employee_id))
 
-    if today_record:
+    if open_record:
         raise HTTPException(status_code=400, detail="Already clocked in")
 
     # Create clock record
@@ -39,74 +50,112 @@ def clock_in(request: schemas.ClockInRequest, db: Session = Depends(get_db)):
     )
 
     db.add(clock_record)
-    db.commit()
-    db.refresh(clock_record)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent punch opened the shift first; the unique open shift
+        # index rejects the second one
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Already clocked in")
+    await db.refresh(clock_record)
 
     return {"message": "Clocked in successfully", "record": schemas.ClockRecordResponse.from_orm(clock_record)}
 
 
 @router.post("/clock-out")
-def clock_out(request: schemas.ClockOutRequest, db: Session = Depends(get_db)):
+async def clock_out(request: schemas.ClockOutRequest, db: AsyncSession = Depends(get_db)):
     """Employee clock out"""
-    employee = db.query(models.Employee).filter(models.Employee.id == request.employee_id).first()
+    # Serializes with timesheet rollup rebuilds of the same employee
+    employee = await db.scalar(lock_employees(models.Employee.id == request.employee_id))
 
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
 
-    # Get today's clock in record
-    today_record = (
-        db.query(models.ClockRecord)
-        .filter(
-            models.ClockRecord.employee_id == request.employee_id,
-            models.ClockRecord.clock_in_time.like(datetime.utcnow().strftime("%Y-%m-%d%")),
-            models.ClockRecord.clock_out_time.is_(None),
-        )
-        .first()
-    )
+    # Lock the open shift so concurrent clock outs cannot both close it
+    open_record = await db.scalar(open_shift_query(request.employee_id).with_for_update())
 
-    if not today_record:
+    if not open_record:
         raise HTTPException(status_code=400, detail="No active clock in record")
 
     # Calculate hours
-    today_record.clock_out_time = datetime.utcnow()
-    worked_hours, overtime_hours = calculate_worked_hours(
-        today_record.clock_in_time, today_record.clock_out_time
+    clock_out_time = datetime.utcnow()
+    worked_hours, overtime_hours = calculate_worked_hours(open_record.clock_in_time, clock_out_time)
+
+    # Close the shift only if it is still open: SQLite ignores FOR UPDATE,
+    # and there a concurrent clock out may have closed it since the read
+    open_record = await db.scalar(
+        update(models.ClockRecord)
+        .where(models.ClockRecord.id == open_record.id, models.ClockRecord.clock_out_time.is_(None))
+        .values(clock_out_time=clock_out_time, worked_hours=worked_hours, overtime_hours=overtime_hours)
+        .returning(models.ClockRecord)
+        .execution_options(populate_existing=True)
     )
 
-    today_record.worked_hours = worked_hours
-    today_record.overtime_hours = overtime_hours
+    if not open_record:
+        raise HTTPException(status_code=400, detail="No active clock in record")
+
+    await add_shift(db, open_record)
 
-    db.commit()
-    db.refresh(today_record)
+    await db.commit()
+    await db.refresh(open_record)
 
     return {
         "message": "Clocked out successfully",
-        "record": schemas.ClockRecordResponse.from_orm(today_record),
+        "record": schemas.ClockRecordResponse.from_orm(open_record),
     }
 
 
 @router.get("/clock-records/{employee_id}", response_model=List[schemas.ClockRecordResponse])
-def get_clock_records(employee_id: int, db: Session = Depends(get_db)):
+async def get_clock_records(employee_id: int, db: AsyncSession = Depends(get_db)):
     """Get employee clock records"""
-    records = (
-        db.query(models.ClockRecord)
-        .filter(models.ClockRecord.employee_id == employee_id)
-        .all()
+    records = await db.scalars(
+        select(models.ClockRecord).filter(models.ClockRecord.employee_id == employee_id)
     )
-    return records
+    return records.all()
 
 
-@router.get("/", response_model=List[schemas.EmployeeResponse])
-def get_all_employees(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/timesheets", response_model=List[schemas.TimesheetEntry])
+async def get_department_timesheet(
+    role: str,
+    from_: date = Query(..., alias="from"),
+    to: date = Query(...),
+    period: TimesheetPeriod = "day",
+    db: AsyncSession = Depends(get_db),
+):
+    """Hours of every employee of a department (user role) per day or week, from the daily rollups"""
+    return await read_timesheet(db, from_, to, period, role=role)
+
+
+@router.post("/timesheets/backfill", dependencies=[Depends(require_roles("admin"))])
+async def backfill_timesheets():
+    """Rebuild all daily timesheet rollups from the clock records now"""
+    return await timesheet_backfill_job.run_once()
+
+
+@router.get("/{employee_id}/timesheet", response_model=List[schemas.TimesheetEntry])
+async def get_timesheet(
+    employee_id: int,
+    from_: date = Query(..., alias="from"),
+    to: date = Query(...),
+    period: TimesheetPeriod = "day",
+    db: AsyncSession = Depends(get_db),
+):
+    """Employee hours per day or week, from the daily rollups"""
+    return await read_timesheet(db, from_, to, period, employee_id=employee_id)
+
+
+@router.get("/", response_model=schemas.Page[schemas.EmployeeResponse])
+async def get_all_employees(page: PageParams = Depends(), db: AsyncSession = Depends(get_db)):
     """Get all employees"""
-    employees = db.query(models.Employee).offset(skip).limit(limit).all()
-    return employees
+    return await paginate(
+        db, select(models.Employee), models.Employee.id, page, schema=schemas.EmployeeResponse
+    )
 
 
 @router.get("/{employee_id}", response_model=schemas.EmployeeResponse)
-def get_employee(employee_id: int, db: Session = Depends(get_db)):
+async def get_employee(employee_id: int, db: AsyncSession = Depends(get_db)):
     """Get employee by ID"""
-    employee = db.query(models.Employee).filter(models.Employee.id == employee_id).first()
+    employee = await db.get(models.Employee, employee_id)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     return employee
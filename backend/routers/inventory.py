@@ -1,70 +1,139 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 import models
 import schemas
-from database import get_db
+from cache import encode_response, response_cache
+from database import get_db, open_request_session
+from dependencies import get_current_claims
+from filters import Eq, ListFilters, ListQuery, Range
+from pagination import PageParams, paginate
+from stock import decrement_stock, decrement_stock_batch, merge_quantities, raise_stock_error
+from stock_alerts import inventory_low_stock
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(get_current_claims)])
+
+item_filters = ListFilters(
+    Eq(models.Inventory.category),
+    Range(models.Inventory.created_at),
+    sort_keys=(models.Inventory.id,),
+)
+
+# Cached reads below are invalidated by every write in this router
+CACHE_NAMESPACE = "inventory"
 
 
 @router.post("/", response_model=schemas.InventoryResponse)
-def add_item(item: schemas.InventoryCreate, db: Session = Depends(get_db)):
+async def add_item(item: schemas.InventoryCreate, db: AsyncSession = Depends(get_db)):
     """Add item to inventory"""
     db_item = models.Inventory(**item.dict())
     db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
+    await db.commit()
+    version = await response_cache.invalidate(CACHE_NAMESPACE)
+    await db.refresh(db_item)
+    inventory_low_stock.record(db_item, version)
     return db_item
 
 
-@router.get("/", response_model=List[schemas.InventoryResponse])
-def get_all_items(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/", response_model=schemas.Page[schemas.InventoryResponse])
+async def get_all_items(
+    page: PageParams = Depends(), filters: ListQuery = Depends(item_filters)
+):
     """Get all inventory items"""
-    items = db.query(models.Inventory).offset(skip).limit(limit).all()
+
+    async def load():
+        async with open_request_session() as db:
+            content = await paginate(
+                db,
+                select(models.Inventory),
+                models.Inventory.id,
+                page,
+                schema=schemas.InventoryResponse,
+                filters=filters,
+            )
+        return encode_response(content, schemas.Page[schemas.InventoryResponse])
+
+    return await response_cache.get_or_load(
+        CACHE_NAMESPACE, f"list:{page.cache_key}:{filters.cache_key}", load
+    )
+
+
+@router.post("/consume", response_model=List[schemas.InventoryResponse])
+async def consume_items(batch: schemas.ConsumeBatchRequest, db: AsyncSession = Depends(get_db)):
+    """Consume several items at once; nothing is consumed unless all are in stock"""
+    quantities = merge_quantities((item.item_id, item.quantity) for item in batch.items)
+    items = await decrement_stock_batch(db, models.Inventory, quantities, "Item")
+    await db.commit()
+    version = await response_cache.invalidate(CACHE_NAMESPACE)
+    inventory_low_stock.record_many(items, version)
     return items
 
 
+@router.post("/{item_id}/consume", response_model=schemas.InventoryResponse)
+async def consume_item(
+    item_id: int, consume: schemas.ConsumeRequest, db: AsyncSession = Depends(get_db)
+):
+    """Consume stock of an item, atomically checking and decrementing quantity"""
+    item = await decrement_stock(db, models.Inventory, item_id, consume.quantity)
+    if item is None:
+        await db.rollback()
+        await raise_stock_error(db, models.Inventory, item_id, "Item")
+
+    await db.commit()
+    version = await response_cache.invalidate(CACHE_NAMESPACE)
+    inventory_low_stock.record(item, version)
+    return item
+
+
 @router.get("/{item_id}", response_model=schemas.InventoryResponse)
-def get_item(item_id: int, db: Session = Depends(get_db)):
+async def get_item(item_id: int):
     """Get inventory item by ID"""
-    item = db.query(models.Inventory).filter(models.Inventory.id == item_id).first()
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    return item
+
+    async def load():
+        async with open_request_session() as db:
+            item = await db.get(models.Inventory, item_id)
+        if not item:
+            raise HTTPException(status_code=404, detail="Item not found")
+        return encode_response(item, schemas.InventoryResponse)
+
+    return await response_cache.get_or_load(CACHE_NAMESPACE, f"item:{item_id}", load)
 
 
 @router.put("/{item_id}", response_model=schemas.InventoryResponse)
-def update_item(
-    item_id: int, item: schemas.InventoryUpdate, db: Session = Depends(get_db)
+async def update_item(
+    item_id: int, item: schemas.InventoryUpdate, db: AsyncSession = Depends(get_db)
 ):
     """Update inventory item"""
-    db_item = db.query(models.Inventory).filter(models.Inventory.id == item_id).first()
+    db_item = await db.get(models.Inventory, item_id)
     if not db_item:
         raise HTTPException(status_code=404, detail="Item not found")
 
     for field, value in item.dict(exclude_unset=True).items():
         setattr(db_item, field, value)
 
-    db.commit()
-    db.refresh(db_item)
+    await db.commit()
+    version = await response_cache.invalidate(CACHE_NAMESPACE)
+    await db.refresh(db_item)
+    inventory_low_stock.record(db_item, version)
     return db_item
 
 
 @router.delete("/{item_id}")
-def delete_item(item_id: int, db: Session = Depends(get_db)):
+async def delete_item(item_id: int, db: AsyncSession = Depends(get_db)):
     """Delete inventory item"""
-    item = db.query(models.Inventory).filter(models.Inventory.id == item_id).first()
+    item = await db.get(models.Inventory, item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
 
-    db.delete(item)
-    db.commit()
+    await db.delete(item)
+    await db.commit()
+    version = await response_cache.invalidate(CACHE_NAMESPACE)
+    inventory_low_stock.discard(item_id, version)
     return {"message": "Item deleted successfully"}
 
 
-@router.get("/low-stock/alert")
-def get_low_stock_items(db: Session = Depends(get_db)):
+@router.get("/low-stock/alert", response_model=List[schemas.InventoryResponse])
+async def get_low_stock_items():
     """Get items below reorder level"""
-    items = db.query(models.Inventory).filter(models.Inventory.quantity < models.Inventory.reorder_level).all()
-    return items
+    return await inventory_low_stock.get_items()
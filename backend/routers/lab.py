@@ -1,62 +1,90 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
 from typing import List
 import models
 import schemas
+from clinical_search import index_records
 from database import get_db
+from dependencies import get_current_claims
+from filters import Eq, ListFilters, ListQuery, Range
+from pagination import PageParams, paginate
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(get_current_claims)])
+
+lab_record_filters = ListFilters(
+    Eq(models.LabRecord.patient_id),
+    Eq(models.LabRecord.status),
+    Eq(models.LabRecord.test_type),
+    Range(models.LabRecord.created_at),
+    sort_keys=(models.LabRecord.id, models.LabRecord.created_at),
+)
 
 
 @router.post("/records", response_model=schemas.LabRecordResponse)
-def create_lab_record(record: schemas.LabRecordCreate, db: Session = Depends(get_db)):
+async def create_lab_record(record: schemas.LabRecordCreate, db: AsyncSession = Depends(get_db)):
     """Create new lab record"""
-    patient = db.query(models.Patient).filter(models.Patient.id == record.patient_id).first()
+    patient = await db.get(models.Patient, record.patient_id)
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
 
     db_record = models.LabRecord(**record.dict())
     db.add(db_record)
-    db.commit()
-    db.refresh(db_record)
+    await db.flush()
+    await index_records(db, "lab_record", [db_record])
+    await db.commit()
+    await db.refresh(db_record)
     return db_record
 
 
-@router.get("/records", response_model=List[schemas.LabRecordResponse])
-def get_all_lab_records(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/records", response_model=schemas.Page[schemas.LabRecordResponse])
+async def get_all_lab_records(
+    page: PageParams = Depends(),
+    filters: ListQuery = Depends(lab_record_filters),
+    db: AsyncSession = Depends(get_db),
+):
     """Get all lab records"""
-    records = db.query(models.LabRecord).offset(skip).limit(limit).all()
-    return records
+    return await paginate(
+        db, select(models.LabRecord), models.LabRecord.id, page, schema=schemas.LabRecordResponse, filters=filters
+    )
 
 
 @router.get("/records/{record_id}", response_model=schemas.LabRecordResponse)
-def get_lab_record(record_id: int, db: Session = Depends(get_db)):
+async def get_lab_record(record_id: int, db: AsyncSession = Depends(get_db)):
     """Get lab record by ID"""
-    record = db.query(models.LabRecord).filter(models.LabRecord.id == record_id).first()
+    record = await db.get(models.LabRecord, record_id)
     if not record:
         raise HTTPException(status_code=404, detail="Lab record not found")
     return record
 
 
 @router.put("/records/{record_id}", response_model=schemas.LabRecordResponse)
-def update_lab_record(
-    record_id: int, record: schemas.LabRecordUpdate, db: Session = Depends(get_db)
+async def update_lab_record(
+    record_id: int, record: schemas.LabRecordUpdate, db: AsyncSession = Depends(get_db)
 ):
     """Update lab record"""
-    db_record = db.query(models.LabRecord).filter(models.LabRecord.id == record_id).first()
+    db_record = await db.get(models.LabRecord, record_id)
     if not db_record:
         raise HTTPException(status_code=404, detail="Lab record not found")
 
-    for field, value in record.dict(exclude_unset=True).items():
+    updates = record.dict(exclude_unset=True)
+    if "status" in updates and updates["status"] != db_record.status:
+        db_record.completed_at = datetime.utcnow() if updates["status"] == "completed" else None
+    for field, value in updates.items():
         setattr(db_record, field, value)
 
-    db.commit()
-    db.refresh(db_record)
+    if "result" in updates:
+        await index_records(db, "lab_record", [db_record])
+    await db.commit()
+    await db.refresh(db_record)
     return db_record
 
 
 @router.get("/patient/{patient_id}", response_model=List[schemas.LabRecordResponse])
-def get_patient_lab_records(patient_id: int, db: Session = Depends(get_db)):
+async def get_patient_lab_records(patient_id: int, db: AsyncSession = Depends(get_db)):
     """Get all lab records for a patient"""
-    records = db.query(models.LabRecord).filter(models.LabRecord.patient_id == patient_id).all()
-    return records
+    records = await db.scalars(
+        select(models.LabRecord).filter(models.LabRecord.patient_id == patient_id)
+    )
+    return records.all()
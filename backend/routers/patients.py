@@ -1,63 +1,236 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from datetime import datetime
 from typing import List
+import csv
+import io
 import models
 import schemas
-from database import get_db
+from bulk import BulkFormat, bulk_insert, iter_records
+from clinical_search import index_new_records, index_records, remove_records
+from config import settings
+from database import get_db, open_request_session
+from dependencies import get_current_claims
+from filters import Eq, ListFilters, ListQuery, Range
+from pagination import PageParams, paginate
+from patient_search import find_patients, memory_index
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(get_current_claims)])
+
+patient_filters = ListFilters(
+    Eq(models.Patient.gender),
+    Range(models.Patient.created_at),
+    sort_keys=(models.Patient.id, models.Patient.created_at),
+)
 
 
 @router.post("/register", response_model=schemas.PatientResponse)
-def register_patient(patient: schemas.PatientCreate, db: Session = Depends(get_db)):
+async def register_patient(patient: schemas.PatientCreate, db: AsyncSession = Depends(get_db)):
     """Register new patient"""
     db_patient = models.Patient(**patient.dict())
     db.add(db_patient)
-    db.commit()
-    db.refresh(db_patient)
+    await db.flush()
+    await index_records(db, "patient", [db_patient])
+    await db.commit()
+    await db.refresh(db_patient)
+    memory_index.add(db_patient)
     return db_patient
 
 
-@router.get("/", response_model=List[schemas.PatientResponse])
-def get_all_patients(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/", response_model=schemas.Page[schemas.PatientResponse])
+async def get_all_patients(
+    page: PageParams = Depends(),
+    filters: ListQuery = Depends(patient_filters),
+    db: AsyncSession = Depends(get_db),
+):
     """Get all patients"""
-    patients = db.query(models.Patient).offset(skip).limit(limit).all()
-    return patients
+    return await paginate(
+        db, select(models.Patient), models.Patient.id, page, schema=schemas.PatientResponse, filters=filters
+    )
+
+
+@router.post("/import", response_model=schemas.BulkImportResponse)
+async def import_patients(
+    request: Request,
+    format: BulkFormat = "ndjson",
+    db: AsyncSession = Depends(get_db),
+):
+    """Bulk register patients from a streamed CSV or NDJSON body"""
+    inserted = 0
+    failed = 0
+    errors = []
+    chunk = []
+    last_id = await db.scalar(select(func.max(models.Patient.id)))
+
+    async def flush():
+        nonlocal inserted
+        await bulk_insert(db, models.Patient, chunk)
+        await db.commit()
+        inserted += len(chunk)
+        chunk.clear()
+
+    row = 0
+    async for record in iter_records(request.stream(), format):
+        row += 1
+        try:
+            if isinstance(record, ValueError):
+                raise record
+            patient = schemas.PatientCreate.model_validate(record)
+        except ValidationError as exc:
+            row_errors = [f"{'.'.join(map(str, e['loc'])) or 'row'}: {e['msg']}" for e in exc.errors()]
+        except ValueError:
+            row_errors = ["row: invalid JSON"]
+        else:
+            now = datetime.utcnow()
+            chunk.append({**patient.dict(), "created_at": now, "updated_at": now})
+            if len(chunk) >= settings.bulk_chunk_size:
+                await flush()
+            continue
+
+        failed += 1
+        if len(errors) < settings.bulk_max_reported_errors:
+            errors.append({"row": row, "errors": row_errors})
+
+    await flush()
+    if inserted:
+        await memory_index.index_new_patients(db, last_id or 0)
+        await index_new_records("patient", last_id or 0)
+    return {"inserted": inserted, "failed": failed, "errors": errors}
+
+
+async def stream_patients(format: BulkFormat):
+    """Yield every patient in id order, one chunk at a time"""
+    fields = list(schemas.PatientResponse.model_fields)
+    if format == "csv":
+        yield ",".join(fields) + "\n"
+
+    async with open_request_session() as db:
+        patients = await db.stream_scalars(
+            select(models.Patient)
+            .order_by(models.Patient.id)
+            .execution_options(yield_per=settings.bulk_chunk_size)
+        )
+        async for partition in patients.partitions():
+            rows = [schemas.PatientResponse.model_validate(patient) for patient in partition]
+            if format == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer, lineterminator="\n")
+                for patient in rows:
+                    writer.writerow(patient.model_dump(mode="json").values())
+                yield buffer.getvalue()
+            else:
+                yield "".join(patient.model_dump_json() + "\n" for patient in rows)
+
+
+@router.get("/export")
+async def export_patients(format: BulkFormat = "ndjson"):
+    """Stream all patients as CSV or NDJSON"""
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_patients(format),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=patients.{format}"},
+    )
+
+
+@router.get("/search", response_model=List[schemas.PatientResponse])
+async def search_patients(
+    q: str = Query(min_length=2, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+):
+    """Find patients by name, email or phone, tolerating typos; best matches first"""
+    return await find_patients(db, q, limit)
 
 
 @router.get("/{patient_id}", response_model=schemas.PatientResponse)
-def get_patient(patient_id: int, db: Session = Depends(get_db)):
+async def get_patient(patient_id: int, db: AsyncSession = Depends(get_db)):
     """Get patient by ID"""
-    patient = db.query(models.Patient).filter(models.Patient.id == patient_id).first()
+    patient = await db.get(models.Patient, patient_id)
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
     return patient
 
 
+@router.get("/{patient_id}/chart", response_model=schemas.PatientChartResponse)
+async def get_patient_chart(
+    patient_id: int,
+    appointments_limit: int = Query(20, ge=0, le=settings.max_page_size),
+    lab_records_limit: int = Query(20, ge=0, le=settings.max_page_size),
+    medical_records_limit: int = Query(20, ge=0, le=settings.max_page_size),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Patient with their most recent appointments (with doctor), lab records
+    and medical records. Always four queries, one per section, each served
+    by the section's patient_id index.
+    """
+    patient = await db.get(models.Patient, patient_id)
+    if not patient:
+        raise HTTPException(status_code=404, detail="Patient not found")
+
+    appointments = await db.scalars(
+        select(models.Appointment)
+        .options(joinedload(models.Appointment.doctor))
+        .filter(models.Appointment.patient_id == patient_id)
+        .order_by(models.Appointment.starts_at.desc())
+        .limit(appointments_limit)
+    )
+    lab_records = await db.scalars(
+        select(models.LabRecord)
+        .filter(models.LabRecord.patient_id == patient_id)
+        .order_by(models.LabRecord.created_at.desc())
+        .limit(lab_records_limit)
+    )
+    medical_records = await db.scalars(
+        select(models.MedicalRecord)
+        .filter(models.MedicalRecord.patient_id == patient_id)
+        .order_by(models.MedicalRecord.created_at.desc())
+        .limit(medical_records_limit)
+    )
+
+    return {
+        "patient": patient,
+        "appointments": appointments.all(),
+        "lab_records": lab_records.all(),
+        "medical_records": medical_records.all(),
+    }
+
+
 @router.put("/{patient_id}", response_model=schemas.PatientResponse)
-def update_patient(
-    patient_id: int, patient: schemas.PatientUpdate, db: Session = Depends(get_db)
+async def update_patient(
+    patient_id: int, patient: schemas.PatientUpdate, db: AsyncSession = Depends(get_db)
 ):
     """Update patient information"""
-    db_patient = db.query(models.Patient).filter(models.Patient.id == patient_id).first()
+    db_patient = await db.get(models.Patient, patient_id)
     if not db_patient:
         raise HTTPException(status_code=404, detail="Patient not found")
 
-    for field, value in patient.dict(exclude_unset=True).items():
+    updates = patient.dict(exclude_unset=True)
+    for field, value in updates.items():
         setattr(db_patient, field, value)
 
-    db.commit()
-    db.refresh(db_patient)
+    if "medical_history" in updates:
+        await index_records(db, "patient", [db_patient])
+    await db.commit()
+    await db.refresh(db_patient)
+    memory_index.add(db_patient)
     return db_patient
 
 
 @router.delete("/{patient_id}")
-def delete_patient(patient_id: int, db: Session = Depends(get_db)):
+async def delete_patient(patient_id: int, db: AsyncSession = Depends(get_db)):
     """Delete patient"""
-    patient = db.query(models.Patient).filter(models.Patient.id == patient_id).first()
+    patient = await db.get(models.Patient, patient_id)
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
 
-    db.delete(patient)
-    db.commit()
+    await db.delete(patient)
+    await remove_records(db, "patient", [patient_id])
+    await db.commit()
+    memory_index.remove(patient_id)
     return {"message": "Patient deleted successfully"}
@@ -0,0 +1,93 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+import models
+import schemas
+from database import get_db
+from dependencies import require_roles
+from filters import Eq, ListFilters, ListQuery
+from pagination import PageParams, paginate
+from payroll import PAYMENT_TRANSITIONS, canonical_month, run_payroll, set_payment_status
+
+router = APIRouter(dependencies=[Depends(require_roles("admin", "finance"))])
+
+
+def month_filter(month: str) -> str:
+    """YYYY-MM spelling of a `?month=` filter; a malformed one is rejected like other bad filters"""
+    try:
+        return canonical_month(month)
+    except HTTPException as error:
+        raise HTTPException(status_code=422, detail=error.detail)
+
+
+payment_request_filters = ListFilters(
+    Eq(models.PaymentRequest.month, parse=month_filter),
+    Eq(models.PaymentRequest.status),
+    Eq(models.PaymentRequest.employee_id),
+    sort_keys=(models.PaymentRequest.id,),
+)
+
+
+@router.post("/run", response_model=schemas.PayrollRunResponse)
+async def run_monthly_payroll(
+    month: str = Query(description="YYYY-MM"), db: AsyncSession = Depends(get_db)
+):
+    """Create the month's payment requests for every active employee; safe to rerun"""
+    return await run_payroll(db, month)
+
+
+@router.get("/requests", response_model=schemas.Page[schemas.PaymentRequestResponse])
+async def get_payment_requests(
+    page: PageParams = Depends(),
+    filters: ListQuery = Depends(payment_request_filters),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get payment requests, optionally of one month, status or employee"""
+    return await paginate(
+        db,
+        select(models.PaymentRequest),
+        models.PaymentRequest.id,
+        page,
+        schema=schemas.PaymentRequestResponse,
+        filters=filters,
+    )
+
+
+@router.post("/requests/status", response_model=schemas.PaymentStatusBatchResponse)
+async def set_payment_requests_status(
+    request: schemas.PaymentStatusBatchRequest, db: AsyncSession = Depends(get_db)
+):
+    """Approve, reject or mark as paid the listed requests, or all requests of a month"""
+    if request.ids is None and request.month is None:
+        raise HTTPException(status_code=400, detail="Give ids or month")
+    updated = await set_payment_status(db, request.status, ids=request.ids, month=request.month)
+    return {"updated": updated}
+
+
+@router.get("/requests/{request_id}", response_model=schemas.PaymentRequestResponse)
+async def get_payment_request(request_id: int, db: AsyncSession = Depends(get_db)):
+    """Get payment request by ID"""
+    payment_request = await db.get(models.PaymentRequest, request_id)
+    if not payment_request:
+        raise HTTPException(status_code=404, detail="Payment request not found")
+    return payment_request
+
+
+@router.put("/requests/{request_id}", response_model=schemas.PaymentRequestResponse)
+async def update_payment_request(
+    request_id: int, update: schemas.PaymentRequestUpdate, db: AsyncSession = Depends(get_db)
+):
+    """Change the status of one payment request"""
+    payment_request = await db.get(models.PaymentRequest, request_id, with_for_update=True)
+    if not payment_request:
+        raise HTTPException(status_code=404, detail="Payment request not found")
+    if PAYMENT_TRANSITIONS.get(update.status) != payment_request.status:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot change a {payment_request.status} payment request to {update.status}",
+        )
+
+    payment_request.status = update.status
+    await db.commit()
+    await db.refresh(payment_request)
+    return payment_request
@@ -1,70 +1,190 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_, case, or_, select
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 import models
 import schemas
-from database import get_db
+from cache import encode_response, response_cache
+from database import get_db, open_request_session
+from dependencies import get_current_claims, require_roles
+from filters import Eq, ListFilters, ListQuery, Range
+from pagination import PageParams, paginate
+from pharmacy_sweep import pharmacy_sweep_job
+from stock import decrement_stock, decrement_stock_batch, merge_quantities, raise_stock_error
+from stock_alerts import pharmacy_low_stock
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(get_current_claims)])
+
+medicine_filters = ListFilters(
+    Eq(models.Pharmacy.status),
+    Range(models.Pharmacy.expiry_date),
+    Range(models.Pharmacy.created_at),
+    sort_keys=(models.Pharmacy.id,),
+)
+
+# Cached reads below are invalidated by every write in this router
+CACHE_NAMESPACE = "pharmacy"
 
 
 @router.post("/", response_model=schemas.PharmacyResponse)
-def add_medicine(medicine: schemas.PharmacyCreate, db: Session = Depends(get_db)):
+async def add_medicine(medicine: schemas.PharmacyCreate, db: AsyncSession = Depends(get_db)):
     """Add medicine to pharmacy"""
     db_medicine = models.Pharmacy(**medicine.dict())
     db.add(db_medicine)
-    db.commit()
-    db.refresh(db_medicine)
+    await db.commit()
+    version = await response_cache.invalidate(CACHE_NAMESPACE)
+    await db.refresh(db_medicine)
+    pharmacy_low_stock.record(db_medicine, version)
     return db_medicine
 
 
-@router.get("/", response_model=List[schemas.PharmacyResponse])
-def get_all_medicines(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/", response_model=schemas.Page[schemas.PharmacyResponse])
+async def get_all_medicines(
+    page: PageParams = Depends(), filters: ListQuery = Depends(medicine_filters)
+):
     """Get all medicines"""
-    medicines = db.query(models.Pharmacy).offset(skip).limit(limit).all()
+
+    async def load():
+        async with open_request_session() as db:
+            content = await paginate(
+                db,
+                select(models.Pharmacy),
+                models.Pharmacy.id,
+                page,
+                schema=schemas.PharmacyResponse,
+                filters=filters,
+            )
+        return encode_response(content, schemas.Page[schemas.PharmacyResponse])
+
+    return await response_cache.get_or_load(
+        CACHE_NAMESPACE, f"list:{page.cache_key}:{filters.cache_key}", load
+    )
+
+
+@router.get("/expiring", response_model=List[schemas.PharmacyResponse])
+async def get_expiring_medicines(
+    days: int = Query(30, ge=0, le=3650), db: AsyncSession = Depends(get_db)
+):
+    """Get unexpired medicines expiring within the next days, soonest first"""
+    now = datetime.utcnow()
+    medicines = await db.scalars(
+        select(models.Pharmacy)
+        .filter(
+            models.Pharmacy.status != "expired",
+            models.Pharmacy.expiry_date > now,
+            models.Pharmacy.expiry_date <= now + timedelta(days=days),
+        )
+        .order_by(models.Pharmacy.expiry_date)
+    )
+    return medicines.all()
+
+
+@router.post("/sweep", dependencies=[Depends(require_roles("admin"))])
+async def sweep_medicine_statuses():
+    """Run the expiry and stock status sweep now"""
+    return {"updated": await pharmacy_sweep_job.run_once()}
+
+
+def dispense_stock(db: AsyncSession, model, medicine_id: int, quantity: int):
+    """
+    Take stock off an unexpired medicine, marking it out of stock once
+    emptied. Expiry is checked against expiry_date as well as the status,
+    which the sweep only updates every PHARMACY_SWEEP_INTERVAL_SECONDS.
+    """
+    return decrement_stock(
+        db,
+        model,
+        medicine_id,
+        quantity,
+        model.status != "expired",
+        or_(model.expiry_date.is_(None), model.expiry_date > datetime.utcnow()),
+        status=case(
+            (and_(model.status == "available", model.quantity <= quantity), "out_of_stock"),
+            else_=model.status,
+        ),
+    )
+
+
+@router.post("/dispense", response_model=List[schemas.PharmacyResponse])
+async def dispense_prescription(
+    batch: schemas.DispenseBatchRequest, db: AsyncSession = Depends(get_db)
+):
+    """Dispense several medicines at once; nothing is dispensed unless all are in stock"""
+    quantities = merge_quantities((item.medicine_id, item.quantity) for item in batch.items)
+    medicines = await decrement_stock_batch(
+        db, models.Pharmacy, quantities, "Medicine", decrement=dispense_stock
+    )
+    await db.commit()
+    version = await response_cache.invalidate(CACHE_NAMESPACE)
+    pharmacy_low_stock.record_many(medicines, version)
     return medicines
 
 
+@router.post("/{medicine_id}/dispense", response_model=schemas.PharmacyResponse)
+async def dispense_medicine(
+    medicine_id: int, dispense: schemas.DispenseRequest, db: AsyncSession = Depends(get_db)
+):
+    """Dispense medicine, atomically checking and decrementing stock"""
+    medicine = await dispense_stock(db, models.Pharmacy, medicine_id, dispense.quantity)
+    if medicine is None:
+        await db.rollback()
+        await raise_stock_error(db, models.Pharmacy, medicine_id, "Medicine")
+
+    await db.commit()
+    version = await response_cache.invalidate(CACHE_NAMESPACE)
+    pharmacy_low_stock.record(medicine, version)
+    return medicine
+
+
 @router.get("/{medicine_id}", response_model=schemas.PharmacyResponse)
-def get_medicine(medicine_id: int, db: Session = Depends(get_db)):
+async def get_medicine(medicine_id: int):
     """Get medicine by ID"""
-    medicine = db.query(models.Pharmacy).filter(models.Pharmacy.id == medicine_id).first()
-    if not medicine:
-        raise HTTPException(status_code=404, detail="Medicine not found")
-    return medicine
+
+    async def load():
+        async with open_request_session() as db:
+            medicine = await db.get(models.Pharmacy, medicine_id)
+        if not medicine:
+            raise HTTPException(status_code=404, detail="Medicine not found")
+        return encode_response(medicine, schemas.PharmacyResponse)
+
+    return await response_cache.get_or_load(CACHE_NAMESPACE, f"item:{medicine_id}", load)
 
 
 @router.put("/{medicine_id}", response_model=schemas.PharmacyResponse)
-def update_medicine(
-    medicine_id: int, medicine: schemas.PharmacyUpdate, db: Session = Depends(get_db)
+async def update_medicine(
+    medicine_id: int, medicine: schemas.PharmacyUpdate, db: AsyncSession = Depends(get_db)
 ):
     """Update medicine"""
-    db_medicine = db.query(models.Pharmacy).filter(models.Pharmacy.id == medicine_id).first()
+    db_medicine = await db.get(models.Pharmacy, medicine_id)
     if not db_medicine:
         raise HTTPException(status_code=404, detail="Medicine not found")
 
     for field, value in medicine.dict(exclude_unset=True).items():
         setattr(db_medicine, field, value)
 
-    db.commit()
-    db.refresh(db_medicine)
+    await db.commit()
+    version = await response_cache.invalidate(CACHE_NAMESPACE)
+    await db.refresh(db_medicine)
+    pharmacy_low_stock.record(db_medicine, version)
     return db_medicine
 
 
 @router.delete("/{medicine_id}")
-def delete_medicine(medicine_id: int, db: Session = Depends(get_db)):
+async def delete_medicine(medicine_id: int, db: AsyncSession = Depends(get_db)):
     """Delete medicine"""
-    medicine = db.query(models.Pharmacy).filter(models.Pharmacy.id == medicine_id).first()
+    medicine = await db.get(models.Pharmacy, medicine_id)
     if not medicine:
         raise HTTPException(status_code=404, detail="Medicine not found")
 
-    db.delete(medicine)
-    db.commit()
+    await db.delete(medicine)
+    await db.commit()
+    version = await response_cache.invalidate(CACHE_NAMESPACE)
+    pharmacy_low_stock.discard(medicine_id, version)
     return {"message": "Medicine deleted successfully"}
 
 
-@router.get("/low-stock/alert")
-def get_low_stock_medicines(db: Session = Depends(get_db)):
-    """Get medicines with low stock"""
-    medicines = db.query(models.Pharmacy).filter(models.Pharmacy.quantity < 10).all()
-    return medicines
+@router.get("/low-stock/alert", response_model=List[schemas.PharmacyResponse])
+async def get_low_stock_medicines():
+    """Get medicines below their reorder level"""
+    return await pharmacy_low_stock.get_items()
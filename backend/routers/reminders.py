@@ -1,75 +1,106 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 import models
 import schemas
+from appointment_reminders import appointment_reminder_job
 from database import get_db
+from dependencies import get_current_claims, require_roles
+from filters import Eq, ListFilters, ListQuery, Range
+from pagination import PageParams, paginate
+from reminder_dispatch import reminder_dispatch_job
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(get_current_claims)])
+
+reminder_filters = ListFilters(
+    Eq(models.Reminder.patient_id),
+    Eq(models.Reminder.appointment_id),
+    Eq(models.Reminder.reminder_type),
+    Eq(models.Reminder.sent),
+    Range(models.Reminder.scheduled_time),
+    Range(models.Reminder.created_at),
+    sort_keys=(models.Reminder.id, models.Reminder.scheduled_time),
+)
 
 
 @router.post("/", response_model=schemas.ReminderResponse)
-def create_reminder(reminder: schemas.ReminderCreate, db: Session = Depends(get_db)):
+async def create_reminder(reminder: schemas.ReminderCreate, db: AsyncSession = Depends(get_db)):
     """Create new reminder"""
     db_reminder = models.Reminder(**reminder.dict())
     db.add(db_reminder)
-    db.commit()
-    db.refresh(db_reminder)
+    await db.commit()
+    await db.refresh(db_reminder)
     return db_reminder
 
 
-@router.get("/", response_model=List[schemas.ReminderResponse])
-def get_all_reminders(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/", response_model=schemas.Page[schemas.ReminderResponse])
+async def get_all_reminders(
+    page: PageParams = Depends(),
+    filters: ListQuery = Depends(reminder_filters),
+    db: AsyncSession = Depends(get_db),
+):
     """Get all reminders"""
-    reminders = db.query(models.Reminder).offset(skip).limit(limit).all()
-    return reminders
+    return await paginate(
+        db, select(models.Reminder), models.Reminder.id, page, schema=schemas.ReminderResponse, filters=filters
+    )
+
+
+@router.post("/generate", dependencies=[Depends(require_roles("admin"))])
+async def generate_reminders():
+    """Create reminders for upcoming appointments now"""
+    return await appointment_reminder_job.run_once()
+
+
+@router.post("/dispatch", dependencies=[Depends(require_roles("admin"))])
+async def dispatch_reminders():
+    """Send all due reminders now"""
+    return await reminder_dispatch_job.run_once()
 
 
 @router.get("/{reminder_id}", response_model=schemas.ReminderResponse)
-def get_reminder(reminder_id: int, db: Session = Depends(get_db)):
+async def get_reminder(reminder_id: int, db: AsyncSession = Depends(get_db)):
     """Get reminder by ID"""
-    reminder = db.query(models.Reminder).filter(models.Reminder.id == reminder_id).first()
+    reminder = await db.get(models.Reminder, reminder_id)
     if not reminder:
         raise HTTPException(status_code=404, detail="Reminder not found")
     return reminder
 
 
 @router.put("/{reminder_id}", response_model=schemas.ReminderResponse)
-def update_reminder(
-    reminder_id: int, reminder: schemas.ReminderResponse, db: Session = Depends(get_db)
+async def update_reminder(
+    reminder_id: int, reminder: schemas.ReminderResponse, db: AsyncSession = Depends(get_db)
 ):
     """Update reminder"""
-    db_reminder = db.query(models.Reminder).filter(models.Reminder.id == reminder_id).first()
+    db_reminder = await db.get(models.Reminder, reminder_id)
     if not db_reminder:
         raise HTTPException(status_code=404, detail="Reminder not found")
 
     db_reminder.sent = reminder.sent
-    db.commit()
-    db.refresh(db_reminder)
+    await db.commit()
+    await db.refresh(db_reminder)
     return db_reminder
 
 
 @router.get("/pending/patient/{patient_id}", response_model=List[schemas.ReminderResponse])
-def get_pending_patient_reminders(patient_id: int, db: Session = Depends(get_db)):
+async def get_pending_patient_reminders(patient_id: int, db: AsyncSession = Depends(get_db)):
     """Get pending reminders for a patient"""
-    reminders = (
-        db.query(models.Reminder)
-        .filter(
+    reminders = await db.scalars(
+        select(models.Reminder).filter(
             models.Reminder.patient_id == patient_id,
             models.Reminder.sent == False,
         )
-        .all()
     )
-    return reminders
+    return reminders.all()
 
 
 @router.post("/{reminder_id}/mark-sent")
-def mark_reminder_sent(reminder_id: int, db: Session = Depends(get_db)):
+async def mark_reminder_sent(reminder_id: int, db: AsyncSession = Depends(get_db)):
     """Mark reminder as sent"""
-    reminder = db.query(models.Reminder).filter(models.Reminder.id == reminder_id).first()
+    reminder = await db.get(models.Reminder, reminder_id)
     if not reminder:
         raise HTTPException(status_code=404, detail="Reminder not found")
 
     reminder.sent = True
-    db.commit()
+    await db.commit()
     return {"message": "Reminder marked as sent"}
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import schemas
+from clinical_search import SearchSource, search
+from database import get_db
+from dependencies import get_current_claims
+from pagination import PageParams, decode_cursor, encode_cursor
+
+router = APIRouter(dependencies=[Depends(get_current_claims)])
+
+
+@router.get("/clinical", response_model=schemas.Page[schemas.ClinicalSearchHit])
+async def search_clinical_text(
+    q: str = Query(min_length=2, max_length=200),
+    source: Optional[SearchSource] = None,
+    patient_id: Optional[int] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Search medical histories, lab records and medical records, best
+    matches first, with the matched words highlighted in each snippet.
+    Ranked pages are fetched by offset, which the cursor carries.
+    """
+    offset = decode_cursor(page.cursor) if page.cursor else 0
+    if not isinstance(offset, int) or offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    # Fetch one extra hit to know whether another page exists
+    hits, total = await search(
+        db, q, offset, page.limit + 1, source, patient_id, include_total=page.include_total
+    )
+    next_cursor = None
+    if len(hits) > page.limit:
+        hits = hits[: page.limit]
+        next_cursor = encode_cursor(offset + page.limit)
+    return {"items": hits, "next_cursor": next_cursor, "total": total}
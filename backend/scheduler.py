@@ -0,0 +1,117 @@
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class JobStats:
+    """Run counts and timings of a periodic job"""
+
+    def __init__(self):
+        self.runs = 0
+        self.failures = 0
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+        self.last_duration = 0.0
+        self.last_started_at: Optional[datetime] = None
+        self.last_result = None
+        self.last_error: Optional[str] = None
+
+    def record(self, duration: float, result=None, error: Optional[str] = None):
+        self.runs += 1
+        self.total_duration += duration
+        self.max_duration = max(self.max_duration, duration)
+        self.last_duration = duration
+        if error is None:
+            self.last_result = result
+        else:
+            self.failures += 1
+        self.last_error = error
+
+    def as_dict(self) -> dict:
+        average = self.total_duration / self.runs if self.runs else 0.0
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_started_at": self.last_started_at.isoformat() if self.last_started_at else None,
+            "last_duration_ms": round(self.last_duration * 1000, 3),
+            "avg_duration_ms": round(average * 1000, 3),
+            "max_duration_ms": round(self.max_duration * 1000, 3),
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+        }
+
+
+class PeriodicJob:
+    """Coroutine run every interval seconds on the event loop; 0 disables the schedule"""
+
+    def __init__(self, name: str, interval: float, run: Callable[[], Awaitable]):
+        self.name = name
+        self.interval = interval
+        self.run = run
+        self.stats = JobStats()
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self):
+        self.stats.last_started_at = datetime.utcnow()
+        start = time.perf_counter()
+        try:
+            result = await self.run()
+        except Exception as exc:
+            self.stats.record(time.perf_counter() - start, error=repr(exc))
+            raise
+        self.stats.record(time.perf_counter() - start, result=result)
+        return result
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Periodic job %s failed", self.name)
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class Scheduler:
+    """Periodic jobs started and stopped with the application"""
+
+    def __init__(self):
+        self.jobs: List[PeriodicJob] = []
+
+    def add_job(self, name: str, interval: float, run: Callable[[], Awaitable]) -> PeriodicJob:
+        job = PeriodicJob(name, interval, run)
+        self.jobs.append(job)
+        return job
+
+    def start(self):
+        for job in self.jobs:
+            job.start()
+
+    async def stop(self):
+        for job in self.jobs:
+            await job.stop()
+
+    def stats(self) -> dict:
+        return {
+            job.name: {"interval_seconds": job.interval, **job.stats.as_dict()}
+            for job in self.jobs
+        }
+
+
+scheduler = Scheduler()
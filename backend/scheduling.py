@@ -0,0 +1,115 @@
+from datetime import datetime, time, timedelta
+from fastapi import HTTPException
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import functools
+import models
+from config import settings
+
+Appointment = models.Appointment
+
+TIME_FORMATS = ("%H:%M", "%H:%M:%S", "%I:%M %p", "%I:%M%p")
+
+
+# Times repeat heavily across appointments, so parsed values are memoized
+@functools.lru_cache(maxsize=4096)
+def parse_time_of_day(value: Optional[str]) -> Optional[time]:
+    for time_format in TIME_FORMATS:
+        try:
+            return datetime.strptime((value or "").strip(), time_format).time()
+        except ValueError:
+            continue
+    return None
+
+
+def appointment_start(appointment) -> Optional[datetime]:
+    """Combine the appointment date with its free-text time of day"""
+    if appointment.appointment_date is None:
+        return None
+    time_of_day = parse_time_of_day(appointment.appointment_time)
+    if time_of_day is None:
+        return appointment.appointment_date
+    return datetime.combine(appointment.appointment_date.date(), time_of_day)
+
+
+def appointment_end(appointment) -> datetime:
+    return appointment.starts_at + timedelta(minutes=appointment.duration_minutes)
+
+
+def set_start(appointment):
+    """Validate the date, time and duration fields and derive starts_at from them"""
+    if parse_time_of_day(appointment.appointment_time) is None:
+        raise HTTPException(status_code=400, detail="Invalid appointment time")
+    if not 0 < appointment.duration_minutes <= settings.appointment_max_duration_minutes:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Duration must be between 1 and {settings.appointment_max_duration_minutes} minutes",
+        )
+    starts_at = appointment_start(appointment)
+    if starts_at is None:
+        raise HTTPException(status_code=400, detail="Appointment date is required")
+    appointment.starts_at = starts_at
+
+
+async def find_conflict(
+    db: AsyncSession,
+    doctor_id: int,
+    start: datetime,
+    end: datetime,
+    exclude_id: Optional[int] = None,
+) -> Optional[Appointment]:
+    """
+    First active appointment of the doctor overlapping [start, end). Only
+    appointments starting less than the longest allowed duration before
+    start are read, through the (doctor_id, starts_at) index, so the cost
+    is an index seek plus the handful of bookings around the slot.
+    """
+    longest = timedelta(minutes=settings.appointment_max_duration_minutes)
+    query = select(Appointment).filter(
+        Appointment.doctor_id == doctor_id,
+        Appointment.starts_at > start - longest,
+        Appointment.starts_at < end,
+        Appointment.status != "cancelled",
+    )
+    if exclude_id is not None:
+        query = query.filter(Appointment.id != exclude_id)
+
+    for other in await db.scalars(query):
+        if appointment_end(other) > start:
+            return other
+    return None
+
+
+async def ensure_slot_free(db: AsyncSession, appointment):
+    """
+    Set starts_at and reject a booking that overlaps another of the
+    doctor's appointments. The doctor row is locked first, so concurrent
+    bookings for the same doctor are checked one after the other.
+    """
+    set_start(appointment)
+
+    await db.get(models.User, appointment.doctor_id, with_for_update=True)
+    conflict = await find_conflict(
+        db,
+        appointment.doctor_id,
+        appointment.starts_at,
+        appointment_end(appointment),
+        exclude_id=appointment.id,
+    )
+    if conflict:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Doctor already has appointment {conflict.id} at {conflict.starts_at:%Y-%m-%d %H:%M}",
+        )
+
+
+async def reset_reminders(db: AsyncSession, appointment):
+    """Drop unsent reminders so the reminder job regenerates them for the new slot"""
+    await db.execute(
+        delete(models.Reminder).where(
+            models.Reminder.appointment_id == appointment.id,
+            models.Reminder.sent == False,
+        )
+    )
+    appointment.reminder_sent = False
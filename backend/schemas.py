@@ -1,6 +1,27 @@
-from pydantic import BaseModel, EmailStr
-from datetime import datetime
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, Field
+from datetime import date, datetime
+from typing import Optional, List, Generic, Literal, TypeVar
+
+T = TypeVar("T")
+
+
+# Pagination Schemas
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
+# Bulk Import Schemas
+class BulkRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class BulkImportResponse(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[BulkRowError]
 
 
 # User/Auth Schemas
@@ -30,6 +51,8 @@ class UserResponse(BaseModel):
 
 
 class PasswordChange(BaseModel):
+    # Only needed without a bearer token, such as after an expired password
+    email: Optional[EmailStr] = None
     old_password: str
     new_password: str
     confirm_password: str
@@ -100,11 +123,16 @@ class AppointmentCreate(BaseModel):
     doctor_id: int
     appointment_date: datetime
     appointment_time: str
+    duration_minutes: Optional[int] = None
     reason: str
     notes: Optional[str] = None
 
 
 class AppointmentUpdate(BaseModel):
+    doctor_id: Optional[int] = None
+    appointment_date: Optional[datetime] = None
+    appointment_time: Optional[str] = None
+    duration_minutes: Optional[int] = None
     status: Optional[str] = None
     notes: Optional[str] = None
 
@@ -115,6 +143,8 @@ class AppointmentResponse(BaseModel):
     doctor_id: int
     appointment_date: datetime
     appointment_time: str
+    starts_at: Optional[datetime]
+    duration_minutes: int
     status: str
     reason: str
     notes: Optional[str]
@@ -124,6 +154,26 @@ class AppointmentResponse(BaseModel):
         from_attributes = True
 
 
+class DoctorSummary(BaseModel):
+    id: int
+    name: str
+    email: str
+    role: str
+
+    class Config:
+        from_attributes = True
+
+
+class ChartAppointmentResponse(AppointmentResponse):
+    doctor: Optional[DoctorSummary]
+
+
+class AvailabilityWindow(BaseModel):
+    doctor_id: int
+    start: datetime
+    end: datetime
+
+
 # Clock Record Schemas
 class ClockInRequest(BaseModel):
     employee_id: int
@@ -145,6 +195,14 @@ class ClockRecordResponse(BaseModel):
         from_attributes = True
 
 
+class TimesheetEntry(BaseModel):
+    employee_id: int
+    period_start: date
+    worked_hours: float
+    overtime_hours: float
+    shifts: int
+
+
 # Payment Request Schemas
 class PaymentRequestCreate(BaseModel):
     employee_id: int
@@ -173,6 +231,23 @@ class PaymentRequestResponse(BaseModel):
         from_attributes = True
 
 
+class PayrollRunResponse(BaseModel):
+    month: str
+    created: int
+    requests: int
+    total_amount: float
+
+
+class PaymentStatusBatchRequest(BaseModel):
+    status: Literal["approved", "rejected", "paid"] = "approved"
+    ids: Optional[List[int]] = Field(None, min_length=1)
+    month: Optional[str] = None
+
+
+class PaymentStatusBatchResponse(BaseModel):
+    updated: int
+
+
 # Lab Record Schemas
 class LabRecordCreate(BaseModel):
     patient_id: int
@@ -194,21 +269,56 @@ class LabRecordResponse(BaseModel):
     result: Optional[str]
     status: str
     created_at: datetime
+    completed_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
 
+# Medical Record Schemas
+class MedicalRecordResponse(BaseModel):
+    id: int
+    patient_id: int
+    doctor_id: Optional[int]
+    diagnosis: Optional[str]
+    treatment: Optional[str]
+    prescription: Optional[str]
+    notes: Optional[str]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# Patient Chart Schemas
+class PatientChartResponse(BaseModel):
+    patient: PatientResponse
+    appointments: List[ChartAppointmentResponse]
+    lab_records: List[LabRecordResponse]
+    medical_records: List[MedicalRecordResponse]
+
+
+# Clinical Search Schemas
+class ClinicalSearchHit(BaseModel):
+    source: str
+    source_id: int
+    patient_id: Optional[int]
+    rank: float
+    snippet: str
+
+
 # Pharmacy Schemas
 class PharmacyCreate(BaseModel):
     medicine_name: str
     quantity: int
+    reorder_level: int = 10
     unit_price: float
     expiry_date: datetime
 
 
 class PharmacyUpdate(BaseModel):
     quantity: Optional[int] = None
+    reorder_level: Optional[int] = None
     status: Optional[str] = None
 
 
@@ -216,6 +326,7 @@ class PharmacyResponse(BaseModel):
     id: int
     medicine_name: str
     quantity: int
+    reorder_level: int
     unit_price: float
     expiry_date: datetime
     status: str
@@ -224,6 +335,19 @@ class PharmacyResponse(BaseModel):
         from_attributes = True
 
 
+class DispenseRequest(BaseModel):
+    quantity: int = Field(gt=0)
+
+
+class DispenseItem(BaseModel):
+    medicine_id: int
+    quantity: int = Field(gt=0)
+
+
+class DispenseBatchRequest(BaseModel):
+    items: List[DispenseItem] = Field(min_length=1)
+
+
 # Inventory Schemas
 class InventoryCreate(BaseModel):
     item_name: str
@@ -235,6 +359,7 @@ class InventoryCreate(BaseModel):
 
 class InventoryUpdate(BaseModel):
     quantity: Optional[int] = None
+    reorder_level: Optional[int] = None
     status: Optional[str] = None
 
 
@@ -250,6 +375,27 @@ class InventoryResponse(BaseModel):
         from_attributes = True
 
 
+class ConsumeRequest(BaseModel):
+    quantity: int = Field(gt=0)
+
+
+class ConsumeItem(BaseModel):
+    item_id: int
+    quantity: int = Field(gt=0)
+
+
+class ConsumeBatchRequest(BaseModel):
+    items: List[ConsumeItem] = Field(min_length=1)
+
+
+# Low Stock Alert Schemas
+class LowStockEvent(BaseModel):
+    source: str  # pharmacy, inventory
+    action: str  # raised, cleared
+    item_id: int
+    item: Optional[dict] = None
+
+
 # Cleaning Log Schemas
 class CleaningLogCreate(BaseModel):
     cleaner_id: Optional[int] = None
@@ -296,3 +442,35 @@ class ReminderResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+# Analytics Schemas
+class DoctorAppointmentsDay(BaseModel):
+    doctor_id: Optional[int]
+    day: date
+    appointments: int
+    completed: int
+    cancelled: int
+
+
+class LabTurnaround(BaseModel):
+    test_type: Optional[str]
+    completed: int
+    average_hours: float
+    median_hours: float
+    max_hours: float
+
+
+class CleaningMinutes(BaseModel):
+    area_type: Optional[str]
+    area_name: Optional[str]
+    cleanings: int
+    minutes: int
+
+
+class StockValue(BaseModel):
+    source: Literal["pharmacy", "inventory"]
+    group: Optional[str]
+    items: int
+    quantity: int
+    value: float
@@ -0,0 +1,65 @@
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List
+
+
+async def decrement_stock(
+    db: AsyncSession, model, item_id: int, quantity: int, *conditions, **values
+):
+    """
+    Take quantity off one row in a single UPDATE ... RETURNING statement.
+    The stock check is part of the WHERE clause, so concurrent callers can
+    never drive quantity below zero or overwrite each other. Returns the
+    updated row, or None when the row is missing, short or fails a condition.
+    """
+    return await db.scalar(
+        update(model)
+        .where(model.id == item_id, model.quantity >= quantity, *conditions)
+        .values(quantity=model.quantity - quantity, **values)
+        .returning(model)
+        .execution_options(populate_existing=True)
+    )
+
+
+async def raise_stock_error(db: AsyncSession, model, item_id: int, label: str):
+    """Explain why decrement_stock matched no row; only runs on the failure path"""
+    item = await db.get(model, item_id)
+    if not item:
+        raise HTTPException(status_code=404, detail=f"{label} {item_id} not found")
+    expiry_date = getattr(item, "expiry_date", None)
+    if getattr(item, "status", None) == "expired" or (
+        expiry_date is not None and expiry_date <= datetime.utcnow()
+    ):
+        raise HTTPException(status_code=400, detail=f"{label} {item_id} has expired")
+    raise HTTPException(
+        status_code=400,
+        detail=f"Insufficient stock for {label.lower()} {item_id}: {item.quantity} available",
+    )
+
+
+def merge_quantities(items) -> Dict[int, int]:
+    """Sum quantities per id, ordered by id so concurrent batches lock rows in the same order"""
+    totals: Dict[int, int] = {}
+    for item_id, quantity in items:
+        totals[item_id] = totals.get(item_id, 0) + quantity
+    return dict(sorted(totals.items()))
+
+
+async def decrement_stock_batch(
+    db: AsyncSession, model, quantities: Dict[int, int], label: str, decrement=decrement_stock
+) -> List:
+    """
+    Decrement several rows in one transaction, all or nothing. decrement is
+    called as decrement(db, model, item_id, quantity). The caller commits;
+    on failure the transaction is rolled back before raising.
+    """
+    rows = []
+    for item_id, quantity in quantities.items():
+        row = await decrement(db, model, item_id, quantity)
+        if row is None:
+            await db.rollback()
+            await raise_stock_error(db, model, item_id, label)
+        rows.append(row)
+    return rows
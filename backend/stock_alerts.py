@@ -0,0 +1,140 @@
+from contextlib import contextmanager
+from sqlalchemy import select
+from typing import Dict, Iterator, Optional, Set
+import asyncio
+import time
+import models
+import schemas
+from cache import response_cache
+from config import settings
+from database import AsyncSessionLocal
+
+# Events a slow subscriber may fall behind by before new ones are dropped
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+subscribers: Set[asyncio.Queue] = set()
+
+
+def publish(event: schemas.LowStockEvent):
+    for queue in subscribers:
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            pass
+
+
+@contextmanager
+def subscribe() -> Iterator[asyncio.Queue]:
+    """Queue receiving every low-stock event published while the block runs"""
+    queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+    subscribers.add(queue)
+    try:
+        yield queue
+    finally:
+        subscribers.discard(queue)
+
+
+def is_low_stock(item) -> bool:
+    # Mirrors the SQL predicate, where a missing value is never below anything
+    if item.quantity is None or item.reorder_level is None:
+        return False
+    return item.quantity < item.reorder_level
+
+
+class LowStockTracker:
+    """
+    Items below their reorder level, kept in memory and updated by the
+    write paths instead of rescanned on every read.
+
+    The set is tagged with the response cache version of its namespace. A
+    write in this process that moves the version by exactly one is applied
+    in place; any other version change makes the next read reload the set
+    through the partial low-stock index, which only touches rows that are
+    currently low. With the Redis cache the version is shared, so writes
+    on other workers are noticed on the next read. The memory backend's
+    version only sees this process's writes, so there the set is also
+    reloaded once it is LOW_STOCK_RELOAD_SECONDS old.
+    """
+
+    def __init__(self, source: str, model, schema):
+        self.source = source
+        self.model = model
+        self.schema = schema
+        self.items: Dict[int, dict] = {}
+        self.version: Optional[int] = None
+        self.loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _serialize(self, item) -> dict:
+        return self.schema.model_validate(item).model_dump(mode="json")
+
+    def _set(self, item_id: int, item: Optional[dict]):
+        if item is not None:
+            if self.items.get(item_id) == item:
+                return
+            self.items[item_id] = item
+            action = "raised"
+        elif self.items.pop(item_id, None) is not None:
+            action = "cleared"
+        else:
+            return
+        publish(schemas.LowStockEvent(source=self.source, action=action, item_id=item_id, item=item))
+
+    def _advance(self, version: int):
+        if self.version is not None and version == self.version + 1:
+            self.version = version
+        else:
+            self.version = None
+
+    def _expired(self) -> bool:
+        if settings.cache_backend != "memory":
+            return False
+        return time.monotonic() - self.loaded_at >= settings.low_stock_reload_seconds
+
+    async def refresh(self):
+        """Reload the set if a write elsewhere changed the namespace"""
+        async with self._lock:
+            version = await response_cache.version(self.source)
+            if version == self.version and not self._expired():
+                return
+
+            async with AsyncSessionLocal() as db:
+                rows = await db.scalars(
+                    select(self.model)
+                    .filter(self.model.quantity < self.model.reorder_level)
+                    .order_by(self.model.id)
+                )
+                current = {row.id: self._serialize(row) for row in rows}
+
+            for item_id in list(self.items):
+                if item_id not in current:
+                    self._set(item_id, None)
+            for item_id, item in current.items():
+                self._set(item_id, item)
+            self.version = version
+            self.loaded_at = time.monotonic()
+
+    async def get_items(self) -> list:
+        await self.refresh()
+        return [self.items[item_id] for item_id in sorted(self.items)]
+
+    def record(self, item, version: int):
+        """Apply a committed insert or update; version is the one the write bumped to"""
+        self.record_many([item], version)
+
+    def record_many(self, items, version: int):
+        """Apply several rows changed by one committed write"""
+        for item in items:
+            self._set(item.id, self._serialize(item) if is_low_stock(item) else None)
+        self._advance(version)
+
+    def discard(self, item_id: int, version: int):
+        """Apply a committed delete"""
+        self._set(item_id, None)
+        self._advance(version)
+
+
+pharmacy_low_stock = LowStockTracker("pharmacy", models.Pharmacy, schemas.PharmacyResponse)
+inventory_low_stock = LowStockTracker("inventory", models.Inventory, schemas.InventoryResponse)
+
+trackers = [pharmacy_low_stock, inventory_low_stock]
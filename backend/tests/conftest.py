@@ -0,0 +1,143 @@
+"""
+Shared fixtures: a throwaway SQLite database migrated to head with Alembic
+and served to the app through its aiosqlite engine, an admin TestClient,
+concurrent POSTs and a statement log. Every test starts from empty tables.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = tempfile.mkdtemp(prefix="hospital-tests-")
+
+# Settings are read on import, so the database is chosen before the app loads
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DATA_DIR, 'hospital.db')}"
+sys.path.insert(0, BACKEND_DIR)
+
+import httpx
+import pytest
+from alembic import command
+from alembic.config import Config
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+import models
+from cache import create_backend, response_cache
+from database import Base, SessionLocal, async_engine, engine
+from hashing import password_hasher
+from main import app
+from patient_search import memory_index
+from routers.auth import login_email_limiter, login_ip_limiter
+from stock_alerts import inventory_low_stock, pharmacy_low_stock
+from utils import create_access_token
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    command.upgrade(config, "head")
+    yield
+    password_hasher.shutdown()
+    engine.dispose()
+    shutil.rmtree(DATA_DIR, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def empty_tables():
+    yield
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+    # Cached responses, low-stock sets, the patient index and login attempts describe rows that are gone
+    response_cache.backend = create_backend()
+    for tracker in (pharmacy_low_stock, inventory_low_stock):
+        tracker.items.clear()
+        tracker.version = None
+    memory_index.documents.clear()
+    memory_index.postings.clear()
+    memory_index.loaded = False
+    login_email_limiter.reset()
+    login_ip_limiter.reset()
+
+
+@pytest.fixture
+def add():
+    """Insert a row with the model's defaults and return it, detached"""
+
+    def add(model, **values):
+        with SessionLocal(expire_on_commit=False) as db:
+            row = model(**values)
+            db.add(row)
+            db.commit()
+        return row
+
+    return add
+
+
+@pytest.fixture
+def admin(add):
+    return add(
+        models.User,
+        email="admin@hospital.test",
+        name="Admin",
+        role="admin",
+        first_login=False,
+        password_expires_at=datetime.utcnow() + timedelta(days=90),
+    )
+
+
+@pytest.fixture
+def client(admin):
+    """Client authenticated as the admin user; lifespan jobs are not started"""
+    token = create_access_token({"sub": admin.email, "user_id": admin.id, "role": admin.role})
+    client = TestClient(app)
+    client.headers["Authorization"] = f"Bearer {token}"
+    return client
+
+
+@pytest.fixture
+def post_concurrently(client):
+    """Status codes of (path, body) POSTs sent all at once on one event loop"""
+
+    async def send(requests):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://test",
+            headers=dict(client.headers),
+        ) as async_client:
+            responses = await asyncio.gather(
+                *(async_client.post(path, json=body) for path, body in requests)
+            )
+        return Counter(response.status_code for response in responses)
+
+    return lambda requests: asyncio.run(send(requests))
+
+
+@pytest.fixture
+def capture_queries():
+    """Context manager collecting the (statement, parameters) the app executes"""
+
+    # Handlers use the sync engine when DB_ASYNC=false; jobs always use the async one
+    engines = (async_engine.sync_engine, engine)
+
+    @contextmanager
+    def capture():
+        statements = []
+
+        def record(connection, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        for target in engines:
+            event.listen(target, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            for target in engines:
+                event.remove(target, "before_cursor_execute", record)
+
+    return capture
@@ -0,0 +1,50 @@
+"""Updating an appointment validates its schedule and keeps starts_at in step, even when cancelled"""
+from datetime import datetime
+import pytest
+import models
+
+
+@pytest.fixture
+def appointment(add):
+    patient = add(models.Patient, name="Ada", email="ada@example.com", phone="5551234", age=40, gender="f")
+    doctor = add(models.User, email="doctor@hospital.test", name="Doctor", role="doctor")
+
+    def appointment(status="scheduled"):
+        starts_at = datetime(2026, 3, 2, 9)
+        return add(
+            models.Appointment,
+            patient_id=patient.id,
+            doctor_id=doctor.id,
+            appointment_date=starts_at,
+            appointment_time="09:00",
+            starts_at=starts_at,
+            status=status,
+            reason="Checkup",
+        )
+
+    return appointment
+
+
+def test_cancelling_with_an_invalid_time_is_rejected(client, appointment):
+    appointment_id = appointment().id
+
+    response = client.put(
+        f"/api/appointments/{appointment_id}", json={"status": "cancelled", "appointment_time": "garbage"}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid appointment time"
+    assert client.get(f"/api/appointments/{appointment_id}").json()["appointment_time"] == "09:00"
+
+
+def test_rescheduling_a_cancelled_appointment_moves_its_start(client, appointment):
+    appointment_id = appointment(status="cancelled").id
+
+    response = client.put(
+        f"/api/appointments/{appointment_id}",
+        json={"appointment_date": "2026-03-09T00:00:00", "appointment_time": "14:30"},
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json()["status"] == "cancelled"
+    assert response.json()["starts_at"] == "2026-03-09T14:30:00"
@@ -0,0 +1,86 @@
+"""Logins, password changes and their rate limits"""
+from datetime import datetime, timedelta
+import pytest
+from fastapi.testclient import TestClient
+import models
+from config import settings
+from main import app
+from utils import hash_password
+
+PASSWORD = "Old-Password-1"
+NEW_PASSWORD = "New-Password-2"
+
+
+@pytest.fixture
+def nurse(add):
+    def nurse(password_expires_at):
+        return add(
+            models.User,
+            email="nurse@hospital.org",
+            name="Nurse",
+            role="nurse",
+            password_hash=hash_password(PASSWORD),
+            first_login=False,
+            password_expires_at=password_expires_at,
+        )
+
+    return nurse
+
+
+def login(client, password):
+    return client.post("/api/auth/login", json={"email": "nurse@hospital.org", "password": password})
+
+
+def test_expired_password_can_be_changed_without_a_token(nurse):
+    nurse(datetime.utcnow() - timedelta(days=1))
+    client = TestClient(app)
+
+    assert login(client, PASSWORD).status_code == 403
+
+    response = client.post(
+        "/api/auth/change-password",
+        json={
+            "email": "nurse@hospital.org",
+            "old_password": PASSWORD,
+            "new_password": NEW_PASSWORD,
+            "confirm_password": NEW_PASSWORD,
+        },
+    )
+
+    assert response.status_code == 200
+    assert login(client, NEW_PASSWORD).status_code == 200
+
+
+def test_change_password_without_a_token_needs_the_old_password(nurse):
+    nurse(datetime.utcnow() - timedelta(days=1))
+    client = TestClient(app)
+    change = {"old_password": "wrong", "new_password": NEW_PASSWORD, "confirm_password": NEW_PASSWORD}
+
+    assert client.post("/api/auth/change-password", json=change).status_code == 401
+    response = client.post("/api/auth/change-password", json={**change, "email": "nurse@hospital.org"})
+
+    assert response.status_code == 401
+    assert login(client, PASSWORD).status_code == 403
+
+
+def test_parallel_guesses_cannot_exceed_the_email_limit(nurse, post_concurrently):
+    nurse(datetime.utcnow() + timedelta(days=30))
+    attempts = settings.login_rate_limit_attempts
+
+    statuses = post_concurrently(
+        [("/api/auth/login", {"email": "nurse@hospital.org", "password": "wrong"})] * (attempts + 1)
+    )
+
+    assert statuses == {401: attempts, 429: 1}
+
+
+def test_successful_logins_are_not_counted(nurse, post_concurrently):
+    nurse(datetime.utcnow() + timedelta(days=30))
+    attempts = settings.login_rate_limit_attempts
+
+    statuses = post_concurrently(
+        [("/api/auth/login", {"email": "nurse@hospital.org", "password": PASSWORD})] * attempts
+    )
+
+    assert statuses == {200: attempts}
+    assert login(TestClient(app), "wrong").status_code == 401
@@ -0,0 +1,46 @@
+"""Documents are searchable as soon as they are first indexed, on every dialect"""
+import asyncio
+from sqlalchemy.dialects import postgresql
+import models
+from clinical_search import rebuild, upsert_documents
+
+
+def search_hits(client, q):
+    response = client.get("/api/search/clinical", params={"q": q})
+    assert response.status_code == 200
+    return [(hit["source"], hit["source_id"]) for hit in response.json()["items"]]
+
+
+def test_postgres_insert_computes_the_search_vector():
+    row = {"source": "lab_record", "source_id": 1, "patient_id": 1, "body": "hemoglobin", "updated_at": None}
+
+    sql = str(upsert_documents(postgresql, [row]).compile(dialect=postgresql.dialect()))
+
+    inserted, updated = sql.split(" ON CONFLICT ")
+    assert "search_vector" in inserted and "to_tsvector(" in inserted
+    assert "search_vector = excluded.search_vector" in updated
+
+
+def test_new_record_is_found(client, add):
+    patient_id = add(models.Patient, name="Ada", email="ada@example.com", phone="555", age=40, gender="f").id
+
+    response = client.post(
+        "/api/lab/records",
+        json={"patient_id": patient_id, "test_name": "Ferritin", "test_type": "blood", "result": "low ferritin"},
+    )
+
+    assert response.status_code == 200
+    assert search_hits(client, "ferritin") == [("lab_record", response.json()["id"])]
+
+
+def test_rebuild_into_an_empty_index_is_searchable(client, add):
+    patient = add(
+        models.Patient, name="Ada", email="ada@example.com", phone="555", age=40, gender="f",
+        medical_history="chronic migraine",
+    )
+    record = add(models.LabRecord, patient_id=patient.id, test_name="MRI", test_type="imaging", result="migraine")
+
+    indexed = asyncio.run(rebuild())
+
+    assert indexed["patient"] == 1 and indexed["lab_record"] == 1
+    assert sorted(search_hits(client, "migraine")) == [("lab_record", record.id), ("patient", patient.id)]
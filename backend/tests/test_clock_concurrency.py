@@ -0,0 +1,35 @@
+"""
+Repeated punches sent at once: one clock in opens one shift, one clock out
+closes it and adds it to the timesheet once, the rest are rejected.
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import select
+import models
+from database import SessionLocal
+
+PUNCHES = 20
+
+
+def test_parallel_clock_ins_open_one_shift(add, post_concurrently):
+    employee_id = add(models.Employee, phone="555", salary=50000).id
+
+    statuses = post_concurrently([("/api/employees/clock-in", {"employee_id": employee_id})] * PUNCHES)
+
+    assert statuses == {200: 1, 400: PUNCHES - 1}
+    with SessionLocal() as db:
+        assert len(db.scalars(select(models.ClockRecord)).all()) == 1
+
+
+def test_parallel_clock_outs_close_the_shift_once(add, post_concurrently):
+    employee_id = add(models.Employee, phone="555", salary=50000).id
+    add(models.ClockRecord, employee_id=employee_id, clock_in_time=datetime.utcnow() - timedelta(hours=1))
+
+    statuses = post_concurrently([("/api/employees/clock-out", {"employee_id": employee_id})] * PUNCHES)
+
+    assert statuses == {200: 1, 400: PUNCHES - 1}
+    with SessionLocal() as db:
+        record = db.scalar(select(models.ClockRecord))
+        rollup = db.scalar(select(models.TimesheetDay))
+    assert record.clock_out_time is not None
+    assert rollup.shifts == 1
+    assert rollup.worked_hours == record.worked_hours
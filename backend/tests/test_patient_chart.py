@@ -0,0 +1,57 @@
+"""The patient chart costs a fixed number of queries however large the chart is"""
+from datetime import datetime, timedelta
+import pytest
+import models
+
+# Patient, appointments joined to their doctor, lab records, medical records
+CHART_QUERIES = 4
+
+
+@pytest.fixture
+def chart(add):
+    def chart(size):
+        patient = add(models.Patient, name="Ada", email="ada@example.com", phone="5551234", age=40, gender="f")
+        doctors = [
+            add(models.User, email=f"doctor{patient.id}.{i}@hospital.test", name=f"Doctor {i}", role="doctor")
+            for i in range(5)
+        ]
+        start = datetime(2026, 1, 5, 9)
+        for i in range(size):
+            starts_at = start + timedelta(days=i)
+            add(
+                models.Appointment,
+                patient_id=patient.id,
+                doctor_id=doctors[i % len(doctors)].id,
+                appointment_date=starts_at,
+                appointment_time="09:00",
+                starts_at=starts_at,
+                reason="Checkup",
+            )
+            add(models.LabRecord, patient_id=patient.id, test_name="CBC", test_type="blood", result="")
+            add(models.MedicalRecord, patient_id=patient.id, doctor_id=doctors[0].id, diagnosis="flu")
+        return patient.id
+
+    return chart
+
+
+@pytest.mark.parametrize("size", [1, 30])
+def test_chart_query_count_is_constant(client, capture_queries, chart, size):
+    patient_id = chart(size)
+
+    with capture_queries() as statements:
+        response = client.get(f"/api/patients/{patient_id}/chart?appointments_limit=25")
+    assert response.status_code == 200, response.text
+
+    assert len(statements) == CHART_QUERIES, [sql for sql, _ in statements]
+    body = response.json()
+    assert len(body["appointments"]) == min(size, 25)
+    assert len(body["lab_records"]) == min(size, 20)
+    assert len(body["medical_records"]) == min(size, 20)
+    assert all(appointment["doctor"]["id"] == appointment["doctor_id"] for appointment in body["appointments"])
+
+    starts = [appointment["starts_at"] for appointment in body["appointments"]]
+    assert starts == sorted(starts, reverse=True)
+
+
+def test_chart_of_missing_patient(client):
+    assert client.get("/api/patients/999/chart").status_code == 404
@@ -0,0 +1,25 @@
+"""The month filter of the payment request list accepts any spelling of the month"""
+import pytest
+import models
+
+
+@pytest.fixture
+def requests(add, admin):
+    employee = add(models.Employee, user_id=admin.id, salary=3000.0)
+    for month in ("2026-08", "2026-09"):
+        add(models.PaymentRequest, employee_id=employee.id, base_salary=3000.0, total_amount=3000.0, month=month)
+
+
+@pytest.mark.parametrize("month", ["2026-09", "2026-9"])
+def test_month_filter_is_canonicalized(client, requests, month):
+    response = client.get("/api/payroll/requests", params={"month": month})
+
+    assert response.status_code == 200, response.text
+    assert [item["month"] for item in response.json()["items"]] == ["2026-09"]
+
+
+def test_invalid_month_filter_is_rejected(client, requests):
+    response = client.get("/api/payroll/requests", params={"month": "September"})
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Month must be formatted as YYYY-MM"
@@ -0,0 +1,93 @@
+"""
+Every filtered query the routers send must be served by an index: each
+statement is replayed under EXPLAIN QUERY PLAN and no table may be read
+by a full scan.
+"""
+from datetime import datetime, timedelta
+import re
+import pytest
+import models
+from database import engine
+
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+WHERE = re.compile(r"\bWHERE\b")
+
+
+@pytest.fixture
+def records(add, admin):
+    employee = add(models.Employee, user_id=admin.id, phone="555", salary=5000)
+    patient = add(models.Patient, name="Ada", email="ada@example.com", phone="5551234", age=40, gender="f")
+    start = datetime.utcnow() + timedelta(days=1)
+    add(
+        models.Appointment,
+        patient_id=patient.id,
+        doctor_id=admin.id,
+        appointment_date=start,
+        appointment_time=start.strftime("%H:%M"),
+        starts_at=start,
+        reason="Checkup",
+    )
+    add(models.LabRecord, patient_id=patient.id, test_name="CBC", test_type="blood", result="")
+    add(models.MedicalRecord, patient_id=patient.id, doctor_id=admin.id, diagnosis="flu")
+    add(models.CleaningLog, cleaner_id=employee.id, area_type="ward", area_name="A", cleaning_date=datetime.utcnow(), duration_minutes=30)
+    add(models.Reminder, patient_id=patient.id, reminder_type="medication", message="Take", scheduled_time=start)
+    add(models.Pharmacy, medicine_name="Ibuprofen", quantity=2, reorder_level=10, unit_price=1.5, expiry_date=start + timedelta(days=365))
+    add(models.Inventory, item_name="Gloves", category="medical_supplies", quantity=1, reorder_level=5, unit_price=0.2)
+    return {"employee": employee.id, "patient": patient.id, "doctor": admin.id}
+
+
+def full_scans(statement, parameters):
+    with engine.connect() as connection:
+        plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [match.group(1) for *_, detail in plan if (match := FULL_SCAN.match(detail))]
+
+
+def request(client, method, path, body=None):
+    response = client.request(method, path, json=body)
+    assert response.status_code == 200, response.text
+
+
+@pytest.mark.parametrize(
+    "method, path, body",
+    [
+        ("GET", "/api/appointments/?patient_id={patient}", None),
+        ("GET", "/api/appointments/?doctor_id={doctor}&from=2020-01-01T00:00:00", None),
+        ("GET", "/api/lab/patient/{patient}", None),
+        ("GET", "/api/patients/{patient}/chart", None),
+        ("GET", "/api/employees/clock-records/{employee}", None),
+        ("POST", "/api/employees/clock-in", {"employee_id": "employee"}),
+        ("GET", "/api/cleaning/history/{employee}", None),
+        ("GET", "/api/reminders/pending/patient/{patient}", None),
+        ("POST", "/api/reminders/generate", None),
+        ("POST", "/api/reminders/dispatch", None),
+        ("GET", "/api/pharmacy/low-stock/alert", None),
+        ("GET", "/api/inventory/low-stock/alert", None),
+    ],
+)
+def test_router_queries_use_indexes(client, capture_queries, records, method, path, body):
+    if body is not None:
+        body = {key: records[name] for key, name in body.items()}
+    with capture_queries() as statements:
+        request(client, method, path.format(**records), body)
+
+    filtered = [(sql, parameters) for sql, parameters in statements if WHERE.search(sql)]
+    assert filtered
+    for sql, parameters in filtered:
+        assert full_scans(sql, parameters) == [], sql
+
+
+def test_clock_out_uses_open_shift_index(client, capture_queries, records):
+    request(client, "POST", "/api/employees/clock-in", {"employee_id": records["employee"]})
+    with capture_queries() as statements:
+        request(client, "POST", "/api/employees/clock-out", {"employee_id": records["employee"]})
+
+    open_shift = [
+        (sql, parameters)
+        for sql, parameters in statements
+        if sql.lstrip().startswith("SELECT") and "clock_out_time IS NULL" in sql
+    ]
+    assert open_shift
+    for sql, parameters in open_shift:
+        with engine.connect() as connection:
+            plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", parameters)
+            assert any("ix_clock_records_open_shift" in detail for *_, detail in plan), sql
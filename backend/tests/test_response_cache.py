@@ -0,0 +1,106 @@
+"""Cached pharmacy and inventory reads are never stale once a write has returned"""
+from datetime import datetime, timedelta
+import asyncio
+import json
+import pytest
+from cache import MemoryBackend, ResponseCache, response_cache
+
+SOURCES = {
+    "pharmacy": {
+        "path": "/api/pharmacy",
+        "create": {
+            "medicine_name": "Paracetamol",
+            "quantity": 50,
+            "reorder_level": 10,
+            "unit_price": 0.5,
+            "expiry_date": (datetime.utcnow() + timedelta(days=365)).isoformat(),
+        },
+        "name": "medicine_name",
+        "take": ("dispense", {"quantity": 5}),
+    },
+    "inventory": {
+        "path": "/api/inventory",
+        "create": {
+            "item_name": "Syringes",
+            "category": "medical_supplies",
+            "quantity": 50,
+            "unit_price": 0.1,
+            "reorder_level": 10,
+        },
+        "name": "item_name",
+        "take": ("consume", {"quantity": 5}),
+    },
+}
+
+
+def listed(client, path):
+    response = client.get(f"{path}/")
+    assert response.status_code == 200
+    return {item["id"]: item for item in response.json()["items"]}
+
+
+def read(client, path, row_id):
+    response = client.get(f"{path}/{row_id}")
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.parametrize("source", SOURCES)
+def test_reads_after_writes_are_never_stale(client, source):
+    path, name = SOURCES[source]["path"], SOURCES[source]["name"]
+
+    # Warm the list cache while empty; adding must show up in it
+    assert listed(client, path) == {}
+    row_id = client.post(f"{path}/", json=SOURCES[source]["create"]).json()["id"]
+    assert list(listed(client, path)) == [row_id]
+
+    hits = response_cache.hits[source]
+    assert read(client, path, row_id)[name] == SOURCES[source]["create"][name]
+    assert read(client, path, row_id)[name] == SOURCES[source]["create"][name]
+    assert response_cache.hits[source] == hits + 1
+
+    assert client.put(f"{path}/{row_id}", json={"reorder_level": 20}).status_code == 200
+    assert read(client, path, row_id)["reorder_level"] == 20
+    assert listed(client, path)[row_id]["reorder_level"] == 20
+
+    action, body = SOURCES[source]["take"]
+    assert client.post(f"{path}/{row_id}/{action}", json=body).status_code == 200
+    assert read(client, path, row_id)["quantity"] == 45
+    assert listed(client, path)[row_id]["quantity"] == 45
+
+    assert client.delete(f"{path}/{row_id}").status_code == 200
+    assert client.get(f"{path}/{row_id}").status_code == 404
+    assert listed(client, path) == {}
+
+
+def test_load_racing_a_write_is_not_served_after_it():
+    cache = ResponseCache(MemoryBackend(100), ttl=60)
+    row = {"quantity": 10}
+
+    async def scenario():
+        loaded = asyncio.Event()
+        written = asyncio.Event()
+
+        async def slow_load():
+            body = json.dumps(row).encode()
+            loaded.set()
+            # The write commits and invalidates before this load is stored
+            await written.wait()
+            return body
+
+        async def write():
+            await loaded.wait()
+            row["quantity"] = 9
+            await cache.invalidate("pharmacy")
+            written.set()
+
+        async def fresh_load():
+            return json.dumps(row).encode()
+
+        stale, _ = await asyncio.gather(cache.get_or_load("pharmacy", "item:1", slow_load), write())
+        after = await cache.get_or_load("pharmacy", "item:1", fresh_load)
+        return json.loads(stale.body), json.loads(after.body)
+
+    stale, after = asyncio.run(scenario())
+    assert stale == {"quantity": 10}
+    assert after == {"quantity": 9}
@@ -0,0 +1,75 @@
+"""
+Many dispensers racing for the same stock: every request runs concurrently
+on one event loop against the app, and the stock must end exactly at zero
+with one success per unit, never oversold.
+"""
+from datetime import datetime, timedelta
+import pytest
+import models
+from database import SessionLocal
+
+DISPENSERS = 60
+
+
+def quantity_of(model, row_id):
+    with SessionLocal() as db:
+        return db.get(model, row_id).quantity
+
+
+@pytest.fixture
+def medicine(add):
+    def medicine(quantity, expiry_date=None):
+        return add(
+            models.Pharmacy,
+            medicine_name="Amoxicillin",
+            quantity=quantity,
+            reorder_level=5,
+            unit_price=2.0,
+            expiry_date=expiry_date or datetime.utcnow() + timedelta(days=365),
+        ).id
+
+    return medicine
+
+
+def test_parallel_dispense_never_oversells(client, medicine, post_concurrently):
+    medicine_id = medicine(25)
+
+    statuses = post_concurrently(
+        [(f"/api/pharmacy/{medicine_id}/dispense", {"quantity": 1})] * DISPENSERS
+    )
+
+    assert statuses == {200: 25, 400: DISPENSERS - 25}
+    assert quantity_of(models.Pharmacy, medicine_id) == 0
+    assert client.get(f"/api/pharmacy/{medicine_id}").json()["status"] == "out_of_stock"
+
+
+def test_parallel_prescriptions_are_all_or_nothing(client, medicine, post_concurrently):
+    scarce, plentiful = medicine(20), medicine(30)
+    prescription = {"items": [{"medicine_id": scarce, "quantity": 2}, {"medicine_id": plentiful, "quantity": 1}]}
+
+    statuses = post_concurrently([("/api/pharmacy/dispense", prescription)] * DISPENSERS)
+
+    assert statuses == {200: 10, 400: DISPENSERS - 10}
+    assert quantity_of(models.Pharmacy, scarce) == 0
+    assert quantity_of(models.Pharmacy, plentiful) == 20
+
+
+def test_parallel_consume_never_oversells(client, add, post_concurrently):
+    item_id = add(
+        models.Inventory, item_name="Gloves", category="medical_supplies", quantity=40, reorder_level=5, unit_price=0.2
+    ).id
+
+    statuses = post_concurrently([(f"/api/inventory/{item_id}/consume", {"quantity": 3})] * DISPENSERS)
+
+    assert statuses == {200: 13, 400: DISPENSERS - 13}
+    assert quantity_of(models.Inventory, item_id) == 1
+
+
+def test_expired_medicine_is_not_dispensed(client, medicine):
+    medicine_id = medicine(10, expiry_date=datetime.utcnow() - timedelta(days=1))
+
+    response = client.post(f"/api/pharmacy/{medicine_id}/dispense", json={"quantity": 1})
+
+    assert response.status_code == 400
+    assert "expired" in response.json()["detail"]
+    assert quantity_of(models.Pharmacy, medicine_id) == 10
@@ -0,0 +1,209 @@
+from datetime import date, timedelta
+from fastapi import HTTPException
+from sqlalchemy import Date, delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Literal, Optional
+import argparse
+import asyncio
+import logging
+import models
+from config import settings
+from database import AsyncSessionLocal
+from scheduler import scheduler
+
+logger = logging.getLogger(__name__)
+
+ClockRecord = models.ClockRecord
+Employee = models.Employee
+TimesheetDay = models.TimesheetDay
+
+TimesheetPeriod = Literal["day", "week"]
+
+
+def insert_dialect(db: AsyncSession):
+    return postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+
+
+def lock_employees(*conditions):
+    """
+    FOR NO KEY UPDATE on employees: clock outs and rollup rebuilds of the
+    same employee run one after the other, while clock ins, whose foreign
+    key check only takes a key share lock, are not blocked.
+    """
+    return select(Employee.id).where(*conditions).with_for_update(key_share=True)
+
+
+async def add_shift(db: AsyncSession, record: ClockRecord):
+    """Add a closed shift to the rollup of the day it started, in the caller's transaction"""
+    dialect = insert_dialect(db)
+    statement = dialect.insert(TimesheetDay).values(
+        employee_id=record.employee_id,
+        day=record.clock_in_time.date(),
+        worked_hours=record.worked_hours,
+        overtime_hours=record.overtime_hours,
+        shifts=1,
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[TimesheetDay.employee_id, TimesheetDay.day],
+        set_={
+            "worked_hours": TimesheetDay.worked_hours + statement.excluded.worked_hours,
+            "overtime_hours": TimesheetDay.overtime_hours + statement.excluded.overtime_hours,
+            "shifts": TimesheetDay.shifts + statement.excluded.shifts,
+        },
+    )
+    await db.execute(statement)
+
+
+def period_start(day: date, period: str) -> date:
+    """First day of the period holding day; weeks start on Monday"""
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+async def read_timesheet(
+    db: AsyncSession,
+    start: date,
+    end: date,
+    period: str = "day",
+    employee_id: Optional[int] = None,
+    role: Optional[str] = None,
+) -> List[dict]:
+    """
+    Worked and overtime hours per employee and period over [start, end),
+    summed from the daily rollups: one row per employee and day worked,
+    however many times they clocked in.
+    """
+    if end <= start:
+        raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+    if end - start > timedelta(days=settings.timesheet_max_days):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range must not exceed {settings.timesheet_max_days} days",
+        )
+
+    query = select(
+        TimesheetDay.employee_id,
+        TimesheetDay.day,
+        TimesheetDay.worked_hours,
+        TimesheetDay.overtime_hours,
+        TimesheetDay.shifts,
+    ).where(TimesheetDay.day >= start, TimesheetDay.day < end)
+    if employee_id is not None:
+        query = query.where(TimesheetDay.employee_id == employee_id)
+    if role is not None:
+        query = (
+            query.join(Employee, Employee.id == TimesheetDay.employee_id)
+            .join(models.User, models.User.id == Employee.user_id)
+            .where(models.User.role == role)
+        )
+
+    entries: Dict[tuple, dict] = {}
+    for row in await db.execute(query.order_by(TimesheetDay.employee_id, TimesheetDay.day)):
+        key = (row.employee_id, period_start(row.day, period))
+        entry = entries.get(key)
+        if entry is None:
+            entry = entries[key] = {
+                "employee_id": row.employee_id,
+                "period_start": key[1],
+                "worked_hours": 0.0,
+                "overtime_hours": 0.0,
+                "shifts": 0,
+            }
+        entry["worked_hours"] += row.worked_hours
+        entry["overtime_hours"] += row.overtime_hours
+        entry["shifts"] += row.shifts
+
+    for entry in entries.values():
+        entry["worked_hours"] = round(entry["worked_hours"], 2)
+        entry["overtime_hours"] = round(entry["overtime_hours"], 2)
+    return list(entries.values())
+
+
+async def rebuild_chunk(start: int, stop: int) -> int:
+    """
+    Recompute the rollups of employees with ids in [start, stop) from their
+    closed shifts in one grouped INSERT ... SELECT, in its own transaction
+    """
+    async with AsyncSessionLocal() as db:
+        employees = (Employee.id >= start, Employee.id < stop)
+        await db.execute(lock_employees(*employees))
+        await db.execute(
+            delete(TimesheetDay).where(
+                TimesheetDay.employee_id >= start, TimesheetDay.employee_id < stop
+            )
+        )
+
+        day = func.date(ClockRecord.clock_in_time, type_=Date)
+        rows = (
+            select(
+                ClockRecord.employee_id,
+                day,
+                func.coalesce(func.sum(ClockRecord.worked_hours), 0),
+                func.coalesce(func.sum(ClockRecord.overtime_hours), 0),
+                func.count(),
+            )
+            .where(
+                ClockRecord.employee_id >= start,
+                ClockRecord.employee_id < stop,
+                ClockRecord.clock_out_time.is_not(None),
+            )
+            .group_by(ClockRecord.employee_id, day)
+        )
+        statement = insert_dialect(db).insert(TimesheetDay).from_select(
+            ["employee_id", "day", "worked_hours", "overtime_hours", "shifts"], rows
+        )
+        days = (await db.execute(statement)).rowcount
+        await db.commit()
+    return days
+
+
+async def rebuild(workers: Optional[int] = None, chunk_size: Optional[int] = None) -> dict:
+    """
+    Rebuild every employee's daily rollups from the clock records, for
+    instance after deploying them or after editing shifts by hand. Id
+    ranges of chunk_size employees are rebuilt by concurrent workers, each
+    chunk in its own transaction, so timesheets keep answering meanwhile.
+    """
+    workers = workers or settings.timesheet_backfill_workers
+    chunk_size = chunk_size or settings.timesheet_backfill_chunk_size
+
+    chunks: asyncio.Queue = asyncio.Queue()
+    async with AsyncSessionLocal() as db:
+        if db.get_bind().dialect.name != "postgresql":
+            # SQLite has a single writer; more workers only wait on its lock
+            workers = 1
+        first_id, last_id = (
+            await db.execute(select(func.min(Employee.id), func.max(Employee.id)))
+        ).one()
+    if first_id is not None:
+        for start in range(first_id, last_id + 1, chunk_size):
+            chunks.put_nowait((start, start + chunk_size))
+
+    totals = {"chunks": chunks.qsize(), "days": 0}
+
+    async def worker():
+        while not chunks.empty():
+            start, stop = chunks.get_nowait()
+            totals["days"] += await rebuild_chunk(start, stop)
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    logger.info("Timesheet rollups rebuilt: %s", totals)
+    return totals
+
+
+timesheet_backfill_job = scheduler.add_job(
+    "timesheet_backfill", settings.timesheet_backfill_interval_seconds, rebuild
+)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Timesheet rollup maintenance")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    arguments = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    print(asyncio.run(rebuild(arguments.workers, arguments.chunk_size)))
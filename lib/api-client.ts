@@ -6,6 +6,22 @@ export interface ApiResponse<T> {
   error?: string;
 }
 
+// Filter query parameters of a list endpoint, plus `sort` (e.g. "-created_at")
+export type ListFilters = Record<string, string | number | boolean | undefined>;
+
+function pageQuery(cursor: string | undefined, limit: number, filters: ListFilters = {}) {
+  const params = new URLSearchParams({ limit: String(limit) });
+  if (cursor) {
+    params.set("cursor", cursor);
+  }
+  for (const [name, value] of Object.entries(filters)) {
+    if (value !== undefined) {
+      params.set(name, String(value));
+    }
+  }
+  return `?${params}`;
+}
+
 class ApiClient {
   private token: string | null = null;
 
@@ -97,8 +113,22 @@ class ApiClient {
     return this.request("POST", "/patients/register", patient);
   }
 
-  async getAllPatients(skip = 0, limit = 100) {
-    return this.request("GET", `/patients/?skip=${skip}&limit=${limit}`);
+  async getAllPatients(cursor?: string, limit = 100, filters: ListFilters = {}) {
+    return this.request("GET", `/patients/${pageQuery(cursor, limit, filters)}`);
+  }
+
+  async searchPatients(q: string, limit = 20) {
+    const params = new URLSearchParams({ q, limit: String(limit) });
+    return this.request("GET", `/patients/search?${params}`);
+  }
+
+  async searchClinicalText(
+    q: string,
+    cursor?: string,
+    limit = 20,
+    filters: { source?: "patient" | "lab_record" | "medical_record"; patient_id?: number } = {},
+  ) {
+    return this.request("GET", `/search/clinical${pageQuery(cursor, limit, { q, ...filters })}`);
   }
 
   async getPatient(patientId: number) {
@@ -130,21 +160,87 @@ class ApiClient {
     return this.request("GET", `/employees/clock-records/${employeeId}`);
   }
 
-  async getAllEmployees(skip = 0, limit = 100) {
-    return this.request("GET", `/employees/?skip=${skip}&limit=${limit}`);
+  async getTimesheet(
+    employeeId: number,
+    from: string,
+    to: string,
+    period: "day" | "week" = "day",
+  ) {
+    const params = new URLSearchParams({ from, to, period });
+    return this.request("GET", `/employees/${employeeId}/timesheet?${params}`);
+  }
+
+  async getDepartmentTimesheet(
+    role: string,
+    from: string,
+    to: string,
+    period: "day" | "week" = "day",
+  ) {
+    const params = new URLSearchParams({ role, from, to, period });
+    return this.request("GET", `/employees/timesheets?${params}`);
+  }
+
+  async backfillTimesheets() {
+    return this.request("POST", "/employees/timesheets/backfill");
+  }
+
+  async getAllEmployees(cursor?: string, limit = 100) {
+    return this.request("GET", `/employees/${pageQuery(cursor, limit)}`);
   }
 
   async getEmployee(employeeId: number) {
     return this.request("GET", `/employees/${employeeId}`);
   }
 
+  // Payroll endpoints
+  async runPayroll(month: string) {
+    return this.request("POST", `/payroll/run?month=${encodeURIComponent(month)}`);
+  }
+
+  async getPaymentRequests(
+    cursor?: string,
+    limit = 100,
+    filters: { month?: string; status?: string; employee_id?: number } = {},
+  ) {
+    return this.request("GET", `/payroll/requests${pageQuery(cursor, limit, filters)}`);
+  }
+
+  async updatePaymentRequest(requestId: number, status: string) {
+    return this.request("PUT", `/payroll/requests/${requestId}`, { status });
+  }
+
+  async setPaymentRequestsStatus(
+    status: "approved" | "rejected" | "paid",
+    selection: { ids?: number[]; month?: string },
+  ) {
+    return this.request("POST", "/payroll/requests/status", { status, ...selection });
+  }
+
   // Appointment endpoints
   async createAppointment(appointment: any) {
     return this.request("POST", "/appointments/", appointment);
   }
 
-  async getAllAppointments(skip = 0, limit = 100) {
-    return this.request("GET", `/appointments/?skip=${skip}&limit=${limit}`);
+  async getAllAppointments(
+    cursor?: string,
+    limit = 100,
+    filters: {
+      patient_id?: number;
+      doctor_id?: number;
+      status?: string;
+      from?: string;
+      to?: string;
+      sort?: "id" | "-id" | "starts_at" | "-starts_at";
+    } = {},
+  ) {
+    return this.request("GET", `/appointments/${pageQuery(cursor, limit, filters)}`);
+  }
+
+  async getAvailability(from: string, to: string, doctorIds: number[] = [], duration?: number) {
+    const params = new URLSearchParams({ from, to });
+    doctorIds.forEach((id) => params.append("doctor_id", String(id)));
+    if (duration) params.set("duration", String(duration));
+    return this.request("GET", `/appointments/availability?${params}`);
   }
 
   async getAppointment(appointmentId: number) {
@@ -164,8 +260,8 @@ class ApiClient {
     return this.request("POST", "/lab/records", record);
   }
 
-  async getAllLabRecords(skip = 0, limit = 100) {
-    return this.request("GET", `/lab/records?skip=${skip}&limit=${limit}`);
+  async getAllLabRecords(cursor?: string, limit = 100, filters: ListFilters = {}) {
+    return this.request("GET", `/lab/records${pageQuery(cursor, limit, filters)}`);
   }
 
   async getLabRecord(recordId: number) {
@@ -185,8 +281,8 @@ class ApiClient {
     return this.request("POST", "/pharmacy/", medicine);
   }
 
-  async getAllMedicines(skip = 0, limit = 100) {
-    return this.request("GET", `/pharmacy/?skip=${skip}&limit=${limit}`);
+  async getAllMedicines(cursor?: string, limit = 100, filters: ListFilters = {}) {
+    return this.request("GET", `/pharmacy/${pageQuery(cursor, limit, filters)}`);
   }
 
   async getMedicine(medicineId: number) {
@@ -205,13 +301,21 @@ class ApiClient {
     return this.request("GET", "/pharmacy/low-stock/alert");
   }
 
+  async dispenseMedicine(medicineId: number, quantity: number) {
+    return this.request("POST", `/pharmacy/${medicineId}/dispense`, { quantity });
+  }
+
+  async dispensePrescription(items: { medicine_id: number; quantity: number }[]) {
+    return this.request("POST", "/pharmacy/dispense", { items });
+  }
+
   // Inventory endpoints
   async addInventoryItem(item: any) {
     return this.request("POST", "/inventory/", item);
   }
 
-  async getAllInventoryItems(skip = 0, limit = 100) {
-    return this.request("GET", `/inventory/?skip=${skip}&limit=${limit}`);
+  async getAllInventoryItems(cursor?: string, limit = 100, filters: ListFilters = {}) {
+    return this.request("GET", `/inventory/${pageQuery(cursor, limit, filters)}`);
   }
 
   async getInventoryItem(itemId: number) {
@@ -230,13 +334,21 @@ class ApiClient {
     return this.request("GET", "/inventory/low-stock/alert");
   }
 
+  async consumeInventoryItem(itemId: number, quantity: number) {
+    return this.request("POST", `/inventory/${itemId}/consume`, { quantity });
+  }
+
+  async consumeInventoryItems(items: { item_id: number; quantity: number }[]) {
+    return this.request("POST", "/inventory/consume", { items });
+  }
+
   // Cleaning endpoints
   async createCleaningLog(log: any) {
     return this.request("POST", "/cleaning/logs", log);
   }
 
-  async getAllCleaningLogs(skip = 0, limit = 100) {
-    return this.request("GET", `/cleaning/logs?skip=${skip}&limit=${limit}`);
+  async getAllCleaningLogs(cursor?: string, limit = 100, filters: ListFilters = {}) {
+    return this.request("GET", `/cleaning/logs${pageQuery(cursor, limit, filters)}`);
   }
 
   async getCleaningLog(logId: number) {
@@ -256,8 +368,8 @@ class ApiClient {
     return this.request("POST", "/reminders/", reminder);
   }
 
-  async getAllReminders(skip = 0, limit = 100) {
-    return this.request("GET", `/reminders/?skip=${skip}&limit=${limit}`);
+  async getAllReminders(cursor?: string, limit = 100, filters: ListFilters = {}) {
+    return this.request("GET", `/reminders/${pageQuery(cursor, limit, filters)}`);
   }
 
   async getReminder(reminderId: number) {
@@ -271,6 +383,27 @@ class ApiClient {
   async markReminderSent(reminderId: number) {
     return this.request("POST", `/reminders/${reminderId}/mark-sent`, {});
   }
+
+  // Analytics endpoints
+  async getAppointmentsPerDoctor(from: string, to: string, doctorId?: number) {
+    const params = new URLSearchParams({ from, to });
+    if (doctorId) params.set("doctor_id", String(doctorId));
+    return this.request("GET", `/analytics/appointments-per-doctor?${params}`);
+  }
+
+  async getLabTurnaround(from: string, to: string) {
+    const params = new URLSearchParams({ from, to });
+    return this.request("GET", `/analytics/lab-turnaround?${params}`);
+  }
+
+  async getCleaningMinutes(from: string, to: string) {
+    const params = new URLSearchParams({ from, to });
+    return this.request("GET", `/analytics/cleaning-minutes?${params}`);
+  }
+
+  async getStockValue() {
+    return this.request("GET", "/analytics/stock-value");
+  }
 }
 
 export const apiClient = new ApiClient();